@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from accounts.models import Notification
+from accounts.retention import apply_retention, retention_policy
+
+
+class Command(BaseCommand):
+    help = (
+        'Apply NOTIFICATION_RETENTION: fold old read notifications into per-day summaries, '
+        'then delete expired and over-quota ones in bounded batches.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age-days', type=int, help='Delete notifications older than this.')
+        parser.add_argument('--max-per-user', type=int, help='Keep at most this many notifications per user.')
+        parser.add_argument('--compact-after-days', type=int, help='Summarize read notifications older than this.')
+        parser.add_argument('--batch-size', type=int, help='Rows deleted per transaction.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows qualify.')
+
+    def handle(self, *args, **options):
+        policy = retention_policy(
+            MAX_AGE_DAYS=options['max_age_days'],
+            MAX_PER_USER=options['max_per_user'],
+            COMPACT_AFTER_DAYS=options['compact_after_days'],
+            BATCH_SIZE=options['batch_size'],
+        )
+        if options['dry_run']:
+            now = timezone.now()
+            compactable = Notification.objects.filter(
+                is_read=True, is_summary=False, created_at__lt=now - timedelta(days=policy['COMPACT_AFTER_DAYS']),
+            ).count()
+            expired = Notification.objects.filter(created_at__lt=now - timedelta(days=policy['MAX_AGE_DAYS'])).count()
+            crowded = (
+                Notification.objects.values('user').annotate(total=Count('pk'))
+                .filter(total__gt=policy['MAX_PER_USER']).count()
+            )
+            self.stdout.write(
+                f'{compactable} notifications would be compacted, {expired} expired, '
+                f'{crowded} users over the {policy["MAX_PER_USER"]} quota.'
+            )
+            return
+
+        result = apply_retention(**policy)
+        self.stdout.write(self.style.SUCCESS(
+            f'Compacted {result["compacted"]}, expired {result["expired"]}, '
+            f'trimmed {result["over_quota"]} over-quota notifications.'
+        ))
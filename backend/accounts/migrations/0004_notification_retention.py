@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_notification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='is_summary',
+            field=models.BooleanField(default=False, verbose_name='خلاصه روزانه'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='summarized_count',
+            field=models.PositiveIntegerField(default=1, verbose_name='تعداد اعلان\u200cهای خلاصه\u200cشده'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at'], name='notification_user_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['is_read', 'created_at'], name='notification_read_age_idx'),
+        ),
+    ]
@@ -8,6 +8,8 @@ class Role(models.Model):
     name = models.CharField(max_length=150, unique=True)
     description = models.TextField(blank=True)
     users = models.ManyToManyField(settings.AUTH_USER_MODEL, blank=True, related_name='roles')
+    # Drives the roles list ETag; membership changes don't alter what RoleSerializer renders
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['id']
@@ -41,9 +43,16 @@ class Notification(models.Model):
     link = models.CharField(max_length=255, null=True, blank=True, verbose_name="لینک مرتبط")
     is_read = models.BooleanField(default=False, verbose_name="خوانده شده")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ایجاد")
+    # Compaction (accounts/retention.py) replaces a day of old read notifications with one summary row
+    is_summary = models.BooleanField(default=False, verbose_name="خلاصه روزانه")
+    summarized_count = models.PositiveIntegerField(default=1, verbose_name="تعداد اعلان‌های خلاصه‌شده")
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notification_user_recent_idx'),
+            models.Index(fields=['is_read', 'created_at'], name='notification_read_age_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} for {self.user.username}"
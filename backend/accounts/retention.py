@@ -0,0 +1,111 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Notification
+
+
+DEFAULT_RETENTION = {
+    'MAX_AGE_DAYS': 180,
+    'MAX_PER_USER': 500,
+    'COMPACT_AFTER_DAYS': 14,
+    'BATCH_SIZE': 1000,
+}
+
+
+def retention_policy(**overrides):
+    policy = {**DEFAULT_RETENTION, **getattr(settings, 'NOTIFICATION_RETENTION', {})}
+    policy.update({key: value for key, value in overrides.items() if value is not None})
+    return policy
+
+
+def delete_in_batches(queryset, batch_size):
+    """Delete ``queryset`` a bounded chunk at a time, each chunk in its own short transaction.
+
+    A single ``DELETE`` over a large selection holds its locks for as long as the
+    whole statement runs; chunks by primary key keep every lock brief.  Returns
+    the number of rows deleted.
+    """
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            pks = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                return deleted
+            count, _ = Notification.objects.filter(pk__in=pks).delete()
+        deleted += count
+
+
+def purge_expired(max_age_days, batch_size):
+    cutoff = timezone.now() - timedelta(days=max_age_days)
+    return delete_in_batches(Notification.objects.filter(created_at__lt=cutoff), batch_size)
+
+
+def purge_over_quota(max_per_user, batch_size):
+    """Keep only the newest ``max_per_user`` notifications of every user."""
+    deleted = 0
+    crowded = (
+        Notification.objects.values('user').annotate(total=Count('pk'))
+        .filter(total__gt=max_per_user).values_list('user', flat=True)
+    )
+    for user_id in crowded:
+        boundary = (
+            Notification.objects.filter(user_id=user_id).order_by('-created_at', '-pk')
+            .values_list('created_at', 'pk')[max_per_user - 1:max_per_user].first()
+        ) if max_per_user else None
+        older = Notification.objects.filter(user_id=user_id)
+        if boundary:
+            created_at, pk = boundary
+            older = older.filter(created_at__lte=created_at).exclude(created_at=created_at, pk__gte=pk)
+        deleted += delete_in_batches(older, batch_size)
+    return deleted
+
+
+def compact_read(older_than_days, batch_size):
+    """Replace each user's read notifications of a past day with one summary row.
+
+    Runs one short transaction per (user, day).  Re-running merges new rows into
+    an existing summary for the same day instead of creating another one.
+    Returns the number of notifications folded into summaries.
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    compactable = Notification.objects.filter(is_read=True, is_summary=False, created_at__lt=cutoff)
+    groups = (
+        compactable.annotate(day=TruncDate('created_at')).values('user', 'day')
+        .annotate(total=Count('pk')).order_by('user', 'day')
+    )
+    tz = timezone.get_current_timezone()
+    folded = 0
+    for group in groups.iterator():
+        start = timezone.make_aware(datetime.combine(group['day'], time.min), tz)
+        day_rows = compactable.filter(user_id=group['user'], created_at__gte=start, created_at__lt=start + timedelta(days=1))
+        with transaction.atomic():
+            summary = Notification.objects.select_for_update().filter(
+                user_id=group['user'], is_summary=True, created_at=start,
+            ).first()
+            count = group['total'] + (summary.summarized_count if summary else 0)
+            if summary is None:
+                summary = Notification(user_id=group['user'], is_summary=True, is_read=True)
+            summary.summarized_count = count
+            summary.title = f"خلاصه اعلان‌های {group['day'].isoformat()}"
+            summary.message = f"{count} اعلان خوانده‌شده در این روز"
+            summary.save()
+            # auto_now_add ignores assigned values on insert; pin the summary to its day
+            Notification.objects.filter(pk=summary.pk).update(created_at=start)
+        folded += delete_in_batches(day_rows, batch_size)
+    return folded
+
+
+def apply_retention(**overrides):
+    """Run compaction, age and per-user limits; returns counts per step."""
+    policy = retention_policy(**overrides)
+    batch_size = policy['BATCH_SIZE']
+    return {
+        'compacted': compact_read(policy['COMPACT_AFTER_DAYS'], batch_size),
+        'expired': purge_expired(policy['MAX_AGE_DAYS'], batch_size),
+        'over_quota': purge_over_quota(policy['MAX_PER_USER'], batch_size),
+    }
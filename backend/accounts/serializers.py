@@ -13,8 +13,8 @@ class RoleSerializer(serializers.ModelSerializer):
 class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
-        fields = ['id', 'title', 'message', 'link', 'is_read', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = ['id', 'title', 'message', 'link', 'is_read', 'created_at', 'is_summary', 'summarized_count']
+        read_only_fields = ['id', 'created_at', 'is_summary', 'summarized_count']
 
 
 class UserRoleSerializer(serializers.Serializer):
@@ -1,8 +1,22 @@
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
 from django.urls import reverse
-from .models import Role
+import json
+import tempfile
+from datetime import timedelta
+from itertools import count, islice
+from pathlib import Path
+from unittest import skipUnless
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from .models import Notification, Role, UserProfile
+from .urls import router as accounts_router
+from .retention import apply_retention, compact_read
+from config.metrics import registry
+from config import compression, renderers
+from config.testing import QueryCountMixin
 
 class AccountsAPITests(APITestCase):
     def setUp(self):
@@ -37,3 +51,269 @@ class AccountsAPITests(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['username'], 'user2')
+
+
+class NotificationRetentionTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user('reader', 'r@test.com', 'pass123')
+        self.other = User.objects.create_user('other', 'o@test.com', 'pass123')
+
+    def _notify(self, user, days_ago, is_read=False, hour=10):
+        notification = Notification.objects.create(user=user, title='t', message='m', is_read=is_read)
+        when = timezone.now().replace(hour=hour, minute=0, second=0, microsecond=0) - timedelta(days=days_ago)
+        Notification.objects.filter(pk=notification.pk).update(created_at=when)
+        return notification.pk
+
+    def test_expired_and_over_quota_notifications_are_purged_in_batches(self):
+        """Old rows and rows beyond the per-user quota go; the newest N stay."""
+        self._notify(self.other, days_ago=400)
+        kept = self._notify(self.other, days_ago=1)
+        newest = [self._notify(self.user, days_ago=day) for day in range(1, 6)]
+
+        result = apply_retention(MAX_AGE_DAYS=180, MAX_PER_USER=3, COMPACT_AFTER_DAYS=30, BATCH_SIZE=2)
+
+        self.assertEqual(result, {'compacted': 0, 'expired': 1, 'over_quota': 2})
+        self.assertEqual(
+            set(Notification.objects.values_list('pk', flat=True)), {kept, *newest[:3]},
+        )
+
+    def test_old_read_notifications_collapse_into_daily_summary(self):
+        """Read rows of one past day become one summary; unread and recent rows are untouched."""
+        for hour in (9, 11, 15):
+            self._notify(self.user, days_ago=20, is_read=True, hour=hour)
+        unread = self._notify(self.user, days_ago=20, hour=12)
+        recent = self._notify(self.user, days_ago=2, is_read=True)
+
+        self.assertEqual(compact_read(older_than_days=14, batch_size=2), 3)
+        # A later straggler for the same day merges into the existing summary
+        self._notify(self.user, days_ago=20, is_read=True, hour=18)
+        self.assertEqual(compact_read(older_than_days=14, batch_size=2), 1)
+
+        summary = Notification.objects.get(user=self.user, is_summary=True)
+        self.assertEqual(summary.summarized_count, 4)
+        self.assertTrue(summary.is_read)
+        self.assertEqual(
+            set(Notification.objects.filter(is_summary=False).values_list('pk', flat=True)), {unread, recent},
+        )
+
+
+class MetricsEndpointTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user('plain', 'p@test.com', 'pass123')
+        self.chief = User.objects.create_user('chief', 'c@test.com', 'pass123')
+        chief_role, _ = Role.objects.get_or_create(code='police_chief', defaults={'name': 'Chief'})
+        chief_role.users.add(self.chief)
+        registry.reset()
+
+    def test_admin_reads_prometheus_text(self):
+        """Requests are counted per URL name with their query histogram; only admins may scrape."""
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(reverse('me')).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.chief)
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('http_requests_total{view="me",method="GET",status="200"} 1', body)
+        self.assertIn('http_request_db_queries_count{view="me",method="GET"} 1', body)
+        self.assertIn('http_request_duration_seconds_bucket{view="me",method="GET",le="+Inf"} 1', body)
+
+    @override_settings(METRICS_SLOW_REQUEST_MS=0)
+    def test_slow_requests_are_logged_with_sql(self):
+        """Above the threshold the request is logged with its statements."""
+        self.client.force_authenticate(self.user)
+        with self.assertLogs('config.metrics', 'WARNING') as logs:
+            self.client.get(reverse('notification-list'))
+        self.assertIn('(notification-list)', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+
+class RequestProfilingTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.admin = User.objects.create_superuser('root', 'root@test.com', 'pass123')
+        self.user = User.objects.create_user('plain', 'p@test.com', 'pass123')
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        overrides = override_settings(PROFILE_ROOT=Path(tmp.name), PROFILE_KEEP=2)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def _get(self, user, url):
+        # JWT, as the frontend sends it: the middleware must identify the caller before DRF does
+        return self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+    def test_superuser_request_is_profiled_and_downloadable(self):
+        """?profile=1 stores a pstats file plus SQL timeline that the superuser can list and fetch."""
+        response = self._get(self.admin, reverse('me') + '?profile=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        profile_id = response['X-Profile-Id']
+
+        listing = self._get(self.admin, reverse('profile-list'))
+        self.assertEqual([p['id'] for p in listing.data], [profile_id])
+        self.assertEqual(listing.data[0]['view'], 'me')
+
+        detail = self._get(self.admin, reverse('profile-detail', args=[profile_id]))
+        self.assertGreater(detail.data['queries'], 0)
+        self.assertIn('SELECT', detail.data['sql'][0]['sql'])
+        self.assertIn('cumulative', detail.data['stats'])
+
+        download = self._get(self.admin, reverse('profile-download', args=[profile_id]))
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+        self.assertGreater(len(b''.join(download.streaming_content)), 0)
+        self.assertEqual(self._get(self.admin, reverse('profile-detail', args=['..x'])).status_code, 404)
+
+    def test_only_superusers_profile_and_ring_buffer_is_bounded(self):
+        """Other users' flags are ignored; older profiles are pruned past PROFILE_KEEP."""
+        response = self._get(self.user, reverse('me') + '?profile=1')
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(self._get(self.user, reverse('profile-list')).status_code, status.HTTP_403_FORBIDDEN)
+
+        token = f'Bearer {AccessToken.for_user(self.admin)}'
+        ids = [
+            self.client.get(reverse('me'), HTTP_X_PROFILE='1', HTTP_AUTHORIZATION=token)['X-Profile-Id']
+            for _ in range(3)
+        ]
+        listing = self._get(self.admin, reverse('profile-list'))
+        self.assertEqual([p['id'] for p in listing.data], ids[:0:-1])
+
+
+class RenderingTests(APITestCase):
+    def setUp(self):
+        Role.objects.bulk_create([
+            Role(code=f'render_{n}', name=f'نقش {n}', description='توضیحات ' * 20) for n in range(40)
+        ])
+
+    def test_fast_renderer_matches_drf(self):
+        """orjson output is byte-for-byte what DRF's encoder produces."""
+        from decimal import Decimal
+        from rest_framework.renderers import JSONRenderer
+
+        data = {
+            'when': timezone.now(), 'amount': Decimal('12.50'), 'counts': {1: 2, 'x': [1.5, None, True]},
+            'name': 'پرونده', 'nested': [{'day': timezone.now().date()}],
+        }
+        self.assertEqual(renderers.FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_invalid_json_is_a_parse_error(self):
+        response = self.client.post(reverse('login'), '{"identifier": ', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(COMPRESSION_MIN_SIZE=1024)
+    def test_gzip_above_threshold_only(self):
+        import gzip
+
+        response = self.client.get(reverse('role-list'), HTTP_ACCEPT_ENCODING='gzip;q=1.0, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(response.content))['count'], Role.objects.count())
+
+        with override_settings(COMPRESSION_MIN_SIZE=10 ** 9):
+            response = self.client.get(reverse('role-list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(self.client.get(reverse('role-list')).has_header('Content-Encoding'))
+
+    @skipUnless(compression.brotli, 'brotli is not installed')
+    def test_brotli_preferred_when_accepted(self):
+        response = self.client.get(reverse('role-list'), HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(json.loads(compression.brotli.decompress(response.content))['count'], Role.objects.count())
+
+    @skipUnless(renderers.msgpack, 'msgpack is not installed')
+    def test_msgpack_negotiation(self):
+        as_json = self.client.get(reverse('role-list')).json()
+        response = self.client.get(reverse('role-list'), HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(renderers.msgpack.unpackb(response.content), as_json)
+
+
+class RoleConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.role = Role.objects.create(code='cached_role', name='Cached')
+
+    def test_roles_revalidate_until_changed(self):
+        """Anonymous role reads are publicly cacheable and answered with 304 while no role changes."""
+        first = self.client.get(reverse('role-list'))
+        self.assertEqual(first['Cache-Control'], 'public, max-age=300')
+        self.assertEqual(self.client.get(reverse('role-list'), HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        detail = self.client.get(reverse('role-detail', args=[self.role.pk]))
+        self.assertEqual(
+            self.client.get(reverse('role-detail', args=[self.role.pk]), HTTP_IF_NONE_MATCH=detail['ETag']).status_code,
+            304,
+        )
+
+        self.role.description = 'changed'
+        self.role.save()
+        changed = self.client.get(reverse('role-list'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+
+@override_settings(THROTTLE_RATES={'login': {'burst': 2, 'sustained': '6/min'}})
+class ThrottlingTests(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        registry.reset()
+
+    def _login(self, ip='10.0.0.1'):
+        return self.client.post(reverse('login'), {'identifier': 'nobody', 'password': 'x'}, REMOTE_ADDR=ip)
+
+    def test_burst_then_sustained_rate_per_ip(self):
+        """Two quick attempts pass, the third waits for a token; other IPs have their own bucket."""
+        from unittest import mock
+
+        with mock.patch('config.throttling.time.time', return_value=1000.0):
+            self.assertNotEqual(self._login().status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertNotEqual(self._login().status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            rejected = self._login()
+            self.assertEqual(rejected.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertEqual(rejected['Retry-After'], '10')
+            self.assertNotEqual(self._login('10.0.0.2').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        with mock.patch('config.throttling.time.time', return_value=1010.0):
+            self.assertNotEqual(self._login().status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertEqual(self._login().status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        self.assertIn('http_throttled_total{scope="login",view="login",client="anon"} 2', registry.render())
+
+    def test_rotating_forwarded_for_does_not_reset_the_bucket(self):
+        """Without trusted proxies the client-supplied X-Forwarded-For is ignored"""
+        from unittest import mock
+
+        with mock.patch('config.throttling.time.time', return_value=1000.0):
+            codes = [
+                self.client.post(
+                    reverse('login'), {'identifier': 'nobody', 'password': 'x'},
+                    REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'203.0.113.{n}',
+                ).status_code
+                for n in range(3)
+            ]
+        self.assertEqual(codes[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class ListQueryCountTests(QueryCountMixin, APITestCase):
+    router = accounts_router
+
+    def setUp(self):
+        super().setUp()
+        self.seq = count()
+
+    def seed_role(self, rows):
+        Role.objects.bulk_create([Role(code=f'qc_role_{n}', name=f'QC {n}') for n in islice(self.seq, rows)])
+
+    def seed_notification(self, rows):
+        Notification.objects.bulk_create([Notification(user=self.qc_user, title='t', message='m') for _ in range(rows)])
+
+    def seed_admin_user(self, rows):
+        users = get_user_model().objects.bulk_create([
+            get_user_model()(username=f'qc_user_{n}', email=f'qc{n}@test.com') for n in islice(self.seq, rows)
+        ])
+        UserProfile.objects.bulk_create([
+            UserProfile(user=user, national_code=f'55{user.pk:08d}', phone=f'0933{user.pk:07d}') for user in users
+        ])
+        Role.objects.get(code='detective').users.add(*users)
@@ -1,5 +1,5 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Max
 from django.shortcuts import get_object_or_404
 from rest_framework import permissions, status, viewsets, filters
 from rest_framework.decorators import action
@@ -16,6 +16,8 @@ from .serializers import (
     NotificationSerializer, AdminUserSerializer
 )
 from .serializers_user_read import UserReadSerializer
+from config.http import ConditionalRetrieveMixin, conditional_response
+from config.query_plans import QueryPlanMixin
 from rest_framework.generics import ListAPIView
 
 
@@ -34,9 +36,20 @@ class IsAdminUser(permissions.BasePermission):
         return request.user.roles.filter(code__in=['police_chief']).exists()
 
 
-class RoleViewSet(viewsets.ModelViewSet):
+class RoleViewSet(ConditionalRetrieveMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Role.objects.all().order_by('id')
     serializer_class = RoleSerializer
+    throttle_scope = 'public_read'
+    # Public and fetched on every page load; clients and proxies revalidate after five minutes
+    detail_cache_control = 'public, max-age=300'
+
+    def list(self, request, *args, **kwargs):
+        roles = Role.objects.aggregate(count=Count('pk'), last=Max('updated_at'))
+        version = ('roles', request.get_full_path(), roles['count'], roles['last'])
+        return conditional_response(
+            request, version, lambda: super(RoleViewSet, self).list(request, *args, **kwargs).data,
+            roles['last'], self.detail_cache_control,
+        )
 
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
@@ -71,6 +84,7 @@ class UserStatsView(APIView):
     """Public endpoint for user statistics."""
     permission_classes = [permissions.AllowAny]
     authentication_classes = []
+    throttle_scope = 'public_stats'
 
     def get(self, request, *args, **kwargs):
         user_model = get_user_model()
@@ -82,6 +96,7 @@ class SystemStatsView(APIView):
     """Provides public statistics for the system home page."""
     permission_classes = [permissions.AllowAny]
     authentication_classes = []
+    throttle_scope = 'public_stats'
 
     def get(self, request, *args, **kwargs):
         from django.contrib.auth import get_user_model
@@ -149,6 +164,7 @@ class RegisterView(CreateAPIView):
 class LoginView(APIView):
     permission_classes = []
     authentication_classes = []
+    throttle_scope = 'login'
 
     def post(self, request, *args, **kwargs):
         identifier = (request.data.get('identifier') or '').strip()
@@ -183,7 +199,7 @@ class LoginView(APIView):
         return redirect('login')
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -204,11 +220,12 @@ class NotificationViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['delete'])
     def clear_all(self, request):
-        Notification.objects.filter(user=self.request.user).delete()
+        from .retention import delete_in_batches, retention_policy
+        delete_in_batches(Notification.objects.filter(user=self.request.user), retention_policy()['BATCH_SIZE'])
         return Response({'status': 'all notifications cleared'}, status=status.HTTP_204_NO_CONTENT)
 
 
-class AdminUserViewSet(viewsets.ModelViewSet):
+class AdminUserViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """Admin panel user management - full CRUD operations."""
     serializer_class = AdminUserSerializer
     permission_classes = [IsAdminUser]
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Case, CrimeScene, SceneWitness
+from django.db import transaction
+from .models import Case, CaseEvent, CrimeScene, SceneWitness
+from .snapshots import TERMINAL_STATUSES, freeze_case, thaw_case
 
 class SceneInline(admin.StackedInline): model = CrimeScene
 @admin.register(Case)
@@ -7,3 +9,20 @@ class CaseAdmin(admin.ModelAdmin):
     list_display = ('id', 'title', 'get_status_display', 'get_crime_level_display', 'creator')
     list_filter = ('status', 'crime_level')
     inlines = [SceneInline]
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Edits here bypass the transition engine, so keep the closed-case snapshot in step
+        if change and obj.status in TERMINAL_STATUSES:
+            transaction.on_commit(lambda: freeze_case(obj.pk))
+        elif change and 'status' in form.changed_data:
+            thaw_case(obj.pk)
+
+@admin.register(CaseEvent)
+class CaseEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'case', 'kind', 'from_status', 'to_status', 'actor', 'created_at')
+    list_filter = ('kind',)
+
+    # The log is append-only; history is never edited from the admin
+    def has_change_permission(self, request, obj=None):
+        return False
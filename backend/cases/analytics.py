@@ -0,0 +1,129 @@
+"""Time-series views of case activity for dashboards.
+
+Daily counts come from the ``CaseDailyStat`` rollup (one GROUP BY over at
+most a few rows per day) and crime-scene occurrence patterns from an indexed
+range over ``CrimeScene.occurrence_time`` with hour/weekday extracted in SQL.
+Densifying, moving averages and histograms are vectorized with NumPy when it
+is installed; the pure-Python fallback returns the same numbers.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q, Sum
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay
+from django.utils import timezone
+
+from .models import Case, CaseDailyStat, CrimeScene
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+GROUPINGS = {'crime_level': Case.CrimeLevel, 'status': Case.Status}
+METRICS = ('opened', 'entered')
+
+
+def dense_series(rows, start, days):
+    """``{key: [count per day]}`` from sparse ``(day, key, count)`` rows, zero-filled over ``days`` days."""
+    if np is not None:
+        rows = list(rows)
+        keys = sorted({key for _, key, _ in rows})
+        grid = np.zeros((len(keys), days), dtype=np.int64)
+        if rows:
+            index = {key: position for position, key in enumerate(keys)}
+            dates, row_keys, counts = zip(*rows)
+            offsets = np.array([(day - start).days for day in dates])
+            np.add.at(grid, (np.array([index[key] for key in row_keys]), offsets), np.array(counts))
+        return {key: grid[position].tolist() for position, key in enumerate(keys)}
+
+    series = {}
+    for day, key, count in rows:
+        series.setdefault(key, [0] * days)[(day - start).days] += count
+    return dict(sorted(series.items()))
+
+
+def moving_average(values, window):
+    """Trailing mean over ``window`` points; the first points average what is available so far."""
+    if not values:
+        return []
+    if np is not None:
+        sums = np.cumsum(np.asarray(values, dtype=np.float64))
+        sums[window:] = sums[window:] - sums[:-window]
+        sizes = np.minimum(np.arange(1, len(values) + 1), window)
+        return np.round(sums / sizes, 2).tolist()
+
+    averages, total = [], 0
+    for position, value in enumerate(values):
+        total += value
+        if position >= window:
+            total -= values[position - window]
+        averages.append(round(total / min(position + 1, window), 2))
+    return averages
+
+
+def occurrence_histogram(hours_and_weekdays):
+    """Counts by hour (0-23), ISO weekday (index 0 = Monday) and a weekday x hour grid."""
+    if np is not None:
+        pairs = np.array(list(hours_and_weekdays), dtype=np.int64).reshape(-1, 2)
+        grid = np.bincount((pairs[:, 1] - 1) * 24 + pairs[:, 0], minlength=7 * 24).reshape(7, 24)
+        return {
+            'by_hour': grid.sum(axis=0).tolist(),
+            'by_weekday': grid.sum(axis=1).tolist(),
+            'weekday_hour': grid.tolist(),
+        }
+
+    grid = [[0] * 24 for _ in range(7)]
+    for hour, weekday in hours_and_weekdays:
+        grid[weekday - 1][hour] += 1
+    return {
+        'by_hour': [sum(row[hour] for row in grid) for hour in range(24)],
+        'by_weekday': [sum(row) for row in grid],
+        'weekday_hour': grid,
+    }
+
+
+def case_timeseries(start, end, group_by='crime_level', metric='opened', window=7):
+    """Daily ``metric`` counts between ``start`` and ``end`` (inclusive dates), split by ``group_by``."""
+    days = (end - start).days + 1
+    rows = (
+        CaseDailyStat.objects.filter(day__range=(start, end))
+        .values_list('day', group_by)
+        .annotate(count=Sum(metric))
+        .order_by()
+    )
+    series = dense_series(rows, start, days)
+    labels = dict(GROUPINGS[group_by].choices)
+    return {
+        'days': [(start + timedelta(days=offset)).isoformat() for offset in range(days)],
+        'series': [
+            {
+                'key': key,
+                'label': labels.get(key, key),
+                'counts': counts,
+                'moving_average': moving_average(counts, window),
+                'total': sum(counts),
+            }
+            for key, counts in series.items()
+        ],
+    }
+
+
+def occurred_between(start, end):
+    """Q for scenes that occurred on local dates ``start`` to ``end`` inclusive, as an index range."""
+    tz = timezone.get_current_timezone()
+    return Q(
+        occurrence_time__gte=timezone.make_aware(datetime.combine(start, time.min), tz),
+        occurrence_time__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz),
+    )
+
+
+def occurrence_patterns(start, end):
+    """Hour/weekday histograms of crime scenes that occurred between ``start`` and ``end`` (inclusive dates)."""
+    scenes = (
+        CrimeScene.objects
+        .filter(occurred_between(start, end))
+        .annotate(hour=ExtractHour('occurrence_time'), weekday=ExtractIsoWeekDay('occurrence_time'))
+        .values_list('hour', 'weekday')
+    )
+    return occurrence_histogram(scenes)
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class CasesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'cases'
\ No newline at end of file
+    name = 'cases'
+
+    def ready(self):
+        import cases.signals
@@ -0,0 +1,168 @@
+import json
+import zlib
+from datetime import timedelta
+
+from django.apps import apps
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import QuerySet
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from .models import ArchivedCase, Case, CaseDossier, CaseSnapshot
+from .snapshots import TERMINAL_STATUSES
+from .visibility import can_see_archived, case_visibility
+
+
+# Derived caches are rebuilt on demand, so they are dropped instead of archived
+SKIPPED_MODELS = (CaseDossier, CaseSnapshot)
+
+
+class _ArchiveCollector(Collector):
+    """Collects every row a case delete would cascade to, as instances (no fast deletes)."""
+
+    def can_fast_delete(self, *args, **kwargs):
+        return False
+
+
+def _pack(data):
+    return zlib.compress(json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode(), 6)
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(bytes(blob)))
+
+
+def _case_notifications(case_id):
+    from accounts.models import Notification
+    return Notification.objects.filter(link=f'/cases/{case_id}')
+
+
+def archived_rows(archived):
+    """The serialized rows (``serializers.serialize('python')`` dicts) kept in an ArchivedCase."""
+    return _unpack(archived.rows)
+
+
+def archivable_cases(older_than_days):
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    return Case.objects.filter(status__in=TERMINAL_STATUSES, updated_at__lt=cutoff)
+
+
+def archive_case(case):
+    """Move one closed case and everything hanging off it into ArchivedCase; call inside a transaction."""
+    from .dossier import build_trial_history, dossier_path
+    from .snapshots import load_snapshot
+
+    trial_history = load_snapshot(case, 'trial_history') or build_trial_history(case)
+
+    collector = _ArchiveCollector(using=DEFAULT_DB_ALIAS)
+    collector.collect([case])
+    collector.sort()
+
+    rows = []
+    # Deletion order is children first; restoring needs parents first
+    for model in reversed(list(collector.data)):
+        if model._meta.auto_created or issubclass(model, SKIPPED_MODELS):
+            # Auto-created M2M through rows are restored from the owning model's m2m field
+            continue
+        instances = sorted(collector.data[model], key=lambda obj: obj.pk)
+        rows.extend(serializers.serialize('python', instances))
+    notifications = list(_case_notifications(case.pk))
+    rows.extend(serializers.serialize('python', notifications))
+
+    detached = []
+    for (field, value), batches in collector.field_updates.items():
+        pairs = []
+        for batch in batches:
+            if isinstance(batch, QuerySet):
+                pairs.extend(batch.values_list('pk', field.attname))
+            else:
+                pairs.extend((obj.pk, getattr(obj, field.attname)) for obj in batch)
+        if pairs:
+            detached.append([field.model._meta.label, field.attname, [list(pair) for pair in pairs]])
+
+    ArchivedCase.objects.create(
+        case_id=case.pk,
+        title=case.title,
+        crime_level=case.crime_level,
+        **case_visibility(case),
+        closed_at=case.updated_at,
+        trial_history=_pack(trial_history),
+        rows=_pack(rows),
+        row_count=len(rows),
+        detached_refs=detached,
+    )
+
+    dossier_files = [dossier_path(d) for d in case.dossiers.exclude(file_name='')]
+    _case_notifications(case.pk).delete()
+    case.delete()
+    transaction.on_commit(lambda: [path.unlink(missing_ok=True) for path in dossier_files])
+
+
+def archive_closed_cases(older_than_days, batch_size=50, limit=None):
+    """Archive closed cases untouched for ``older_than_days``, one transaction per batch.
+
+    Yields the number archived per batch so callers can report progress.
+    Each batch re-checks the status under a row lock, so a case reopened
+    while the job runs stays hot.
+    """
+    archived = 0
+    while limit is None or archived < limit:
+        size = batch_size if limit is None else min(batch_size, limit - archived)
+        ids = list(archivable_cases(older_than_days).order_by('pk').values_list('pk', flat=True)[:size])
+        if not ids:
+            return
+        with transaction.atomic():
+            batch = list(archivable_cases(older_than_days).select_for_update().filter(pk__in=ids))
+            for case in batch:
+                archive_case(case)
+        archived += len(batch)
+        yield len(batch)
+        if not batch:
+            return
+
+
+@transaction.atomic
+def restore_case(case_id):
+    """Put an archived case and its dependents back into the hot tables with their original ids.
+
+    Rows are saved raw, as stored: a migration that adds a derived or auto_now
+    column must also fill it into the ArchivedCase rows (see cases 0016).
+    """
+    archived = ArchivedCase.objects.select_for_update().get(case_id=case_id)
+    rows = archived_rows(archived)
+    touched = {}
+    for restored in serializers.deserialize('python', rows, handle_forward_references=True):
+        restored.save()
+        touched.setdefault(type(restored.object), []).append(restored.object.pk)
+
+    # Restored rows keep their old updated_at; move it so delta-sync clients pick them up again
+    now = timezone.now()
+    for model, pks in touched.items():
+        if any(getattr(field, 'auto_now', False) and field.name == 'updated_at' for field in model._meta.local_fields):
+            model._default_manager.filter(pk__in=pks).update(updated_at=now)
+
+    for label, attname, pairs in archived.detached_refs:
+        model = apps.get_model(label)
+        for pk, value in pairs:
+            # Only re-link rows nobody has pointed elsewhere in the meantime
+            model._default_manager.filter(pk=pk, **{attname: None}).update(**{attname: value})
+
+    archived.delete()
+    return Case.objects.get(pk=case_id)
+
+
+def find_archived(case_id, user):
+    """The ArchivedCase for ``case_id`` if it exists and ``user`` may see it."""
+    try:
+        archived = ArchivedCase.objects.defer('rows').get(case_id=case_id)
+    except (ArchivedCase.DoesNotExist, ValueError):
+        return None
+    return archived if can_see_archived(user, archived) else None
+
+
+def archived_trial_history(archived):
+    data = _unpack(archived.trial_history)
+    data['archived'] = {'archived_at': archived.archived_at, 'closed_at': archived.closed_at}
+    return data
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Case, CaseDossier
+
+
+logger = logging.getLogger(__name__)
+
+# A build that has not finished after this long is assumed to have died with its worker
+STALE_BUILD_AFTER = timedelta(minutes=15)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def build_trial_history(case):
+    """Aggregate all case data for the Judge's/Chief's review (Section 6.4 + Report)"""
+    from evidence.models import Evidence
+    from evidence.serializers import EvidenceBaseSerializer
+    from investigation.models import Interrogation, Suspect, Verdict
+    from investigation.serializers import SuspectSerializer, VerdictSerializer
+    from .serializers import CaseComplainantSerializer, CaseSerializer, WitnessSerializer
+
+    # 1. Base case info
+    data = {
+        'case': CaseSerializer(case).data,
+        'evidence': [],
+        'suspects': [],
+        'verdicts': [],
+        'officers_involved': [],
+        'complainants': [],
+        'witnesses': []
+    }
+
+    # 2. Get All Evidence
+    evidence_objs = Evidence.objects.filter(case=case)
+    data['evidence'] = EvidenceBaseSerializer(evidence_objs, many=True).data
+
+    # 3. Get All Suspects & Interrogations
+    suspects_objs = Suspect.objects.filter(case=case)
+    data['suspects'] = SuspectSerializer(suspects_objs, many=True).data
+
+    # 4. Get Existing Verdicts
+    verdicts = Verdict.objects.filter(case=case)
+    data['verdicts'] = VerdictSerializer(verdicts, many=True).data
+
+    # 5. Complainants
+    data['complainants'] = CaseComplainantSerializer(case.complainant_details.all(), many=True).data
+
+    # 6. Witnesses
+    if hasattr(case, 'scene_data'):
+        data['witnesses'] = WitnessSerializer(case.scene_data.witnesses.all(), many=True).data
+
+    # 7. Involved People (with detail)
+    involved_users = set()
+    if case.creator:
+        involved_users.add(case.creator)
+
+    for ev in evidence_objs:
+        if ev.recorder:
+            involved_users.add(ev.recorder)
+
+    for s in suspects_objs:
+        interrogations = Interrogation.objects.filter(suspect=s)
+        for i in interrogations:
+            if i.interrogator:
+                involved_users.add(i.interrogator)
+            if i.supervisor:
+                involved_users.add(i.supervisor)
+
+    detail_involved = []
+    for u in involved_users:
+        detail_involved.append({
+            'username': u.username,
+            'full_name': u.get_full_name(),
+            'roles': [r.name for r in u.roles.all()],
+            'is_staff': u.is_staff
+        })
+    data['officers_involved'] = detail_involved
+
+    return data
+
+
+def dossier_version(case):
+    """Fingerprint of everything that goes into a dossier.
+
+    Built from the ``updated_at`` high-water marks and row counts of every table
+    the dossier renders: an edit or an insert moves the high-water mark and a
+    delete changes the count, while an unchanged case keeps hitting the same
+    cached ZIP.  Bulk ``update()`` calls on these tables must set ``updated_at``.
+    """
+    from evidence.models import Evidence, EvidenceImage
+    from investigation.models import Interrogation, InterrogationFeedback, Suspect, Verdict
+    from .models import CrimeScene, SceneWitness
+
+    tables = [
+        Evidence.objects.filter(case=case),
+        EvidenceImage.objects.filter(evidence__case=case),
+        Suspect.objects.filter(case=case),
+        Verdict.objects.filter(case=case),
+        Interrogation.objects.filter(suspect__case=case),
+        InterrogationFeedback.objects.filter(interrogation__suspect__case=case),
+        case.complainant_details.all(),
+        CrimeScene.objects.filter(case=case),
+        SceneWitness.objects.filter(scene__case=case),
+    ]
+    parts = [Case.objects.filter(pk=case.pk).values_list('updated_at', flat=True).first()]
+    parts += [rows.aggregate(n=Count('pk'), last=Max('updated_at')) for rows in tables]
+    return hashlib.sha1(json.dumps(parts, default=str, sort_keys=True).encode()).hexdigest()
+
+
+def dossier_path(dossier):
+    return Path(settings.DOSSIER_ROOT) / dossier.file_name
+
+
+def request_dossier(case, user=None):
+    """Return the dossier for the case's current version, scheduling a build when there is none."""
+    version = dossier_version(case)
+    try:
+        with transaction.atomic():
+            dossier, created = CaseDossier.objects.get_or_create(
+                case=case, version=version, defaults={'requested_by': user if user and user.is_authenticated else None},
+            )
+    except IntegrityError:
+        # Another request created it between our SELECT and INSERT
+        dossier, created = CaseDossier.objects.get(case=case, version=version), False
+
+    stale = (
+        dossier.status in (CaseDossier.Status.PENDING, CaseDossier.Status.BUILDING)
+        and dossier.created_at < timezone.now() - STALE_BUILD_AFTER
+    )
+    missing = dossier.status == CaseDossier.Status.READY and not dossier_path(dossier).exists()
+    retry = dossier.status == CaseDossier.Status.FAILED or stale or missing
+    if retry:
+        # Only one of several concurrent retries wins the reset
+        retry = CaseDossier.objects.filter(pk=dossier.pk, status=dossier.status).update(
+            status=CaseDossier.Status.PENDING, error='', created_at=timezone.now(),
+        )
+        dossier.refresh_from_db()
+    if created or retry:
+        transaction.on_commit(lambda: _schedule(dossier.pk))
+    return dossier
+
+
+def _schedule(dossier_id):
+    global _executor
+    if not getattr(settings, 'DOSSIER_BUILD_ASYNC', True):
+        build_dossier(dossier_id)
+        return
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='dossier')
+    _executor.submit(_build_in_worker, dossier_id)
+
+
+def _build_in_worker(dossier_id):
+    close_old_connections()
+    try:
+        build_dossier(dossier_id)
+    finally:
+        close_old_connections()
+
+
+def _add_file(archive, field_file, arcname):
+    if not field_file:
+        return
+    try:
+        with field_file.storage.open(field_file.name, 'rb') as source, \
+                archive.open(arcname, 'w', force_zip64=True) as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+    except FileNotFoundError:
+        logger.warning('Dossier: %s is missing from storage, skipped', field_file.name)
+
+
+def build_dossier(dossier_id):
+    """Write the dossier ZIP to a temporary file and move it into place once complete."""
+    from evidence.models import EvidenceImage, WitnessTestimony
+
+    claimed = CaseDossier.objects.filter(pk=dossier_id, status=CaseDossier.Status.PENDING).update(
+        status=CaseDossier.Status.BUILDING,
+    )
+    if not claimed:
+        return
+    dossier = CaseDossier.objects.select_related('case').get(pk=dossier_id)
+    case = dossier.case
+    root = Path(settings.DOSSIER_ROOT)
+    root.mkdir(parents=True, exist_ok=True)
+    file_name = f'case-{case.pk}-{dossier.version}.zip'
+    partial = root / f'{file_name}.{dossier.pk}.part'
+
+    try:
+        history = build_trial_history(case)
+        with zipfile.ZipFile(partial, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+            archive.writestr(
+                'trial_history.json',
+                json.dumps(history, ensure_ascii=False, indent=2, default=str),
+                compress_type=zipfile.ZIP_DEFLATED,
+            )
+            # Images and media are already compressed; store them as-is
+            for image in EvidenceImage.objects.filter(evidence__case=case).order_by('pk').iterator():
+                _add_file(archive, image.image, f'evidence/{image.evidence_id}/{image.pk}-{os.path.basename(image.image.name)}')
+            for testimony in WitnessTestimony.objects.filter(case=case).exclude(media='').order_by('pk').iterator():
+                _add_file(archive, testimony.media, f'witness/{testimony.pk}/{os.path.basename(testimony.media.name)}')
+        os.replace(partial, root / file_name)
+    except Exception as exc:
+        logger.exception('Building dossier %s failed', dossier_id)
+        partial.unlink(missing_ok=True)
+        CaseDossier.objects.filter(pk=dossier_id).update(
+            status=CaseDossier.Status.FAILED, error=str(exc)[:2000], finished_at=timezone.now(),
+        )
+        return
+
+    CaseDossier.objects.filter(pk=dossier_id).update(
+        status=CaseDossier.Status.READY, file_name=file_name,
+        size=(root / file_name).stat().st_size, finished_at=timezone.now(),
+    )
+
+    # Older versions of this case's dossier are never served again
+    finished = [CaseDossier.Status.READY, CaseDossier.Status.FAILED]
+    for old in CaseDossier.objects.filter(case=case, status__in=finished).exclude(pk=dossier_id):
+        if old.file_name and old.file_name != file_name:
+            dossier_path(old).unlink(missing_ok=True)
+        old.delete()
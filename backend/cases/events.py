@@ -0,0 +1,33 @@
+from .models import CaseEvent
+
+
+def _actor(user):
+    # Payment-gateway callbacks run as AnonymousUser
+    return user if user is not None and user.is_authenticated else None
+
+
+def record_case_event(case_id, kind, actor=None, **fields):
+    return CaseEvent.objects.create(case_id=case_id, kind=kind, actor=_actor(actor), **fields)
+
+
+def record_case_events(rows, kind, actor=None, **fields):
+    """One event per ``(case_id, object_id)`` in ``rows`` with a single INSERT."""
+    actor = _actor(actor)
+    return CaseEvent.objects.bulk_create([
+        CaseEvent(case_id=case_id, object_id=object_id, kind=kind, actor=actor, **fields)
+        for case_id, object_id in rows
+    ])
+
+
+def event_feed(queryset, after=None, limit=100):
+    """Keyset page of ``queryset`` ordered by id: events with ``id > after``.
+
+    Event ids only grow, so the last id of a page is the cursor for the next one
+    and both the per-case and the global feed are a single index range scan.
+    """
+    if after:
+        queryset = queryset.filter(pk__gt=after)
+    events = list(queryset.select_related('actor').order_by('pk')[:limit + 1])
+    has_more = len(events) > limit
+    events = events[:limit]
+    return events, (events[-1].pk if events else after), has_more
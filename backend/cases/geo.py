@@ -0,0 +1,193 @@
+"""Crime-scene coordinates: geohash index, bounding-box / radius lookups and hotspots.
+
+Every scene with coordinates stores its geohash, so nearby scenes share a
+prefix.  A bounding box is covered by a handful of geohash cells and each
+cell becomes an index range (``geohash >= cell AND geohash < cell + '{'``);
+the exact latitude/longitude test then runs on that small candidate set.
+Radius queries search the enclosing box and keep the points within the
+great-circle distance, vectorized with NumPy when it is installed.
+
+Hotspots are a grid density: scenes are grouped by a geohash prefix in SQL
+and the densest cells are returned with their centroid.  Everything is
+computed locally; no geocoding or map service is involved.
+"""
+import math
+
+from django.db.models import Avg, Count, Q
+from django.db.models.functions import Substr
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+EARTH_RADIUS_KM = 6371.0088
+# Sorts after every geohash character, so cell + '{' bounds the cell's prefix range
+PREFIX_END = '{'
+
+
+def scene_coordinates(data):
+    """``(latitude, longitude)`` floats from request data, ``(None, None)`` when neither is given.
+
+    Raises ValueError for a lone or out-of-range coordinate.
+    """
+    latitude, longitude = data.get('latitude'), data.get('longitude')
+    if latitude in (None, '') and longitude in (None, ''):
+        return None, None
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        raise ValueError('latitude and longitude must both be numbers.')
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError('latitude must be within [-90, 90] and longitude within [-180, 180].')
+    return latitude, longitude
+
+
+def parse_bbox(value):
+    """``'south,west,north,east'`` -> floats; raises ValueError for malformed or inverted boxes."""
+    try:
+        south, west, north, east = (float(part) for part in value.split(','))
+    except ValueError:
+        raise ValueError('bbox must be south,west,north,east.')
+    if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+        raise ValueError('bbox must satisfy -90 <= south <= north <= 90 and -180 <= west <= east <= 180.')
+    return south, west, north, east
+
+
+def encode(latitude, longitude, precision=12):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        value, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(height, width) in degrees of a geohash cell of ``precision`` characters."""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 - lon_bits
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def cell_bounds(cell):
+    """(south, west, north, east) of a geohash cell."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in cell:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bounds = lon_range if even else lat_range
+            middle = (bounds[0] + bounds[1]) / 2
+            if value >> shift & 1:
+                bounds[0] = middle
+            else:
+                bounds[1] = middle
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def _steps(low, high, step):
+    value = low
+    while value < high:
+        yield value
+        value += step
+    yield high
+
+
+def cover(south, west, north, east, max_cells=32):
+    """The fewest-but-finest geohash cells (at most ``max_cells``) covering the box."""
+    for precision in range(8, 0, -1):
+        height, width = cell_size(precision)
+        if (math.floor(north / height) - math.floor(south / height) + 1) * \
+                (math.floor(east / width) - math.floor(west / width) + 1) <= max_cells:
+            break
+    return sorted({
+        encode(lat, lon, precision)
+        for lat in _steps(south, north, height)
+        for lon in _steps(west, east, width)
+    })
+
+
+def bbox_filter(south, west, north, east):
+    """Q matching scenes inside the box, led by index ranges over the geohash cells covering it."""
+    cells = Q()
+    for cell in cover(south, west, north, east):
+        cells |= Q(geohash__gte=cell, geohash__lt=cell + PREFIX_END)
+    return cells & Q(latitude__range=(south, north), longitude__range=(west, east))
+
+
+def radius_bbox(latitude, longitude, radius_km):
+    """The (south, west, north, east) box enclosing a circle, clamped to valid coordinates."""
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(latitude))
+    delta_lon = 180.0 if cos_lat < 1e-9 else min(180.0, delta_lat / cos_lat)
+    return (
+        max(-90.0, latitude - delta_lat), max(-180.0, longitude - delta_lon),
+        min(90.0, latitude + delta_lat), min(180.0, longitude + delta_lon),
+    )
+
+
+def distances_km(latitude, longitude, points):
+    """Haversine distances from one point to each ``(latitude, longitude)`` in ``points``."""
+    if np is not None:
+        coords = np.radians(np.asarray(points, dtype=np.float64).reshape(-1, 2))
+        lat0, lon0 = math.radians(latitude), math.radians(longitude)
+        a = (
+            np.sin((coords[:, 0] - lat0) / 2) ** 2
+            + math.cos(lat0) * np.cos(coords[:, 0]) * np.sin((coords[:, 1] - lon0) / 2) ** 2
+        )
+        return (2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))).tolist()
+
+    lat0, lon0 = math.radians(latitude), math.radians(longitude)
+    result = []
+    for lat, lon in points:
+        lat, lon = math.radians(lat), math.radians(lon)
+        a = math.sin((lat - lat0) / 2) ** 2 + math.cos(lat0) * math.cos(lat) * math.sin((lon - lon0) / 2) ** 2
+        result.append(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0))))
+    return result
+
+
+def within_radius(scenes, latitude, longitude, radius_km):
+    """``(scene, distance_km)`` for the scenes of ``scenes`` within the radius, nearest first."""
+    candidates = list(scenes.filter(bbox_filter(*radius_bbox(latitude, longitude, radius_km))))
+    distances = distances_km(latitude, longitude, [(scene.latitude, scene.longitude) for scene in candidates])
+    return sorted(
+        ((scene, distance) for scene, distance in zip(candidates, distances) if distance <= radius_km),
+        key=lambda pair: pair[1],
+    )
+
+
+def hotspots(scenes, precision=6, min_count=2, limit=50):
+    """Densest geohash cells of ``scenes``: count, centroid and bounds per cell."""
+    cells = (
+        scenes.exclude(geohash='')
+        .annotate(cell=Substr('geohash', 1, precision))
+        .values('cell')
+        .annotate(count=Count('pk'), latitude=Avg('latitude'), longitude=Avg('longitude'))
+        .filter(count__gte=min_count)
+        .order_by('-count', 'cell')[:limit]
+    )
+    return [
+        {
+            'geohash': row['cell'],
+            'count': row['count'],
+            'latitude': round(row['latitude'], 6),
+            'longitude': round(row['longitude'], 6),
+            'bounds': cell_bounds(row['cell']),
+        }
+        for row in cells
+    ]
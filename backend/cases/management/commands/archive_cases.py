@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from cases.archive import archivable_cases, archive_closed_cases
+
+
+class Command(BaseCommand):
+    help = 'Move SOLVED/CANCELLED cases (and all their related rows) untouched for N days into the archive table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=365)
+        parser.add_argument('--batch-size', type=int, default=50, help='Cases per transaction.')
+        parser.add_argument('--limit', type=int, help='Stop after archiving this many cases.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many cases qualify.')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = archivable_cases(options['older_than_days']).count()
+            self.stdout.write(f'{count} cases would be archived.')
+            return
+
+        total = 0
+        for archived in archive_closed_cases(
+            options['older_than_days'], batch_size=options['batch_size'], limit=options['limit'],
+        ):
+            total += archived
+            self.stdout.write(f'Archived {total} cases so far...')
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} cases.'))
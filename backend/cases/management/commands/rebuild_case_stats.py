@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from cases.rollups import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily case rollup behind /api/analytics/timeseries/ (e.g. after generate_load_data).'
+
+    def handle(self, *args, **options):
+        count = rebuild_daily_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} daily rollup rows.'))
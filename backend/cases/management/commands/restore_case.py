@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from cases.archive import restore_case
+from cases.models import ArchivedCase
+
+
+class Command(BaseCommand):
+    help = 'Move archived cases back into the live tables with their original ids.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('case_ids', nargs='+', type=int)
+
+    def handle(self, *args, **options):
+        for case_id in options['case_ids']:
+            try:
+                case = restore_case(case_id)
+            except ArchivedCase.DoesNotExist:
+                raise CommandError(f'Case {case_id} is not archived.')
+            self.stdout.write(self.style.SUCCESS(f'Restored case {case.pk}: {case.title}'))
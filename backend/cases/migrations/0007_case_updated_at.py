@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0006_alter_case_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='case',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('cases', '0007_case_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('created', 'ثبت پرونده'), ('status', 'تغییر وضعیت پرونده'), ('suspect_status', 'تغییر وضعیت مظنون'), ('warrant', 'تصمیم درباره حکم جلب'), ('interrogation', 'نظر بر بازجویی'), ('verdict', 'صدور حکم'), ('payment', 'پرداخت')], max_length=20)),
+                ('from_status', models.CharField(blank=True, default='', max_length=20)),
+                ('to_status', models.CharField(blank=True, default='', max_length=20)),
+                ('object_id', models.BigIntegerField(blank=True, null=True)),
+                ('notes', models.TextField(blank=True, default='')),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='case_events', to=settings.AUTH_USER_MODEL)),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='cases.case')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['case', 'id'], name='case_event_feed_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('cases', '0008_caseevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseDossier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.CharField(max_length=40)),
+                ('status', models.CharField(choices=[('PENDING', 'در صف ساخت'), ('BUILDING', 'در حال ساخت'), ('READY', 'آماده'), ('FAILED', 'ناموفق')], default='PENDING', max_length=10)),
+                ('file_name', models.CharField(blank=True, max_length=255)),
+                ('size', models.BigIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dossiers', to='cases.case')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='casedossier',
+            constraint=models.UniqueConstraint(fields=('case', 'version'), name='unique_case_dossier_version'),
+        ),
+    ]
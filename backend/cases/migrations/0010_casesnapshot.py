@@ -0,0 +1,25 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0009_casedossier'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PT', 'در انتظار بررسی کارآموز'), ('PO', 'در انتظار تایید افسر'), ('AC', 'در جریان'), ('IP', 'در حال دستگیری متهم'), ('PS', 'در انتظار تایید گروهبان (حل پرونده)'), ('PC', 'در انتظار تایید نهایی رئیس پلیس'), ('RE', 'نیازمند اصلاح توسط شاکی'), ('CA', 'باطل شده'), ('SO', 'مختومه')], max_length=2)),
+                ('detail', models.BinaryField()),
+                ('trial_history', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('case', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='snapshot', to='cases.case')),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0010_casesnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedCase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('case_id', models.BigIntegerField(unique=True)),
+                ('title', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('PT', 'در انتظار بررسی کارآموز'), ('PO', 'در انتظار تایید افسر'), ('AC', 'در جریان'), ('IP', 'در حال دستگیری متهم'), ('PS', 'در انتظار تایید گروهبان (حل پرونده)'), ('PC', 'در انتظار تایید نهایی رئیس پلیس'), ('RE', 'نیازمند اصلاح توسط شاکی'), ('CA', 'باطل شده'), ('SO', 'مختومه')], max_length=2)),
+                ('crime_level', models.IntegerField(choices=[(3, 'سطح ۳ (جرائم خرد)'), (2, 'سطح ۲ (جرائم بزرگ)'), (1, 'سطح ۱ (جرائم کلان)'), (0, 'سطح بحرانی')])),
+                ('creator_id', models.BigIntegerField(blank=True, null=True)),
+                ('complainant_ids', models.JSONField(blank=True, default=list)),
+                ('judge_visible', models.BooleanField(default=False)),
+                ('closed_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('trial_history', models.BinaryField()),
+                ('rows', models.BinaryField()),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('detached_refs', models.JSONField(blank=True, default=list)),
+            ],
+        ),
+    ]
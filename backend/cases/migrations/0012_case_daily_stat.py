@@ -0,0 +1,77 @@
+# Generated by Django 4.2.27 on 2026-10-19 17:22
+
+from django.db import migrations, models
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, NullIf, TruncDate
+
+
+CASE_STATUSES = ['PT', 'PO', 'AC', 'IP', 'PS', 'PC', 'RE', 'CA', 'SO']
+
+
+def backfill_daily_stats(apps, schema_editor):
+    # Same computation as cases.rollups.rebuild_daily_stats at the time of this migration
+    Case = apps.get_model('cases', 'Case')
+    CaseEvent = apps.get_model('cases', 'CaseEvent')
+    CaseDailyStat = apps.get_model('cases', 'CaseDailyStat')
+
+    opening_status = CaseEvent.objects.filter(case=OuterRef('pk'), kind='created').order_by('pk').values('to_status')
+    first_move = CaseEvent.objects.filter(case=OuterRef('pk'), kind='status').order_by('pk').values('from_status')
+    opened = (
+        Case.objects
+        .annotate(
+            day=TruncDate('created_at'),
+            initial=Coalesce(Subquery(opening_status[:1]), NullIf(Subquery(first_move[:1]), Value('')), 'status'),
+            logged=Exists(opening_status),
+        )
+        .values_list('day', 'crime_level', 'initial')
+        .annotate(count=Count('pk'), unlogged=Count('pk', filter=Q(logged=False)))
+        .order_by()
+    )
+    entered = (
+        CaseEvent.objects
+        .filter(kind__in=['created', 'status'], to_status__in=CASE_STATUSES)
+        .exclude(from_status=F('to_status'))
+        .annotate(day=TruncDate('created_at'))
+        .values_list('day', 'case__crime_level', 'to_status')
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+
+    rows = {}
+    for day, level, status, count, unlogged in opened:
+        row = rows.setdefault((day, level, status), CaseDailyStat(day=day, crime_level=level, status=status))
+        row.opened, row.entered = count, unlogged
+    for day, level, status, count in entered:
+        rows.setdefault((day, level, status), CaseDailyStat(day=day, crime_level=level, status=status)).entered += count
+    CaseDailyStat.objects.bulk_create(rows.values(), batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0011_archivedcase'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('crime_level', models.IntegerField(choices=[(3, 'سطح ۳ (جرائم خرد)'), (2, 'سطح ۲ (جرائم بزرگ)'), (1, 'سطح ۱ (جرائم کلان)'), (0, 'سطح بحرانی')])),
+                ('status', models.CharField(choices=[('PT', 'در انتظار بررسی کارآموز'), ('PO', 'در انتظار تایید افسر'), ('AC', 'در جریان'), ('IP', 'در حال دستگیری متهم'), ('PS', 'در انتظار تایید گروهبان (حل پرونده)'), ('PC', 'در انتظار تایید نهایی رئیس پلیس'), ('RE', 'نیازمند اصلاح توسط شاکی'), ('CA', 'باطل شده'), ('SO', 'مختومه')], max_length=2)),
+                ('opened', models.PositiveIntegerField(default=0)),
+                ('entered', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='crimescene',
+            name='occurrence_time',
+            field=models.DateTimeField(db_index=True, verbose_name='زمان وقوع'),
+        ),
+        migrations.AddConstraint(
+            model_name='casedailystat',
+            constraint=models.UniqueConstraint(fields=('day', 'crime_level', 'status'), name='unique_case_daily_stat'),
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
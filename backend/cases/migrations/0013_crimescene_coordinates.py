@@ -0,0 +1,28 @@
+# Generated by Django 4.2.27 on 2026-10-19 17:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0012_case_daily_stat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crimescene',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='crimescene',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True, verbose_name='عرض جغرافیایی'),
+        ),
+        migrations.AddField(
+            model_name='crimescene',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True, verbose_name='طول جغرافیایی'),
+        ),
+    ]
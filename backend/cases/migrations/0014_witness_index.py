@@ -0,0 +1,67 @@
+# Generated by Django 4.2.27 on 2026-10-19 17:32
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+# Copies of the cases.witnesses normalizers as of this migration
+def _digits(value):
+    return ''.join(str(unicodedata.decimal(ch)) for ch in value or '' if ch.isdecimal())
+
+
+def normalize_national_code(value):
+    digits = _digits(value)
+    return digits.zfill(10) if 0 < len(digits) <= 10 else digits
+
+
+def normalize_phone(value):
+    digits = _digits(value)
+    for prefix in ('0098', '98'):
+        if digits.startswith(prefix) and len(digits) == len(prefix) + 10:
+            return '0' + digits[len(prefix):]
+    if len(digits) == 10 and digits.startswith('9'):
+        return '0' + digits
+    return digits
+
+
+def backfill_witness_index(apps, schema_editor):
+    SceneWitness = apps.get_model('cases', 'SceneWitness')
+    batch = []
+    for witness in SceneWitness.objects.only('phone', 'national_code').iterator(chunk_size=2000):
+        witness.normalized_phone = normalize_phone(witness.phone)
+        witness.normalized_national_code = normalize_national_code(witness.national_code)
+        batch.append(witness)
+        if len(batch) == 2000:
+            SceneWitness.objects.bulk_update(batch, ['normalized_phone', 'normalized_national_code'])
+            batch = []
+    SceneWitness.objects.bulk_update(batch, ['normalized_phone', 'normalized_national_code'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0013_crimescene_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scenewitness',
+            name='normalized_national_code',
+            field=models.CharField(blank=True, default='', editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='scenewitness',
+            name='normalized_phone',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='scenewitness',
+            index=models.Index(fields=['normalized_national_code', 'scene'], name='witness_national_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scenewitness',
+            index=models.Index(fields=['normalized_phone', 'scene'], name='witness_phone_idx'),
+        ),
+        migrations.RunPython(backfill_witness_index, migrations.RunPython.noop),
+    ]
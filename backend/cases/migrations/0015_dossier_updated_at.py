@@ -0,0 +1,28 @@
+# Generated by Django 4.2.27 on 2026-10-19 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0014_witness_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='casecomplainant',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='crimescene',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='scenewitness',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
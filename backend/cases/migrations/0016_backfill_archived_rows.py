@@ -0,0 +1,93 @@
+# Generated by Django 4.2.27 on 2026-10-19 18:40
+
+import json
+import unicodedata
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations
+
+
+# Copies of cases.archive, cases.witnesses and investigation.models helpers as of this migration
+def _pack(data):
+    return zlib.compress(json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode(), 6)
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(bytes(blob)))
+
+
+def _digits(value):
+    return ''.join(str(unicodedata.decimal(ch)) for ch in value or '' if ch.isdecimal())
+
+
+def normalize_national_code(value):
+    digits = _digits(value)
+    return digits.zfill(10) if 0 < len(digits) <= 10 else digits
+
+
+def normalize_phone(value):
+    digits = _digits(value)
+    for prefix in ('0098', '98'):
+        if digits.startswith(prefix) and len(digits) == len(prefix) + 10:
+            return '0' + digits[len(prefix):]
+    if len(digits) == 10 and digits.startswith('9'):
+        return '0' + digits
+    return digits
+
+
+def weighted_score(interrogator_score, supervisor_score):
+    if interrogator_score is not None and supervisor_score is not None:
+        return round((interrogator_score + 2 * supervisor_score) / 3, 1)
+    elif supervisor_score is not None:
+        return float(supervisor_score)
+    elif interrogator_score is not None:
+        return float(interrogator_score)
+    return 0.0
+
+
+# auto_now columns added after 0011; raw restores write them as stored, so they cannot be left out
+UPDATED_AT_MODELS = {
+    'cases.casecomplainant', 'cases.crimescene', 'cases.scenewitness',
+    'evidence.evidenceimage', 'investigation.interrogation', 'investigation.interrogationfeedback',
+}
+
+
+def backfill_rows(rows, updated_at):
+    """Fill the columns added since 0011 on serialized rows; returns whether anything changed."""
+    changed = False
+    for row in rows:
+        fields = row['fields']
+        known = len(fields)
+        if row['model'] == 'cases.scenewitness':
+            fields.setdefault('normalized_phone', normalize_phone(fields.get('phone')))
+            fields.setdefault('normalized_national_code', normalize_national_code(fields.get('national_code')))
+        elif row['model'] == 'investigation.interrogation' and 'score' not in fields:
+            fields['score'] = weighted_score(fields.get('interrogator_score'), fields.get('supervisor_score'))
+        if row['model'] in UPDATED_AT_MODELS:
+            fields.setdefault('updated_at', updated_at)
+        changed = changed or len(fields) != known
+    return changed
+
+
+def backfill_archived_cases(apps, schema_editor):
+    # The earlier backfills (0014, investigation 0024, the updated_at columns) only walked live rows
+    ArchivedCase = apps.get_model('cases', 'ArchivedCase')
+    for archived in ArchivedCase.objects.only('rows', 'closed_at').iterator(chunk_size=100):
+        rows = _unpack(archived.rows)
+        if backfill_rows(rows, archived.closed_at):
+            archived.rows = _pack(rows)
+            archived.save(update_fields=['rows'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0015_dossier_updated_at'),
+        ('evidence', '0004_dossier_updated_at'),
+        ('investigation', '0026_dossier_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_archived_cases, migrations.RunPython.noop),
+    ]
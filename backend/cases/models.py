@@ -1,6 +1,9 @@
 from django.db import models
 from django.conf import settings
 
+from .geo import encode
+from .witnesses import normalize_national_code, normalize_phone
+
 class Case(models.Model):
     class CrimeLevel(models.IntegerChoices):
         LEVEL_3 = 3, 'سطح ۳ (جرائم خرد)'
@@ -50,6 +53,7 @@ class Case(models.Model):
     )
     complainants = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='involved_cases', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.id} - {self.title}"
@@ -58,15 +62,176 @@ class CaseComplainant(models.Model):
     case = models.ForeignKey(Case, on_delete=models.CASCADE, related_name='complainant_details')
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     is_confirmed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
 class CrimeScene(models.Model):
     case = models.OneToOneField(Case, on_delete=models.CASCADE, related_name='scene_data')
-    occurrence_time = models.DateTimeField(verbose_name="زمان وقوع")
+    occurrence_time = models.DateTimeField(db_index=True, verbose_name="زمان وقوع")
     location = models.CharField(max_length=255, verbose_name="محل وقوع")
+    latitude = models.FloatField(null=True, blank=True, verbose_name="عرض جغرافیایی")
+    longitude = models.FloatField(null=True, blank=True, verbose_name="طول جغرافیایی")
+    # Spatial index over the coordinates (see cases.geo); empty when they are not known
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash', 'updated_at'}
+        super().save(*args, **kwargs)
 
 class SceneWitness(models.Model):
     scene = models.ForeignKey(CrimeScene, on_delete=models.CASCADE, related_name='witnesses')
     phone = models.CharField(max_length=20, verbose_name="شماره تماس")
     national_code = models.CharField(max_length=10, verbose_name="کد ملی")
+    # Cross-case witness index (see cases.witnesses); save() keeps these in sync
+    normalized_phone = models.CharField(max_length=20, blank=True, default='', editable=False)
+    normalized_national_code = models.CharField(max_length=10, blank=True, default='', editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['normalized_national_code', 'scene'], name='witness_national_code_idx'),
+            models.Index(fields=['normalized_phone', 'scene'], name='witness_phone_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.normalized_phone = normalize_phone(self.phone)
+        self.normalized_national_code = normalize_national_code(self.national_code)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {
+                *update_fields,
+                *(f'normalized_{name}' for name in ('phone', 'national_code') if name in update_fields),
+                'updated_at',
+            }
+        super().save(*args, **kwargs)
+
+
+
+
+class CaseEvent(models.Model):
+    """Append-only log of workflow actions on a case; the source for timelines and change feeds."""
+    class Kind(models.TextChoices):
+        CREATED = 'created', 'ثبت پرونده'
+        STATUS = 'status', 'تغییر وضعیت پرونده'
+        SUSPECT_STATUS = 'suspect_status', 'تغییر وضعیت مظنون'
+        WARRANT = 'warrant', 'تصمیم درباره حکم جلب'
+        INTERROGATION = 'interrogation', 'نظر بر بازجویی'
+        VERDICT = 'verdict', 'صدور حکم'
+        PAYMENT = 'payment', 'پرداخت'
+
+    case = models.ForeignKey(Case, on_delete=models.CASCADE, related_name='events')
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='case_events'
+    )
+    from_status = models.CharField(max_length=20, blank=True, default='')
+    to_status = models.CharField(max_length=20, blank=True, default='')
+    object_id = models.BigIntegerField(null=True, blank=True)
+    notes = models.TextField(blank=True, default='')
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [models.Index(fields=['case', 'id'], name='case_event_feed_idx')]
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError('Case events are append-only.')
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.case_id} - {self.kind}"
 
 
+class CaseDailyStat(models.Model):
+    """Per-day case counters by crime level and status, kept current by ``cases.rollups``.
+
+    ``opened`` counts cases created that day in ``status``; ``entered`` counts
+    cases that reached ``status`` that day, creation included.  Charts read
+    these rows instead of scanning cases and events.
+    """
+    day = models.DateField()
+    crime_level = models.IntegerField(choices=Case.CrimeLevel.choices)
+    status = models.CharField(max_length=2, choices=Case.Status.choices)
+    opened = models.PositiveIntegerField(default=0)
+    entered = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'crime_level', 'status'], name='unique_case_daily_stat'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} - {self.crime_level}/{self.status}"
+
+
+class CaseDossier(models.Model):
+    """A court dossier ZIP built for one version of a case; rebuilt only when the case changes."""
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'در صف ساخت'
+        BUILDING = 'BUILDING', 'در حال ساخت'
+        READY = 'READY', 'آماده'
+        FAILED = 'FAILED', 'ناموفق'
+
+    case = models.ForeignKey(Case, on_delete=models.CASCADE, related_name='dossiers')
+    version = models.CharField(max_length=40)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    file_name = models.CharField(max_length=255, blank=True)
+    size = models.BigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['case', 'version'], name='unique_case_dossier_version')]
+
+    def __str__(self):
+        return f"Dossier {self.case_id} ({self.version[:8]}) - {self.status}"
+
+
+class CaseSnapshot(models.Model):
+    """zlib-compressed JSON of a closed case's detail and trial history, frozen when it reached SOLVED/CANCELLED."""
+    case = models.OneToOneField(Case, on_delete=models.CASCADE, related_name='snapshot')
+    status = models.CharField(max_length=2, choices=Case.Status.choices)
+    detail = models.BinaryField()
+    trial_history = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Snapshot of case {self.case_id}"
+
+
+class ArchivedCase(models.Model):
+    """Cold storage for a closed case: its rows and dependents, compressed, out of the hot tables.
+
+    The columns kept outside the blobs are what listing and the visibility rules
+    need without unpacking anything.
+    """
+    case_id = models.BigIntegerField(unique=True)
+    title = models.CharField(max_length=255)
+    status = models.CharField(max_length=2, choices=Case.Status.choices)
+    crime_level = models.IntegerField(choices=Case.CrimeLevel.choices)
+    creator_id = models.BigIntegerField(null=True, blank=True)
+    complainant_ids = models.JSONField(default=list, blank=True)
+    judge_visible = models.BooleanField(default=False)
+    closed_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    trial_history = models.BinaryField()
+    rows = models.BinaryField()
+    row_count = models.PositiveIntegerField(default=0)
+    # Rows outside the archive whose FK to an archived row was SET_NULL: [[model, field, [[pk, value], ...]], ...]
+    detached_refs = models.JSONField(default=list, blank=True)
+
+    def __str__(self):
+        return f"Archived case {self.case_id} - {self.title}"
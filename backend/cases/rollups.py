@@ -0,0 +1,117 @@
+"""Maintenance of the ``CaseDailyStat`` rollup.
+
+Case creation and status transitions bump one counter row each (an UPDATE,
+or an INSERT the first time a day/level/status combination is seen), so the
+time-series endpoint never has to scan cases or events.
+``rebuild_daily_stats()`` recomputes every row from the case rows and the
+event log, archived cases included, after bulk loads that skip signals (``generate_load_data``); the
+0012 migration ran the same computation as the initial backfill.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, NullIf, TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ArchivedCase, Case, CaseDailyStat, CaseEvent
+
+
+def bump_daily_stat(crime_level, status, day=None, opened=0, entered=0):
+    day = day or timezone.localdate()
+    key = {'day': day, 'crime_level': crime_level, 'status': status}
+    increments = {'opened': F('opened') + opened, 'entered': F('entered') + entered}
+    if CaseDailyStat.objects.filter(**key).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            CaseDailyStat.objects.create(**key, opened=opened, entered=entered)
+    except IntegrityError:
+        # Another request created the row first
+        CaseDailyStat.objects.filter(**key).update(**increments)
+
+
+def record_case_opened(case):
+    bump_daily_stat(case.crime_level, case.status, timezone.localdate(case.created_at), opened=1, entered=1)
+
+
+def record_status_entered(pks, target, crime_level=None):
+    """Count the cases in ``pks`` reaching ``target`` today; ``crime_level`` saves a lookup for a single case."""
+    if crime_level is not None:
+        levels = [(crime_level, len(pks))]
+    else:
+        levels = Case.objects.filter(pk__in=pks).values_list('crime_level').annotate(count=Count('pk')).order_by()
+    for level, count in levels:
+        bump_daily_stat(level, target, entered=count)
+
+
+def _archived_counts():
+    """``(day, crime_level, status, opened, entered)`` increments for archived cases.
+
+    Their case and event rows have left the hot tables, so they are read back
+    from the archive with the same rules as the queries in rebuild_daily_stats().
+    """
+    from .archive import archived_rows
+
+    counted = (CaseEvent.Kind.CREATED, CaseEvent.Kind.STATUS)
+    for archived in ArchivedCase.objects.only('rows').iterator(chunk_size=100):
+        rows = archived_rows(archived)
+        case = next(row['fields'] for row in rows if row['model'] == 'cases.case')
+        events = sorted((row for row in rows if row['model'] == 'cases.caseevent'), key=lambda row: row['pk'])
+        events = [row['fields'] for row in events]
+        created = [event for event in events if event['kind'] == CaseEvent.Kind.CREATED]
+        moves = [event for event in events if event['kind'] == CaseEvent.Kind.STATUS]
+        initial = created[0]['to_status'] if created else (moves and moves[0]['from_status']) or case['status']
+        level = case['crime_level']
+        yield _local_day(case['created_at']), level, initial, 1, 0 if created else 1
+        for event in events:
+            if event['kind'] in counted and event['to_status'] in Case.Status.values \
+                    and event['from_status'] != event['to_status']:
+                yield _local_day(event['created_at']), level, event['to_status'], 0, 1
+
+
+def _local_day(value):
+    return timezone.localdate(parse_datetime(value))
+
+
+def rebuild_daily_stats():
+    """Recompute all rollup rows; returns how many were written."""
+    opening_status = CaseEvent.objects.filter(case=OuterRef('pk'), kind=CaseEvent.Kind.CREATED).order_by('pk').values('to_status')
+    # Without a 'created' event the first transition still tells where the case started
+    first_move = CaseEvent.objects.filter(case=OuterRef('pk'), kind=CaseEvent.Kind.STATUS).order_by('pk').values('from_status')
+    opened = (
+        Case.objects
+        .annotate(
+            day=TruncDate('created_at'),
+            initial=Coalesce(Subquery(opening_status[:1]), NullIf(Subquery(first_move[:1]), Value('')), 'status'),
+            logged=Exists(opening_status),
+        )
+        .values_list('day', 'crime_level', 'initial')
+        # Cases without a 'created' event (bulk loads) still entered their first status
+        .annotate(count=Count('pk'), unlogged=Count('pk', filter=Q(logged=False)))
+        .order_by()
+    )
+    entered = (
+        CaseEvent.objects
+        .filter(kind__in=[CaseEvent.Kind.CREATED, CaseEvent.Kind.STATUS], to_status__in=Case.Status.values)
+        .exclude(from_status=F('to_status'))
+        .annotate(day=TruncDate('created_at'))
+        .values_list('day', 'case__crime_level', 'to_status')
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+
+    rows = {}
+    for day, level, status, count, unlogged in opened:
+        row = rows.setdefault((day, level, status), CaseDailyStat(day=day, crime_level=level, status=status))
+        row.opened, row.entered = count, unlogged
+    for day, level, status, count in entered:
+        rows.setdefault((day, level, status), CaseDailyStat(day=day, crime_level=level, status=status)).entered += count
+    for day, level, status, opened_count, entered_count in _archived_counts():
+        row = rows.setdefault((day, level, status), CaseDailyStat(day=day, crime_level=level, status=status))
+        row.opened += opened_count
+        row.entered += entered_count
+
+    with transaction.atomic():
+        CaseDailyStat.objects.all().delete()
+        CaseDailyStat.objects.bulk_create(rows.values(), batch_size=2000)
+    return len(rows)
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Case, CrimeScene, SceneWitness, CaseComplainant
+from .models import Case, CaseEvent, CrimeScene, SceneWitness, CaseComplainant
 
 class WitnessSerializer(serializers.ModelSerializer):
 
@@ -20,7 +20,7 @@ class CrimeSceneSerializer(serializers.ModelSerializer):
     witnesses = WitnessSerializer(many=True, read_only=True)
     class Meta:
         model = CrimeScene
-        fields = ['occurrence_time', 'location', 'witnesses']
+        fields = ['occurrence_time', 'location', 'latitude', 'longitude', 'witnesses']
 
 class CaseSerializer(serializers.ModelSerializer):
     status_label = serializers.CharField(source='get_status_display', read_only=True)
@@ -32,4 +32,13 @@ class CaseSerializer(serializers.ModelSerializer):
         model = Case
         fields = '__all__'
         read_only_fields = ['status', 'submission_attempts', 'creator']
+        expandable_fields = ['complainants', 'complainant_details', 'scene_data']
 
+
+class CaseEventSerializer(serializers.ModelSerializer):
+    actor_username = serializers.CharField(source='actor.username', read_only=True, default=None)
+
+    class Meta:
+        model = CaseEvent
+        fields = ['id', 'case', 'kind', 'actor', 'actor_username', 'from_status', 'to_status',
+                  'object_id', 'notes', 'data', 'created_at']
@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .events import record_case_event, record_case_events
+from .models import Case, CaseEvent
+from .rollups import record_case_opened, record_status_entered
+from .snapshots import TERMINAL_STATUSES, freeze_case, thaw_case
+from .transitions import transition_applied
+
+
+@receiver(transition_applied, sender=Case)
+def log_case_transition(sender, pks, source, target, instance=None, actor=None, changes=None, **kwargs):
+    notes = (changes or {}).get('review_notes')
+    notes = notes if isinstance(notes, str) else ''
+    if instance is not None:
+        record_case_event(instance.pk, CaseEvent.Kind.STATUS, actor=actor, from_status=source or '', to_status=target, notes=notes)
+    else:
+        record_case_events([(pk, None) for pk in pks], CaseEvent.Kind.STATUS, actor=actor, to_status=target, notes=notes)
+
+
+@receiver(transition_applied, sender=Case)
+def snapshot_closed_case(sender, pks, source, target, **kwargs):
+    for pk in pks:
+        if target in TERMINAL_STATUSES:
+            # After commit, so the snapshot includes whatever closed the case (e.g. the verdict)
+            transaction.on_commit(lambda pk=pk: freeze_case(pk))
+        elif source in TERMINAL_STATUSES:
+            thaw_case(pk)
+
+
+@receiver(post_save, sender=Case)
+def count_opened_case(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_case_opened(instance)
+
+
+@receiver(transition_applied, sender=Case)
+def count_status_entered(sender, pks, source, target, instance=None, **kwargs):
+    if source == target:
+        return
+    record_status_entered(pks, target, crime_level=instance.crime_level if instance is not None else None)
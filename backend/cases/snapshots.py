@@ -0,0 +1,60 @@
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+
+from .models import Case, CaseSnapshot
+
+
+TERMINAL_STATUSES = frozenset({Case.Status.SOLVED, Case.Status.CANCELLED})
+
+
+def _pack(data):
+    return zlib.compress(json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode(), 6)
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(bytes(blob)))
+
+
+def freeze_case(case_id):
+    """Store the serialized detail and trial history of a closed case; no-op if it was reopened meanwhile."""
+    from .dossier import build_trial_history
+    from .serializers import CaseSerializer
+
+    case = Case.objects.filter(pk=case_id, status__in=TERMINAL_STATUSES).first()
+    if case is None:
+        return None
+    try:
+        with transaction.atomic():
+            snapshot, _ = CaseSnapshot.objects.update_or_create(case=case, defaults={
+                'status': case.status,
+                'detail': _pack(CaseSerializer(case).data),
+                'trial_history': _pack(build_trial_history(case)),
+            })
+    except IntegrityError:
+        # A concurrent freeze of the same case got there first; its content is identical
+        return CaseSnapshot.objects.filter(case=case).first()
+    return snapshot
+
+
+def load_snapshot(case, part):
+    """Decoded ``part`` ('detail' or 'trial_history') of a closed case's snapshot; None for open cases.
+
+    Closed cases without a snapshot (closed before snapshots existed, or through
+    the admin) are frozen on first read.
+    """
+    if case.status not in TERMINAL_STATUSES:
+        return None
+    blob = CaseSnapshot.objects.filter(case=case).values_list(part, flat=True).first()
+    if blob is None:
+        snapshot = freeze_case(case.pk)
+        if snapshot is None:
+            return None
+        blob = getattr(snapshot, part)
+    return _unpack(blob)
+
+
+def thaw_case(case_id):
+    CaseSnapshot.objects.filter(case_id=case_id).delete()
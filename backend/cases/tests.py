@@ -1,8 +1,34 @@
+import importlib
+import io
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from unittest import mock
+
 from rest_framework.test import APITestCase
 from rest_framework import status
+from django.apps import apps as django_apps
+from django.db import OperationalError, connection, transaction
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import timedelta
 from django.urls import reverse
-from .models import Case
+from .models import (
+    ArchivedCase, Case, CaseComplainant, CaseDailyStat, CaseDossier, CaseEvent, CaseSnapshot, CrimeScene, SceneWitness,
+)
+from . import analytics
+from .archive import archive_case
+from .rollups import rebuild_daily_stats
+from .urls import router as cases_router
+from .transitions import CASE_TRANSITIONS, InvalidTransition, TransitionConflict
+from accounts.models import Role
 from django.contrib.auth import get_user_model
+from config.testing import QueryCountMixin
 
 class CaseAPITests(APITestCase):
     def setUp(self):
@@ -32,3 +58,681 @@ class CaseAPITests(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['title'], 'Test Case')
+
+
+class CaseTransitionTests(APITestCase):
+    def setUp(self):
+        self.User = get_user_model()
+        self.trainee = self.User.objects.create_user('trainee', 't@test.com', 'pass')
+        self.trainee.roles.add(Role.objects.get_or_create(code='trainee', defaults={'name': 'Trainee'})[0])
+        self.case = Case.objects.create(title='Review me', description='desc', creator=self.trainee)
+
+    def test_stale_transition_returns_conflict(self):
+        """A review against a status that changed after it was read is rejected with 409"""
+        stale = Case.objects.get(pk=self.case.pk)
+        CASE_TRANSITIONS.apply(self.case, Case.Status.PENDING_OFFICER)
+        with self.assertRaises(TransitionConflict):
+            CASE_TRANSITIONS.apply(stale, Case.Status.REJECTED)
+        self.assertEqual(Case.objects.get(pk=self.case.pk).status, Case.Status.PENDING_OFFICER)
+
+    def test_identical_concurrent_reviews_conflict(self):
+        """Two reviewers who loaded the same ACTIVE case cannot both send it to the chief"""
+        Case.objects.filter(pk=self.case.pk).update(status=Case.Status.ACTIVE)
+        first, second = Case.objects.get(pk=self.case.pk), Case.objects.get(pk=self.case.pk)
+        CASE_TRANSITIONS.apply(first, Case.Status.PENDING_CHIEF)
+        with self.assertRaises(TransitionConflict):
+            CASE_TRANSITIONS.apply(second, Case.Status.PENDING_CHIEF)
+        with self.assertRaises(InvalidTransition):
+            CASE_TRANSITIONS.apply(first, Case.Status.PENDING_CHIEF)
+
+    def test_stay_updates_fields_without_a_transition(self):
+        Case.objects.filter(pk=self.case.pk).update(status=Case.Status.PENDING_CHIEF)
+        chief = self.User.objects.create_user('chief', 'ch@test.com', 'pass')
+        chief.roles.add(Role.objects.get_or_create(code='police_chief', defaults={'name': 'Chief'})[0])
+        self.client.force_authenticate(user=chief)
+        response = self.client.post(reverse('case-chief-review', args=[self.case.id]), {'approved': True})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Case.objects.get(pk=self.case.pk).status, Case.Status.PENDING_CHIEF)
+        self.assertFalse(CaseEvent.objects.filter(case=self.case, kind=CaseEvent.Kind.STATUS).exists())
+
+        stale = Case.objects.get(pk=self.case.pk)
+        CASE_TRANSITIONS.apply(Case.objects.get(pk=self.case.pk), Case.Status.SOLVED)
+        with self.assertRaises(TransitionConflict):
+            CASE_TRANSITIONS.stay(stale, review_notes='late')
+
+    def test_apply_many_reports_only_moved_rows(self):
+        from cases.transitions import transition_applied
+
+        other = Case.objects.create(title='Other', description='desc', status=Case.Status.REJECTED)
+        sent = []
+        receiver = lambda sender, pks, **kwargs: sent.append(pks)
+        transition_applied.connect(receiver, sender=Case)
+        self.addCleanup(transition_applied.disconnect, receiver, sender=Case)
+        moved = CASE_TRANSITIONS.apply_many(Case.objects.filter(pk__in=[self.case.pk, other.pk]), Case.Status.CANCELLED)
+        self.assertEqual((moved, sent), (1, [[self.case.pk]]))
+
+    def test_undeclared_transition_is_rejected(self):
+        """Chief review of a case still waiting for the trainee is not a declared transition"""
+        chief = self.User.objects.create_user('chief', 'ch@test.com', 'pass')
+        chief.roles.add(Role.objects.get_or_create(code='police_chief', defaults={'name': 'Chief'})[0])
+        self.client.force_authenticate(user=chief)
+        url = reverse('case-chief-review', args=[self.case.id])
+        response = self.client.post(url, {'approved': True})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['current_status'], Case.Status.PENDING_TRAINEE)
+        self.assertEqual(Case.objects.get(pk=self.case.pk).status, Case.Status.PENDING_TRAINEE)
+
+
+class CaseEventTests(APITestCase):
+    def setUp(self):
+        self.User = get_user_model()
+        self.trainee = self.User.objects.create_user('trainee', 't@test.com', 'pass')
+        self.trainee.roles.add(Role.objects.get_or_create(code='trainee', defaults={'name': 'Trainee'})[0])
+        self.case = Case.objects.create(title='Logged', description='desc', creator=self.trainee)
+        self.hidden = Case.objects.create(title='Hidden', description='desc')
+
+    def test_review_appends_status_event(self):
+        """Workflow actions append an event with actor, statuses and notes; rows are never rewritten"""
+        self.client.force_authenticate(user=self.trainee)
+        url = reverse('case-trainee-review', args=[self.case.id])
+        self.client.post(url, {'approved': True, 'notes': 'looks complete'}, format='json')
+
+        event = CaseEvent.objects.get(case=self.case)
+        self.assertEqual((event.kind, event.from_status, event.to_status), ('status', 'PT', 'PO'))
+        self.assertEqual((event.actor, event.notes), (self.trainee, 'looks complete'))
+        with self.assertRaises(ValueError):
+            event.save()
+
+    def test_feeds_page_by_cursor_and_respect_visibility(self):
+        """Per-case and global feeds page with after=<cursor> and skip cases the user cannot see"""
+        for target in (Case.Status.PENDING_OFFICER, Case.Status.ACTIVE):
+            CASE_TRANSITIONS.apply(self.case, target)
+        CASE_TRANSITIONS.apply(self.hidden, Case.Status.PENDING_OFFICER)
+        self.client.force_authenticate(user=self.trainee)
+
+        url = reverse('case-events', args=[self.case.id])
+        first = self.client.get(url, {'limit': 1})
+        self.assertTrue(first.data['has_more'])
+        second = self.client.get(url, {'limit': 1, 'after': first.data['cursor']})
+        self.assertFalse(second.data['has_more'])
+        self.assertEqual(
+            [e['to_status'] for e in first.data['results'] + second.data['results']], ['PO', 'AC']
+        )
+
+        feed = self.client.get(reverse('case-feed'))
+        self.assertEqual({e['case'] for e in feed.data['results']}, {self.case.id})
+
+
+class CaseDossierTests(APITestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        overrides = override_settings(DOSSIER_ROOT=self.tmp, MEDIA_ROOT=self.tmp, DOSSIER_BUILD_ASYNC=False)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        from evidence.models import EvidenceImage, OtherEvidence
+        self.User = get_user_model()
+        self.user = self.User.objects.create_user('judge', 'j@test.com', 'pass')
+        self.case = Case.objects.create(title='Court', description='desc', creator=self.user)
+        evidence = OtherEvidence.objects.create(case=self.case, title='Photo', description='d', recorder=self.user)
+        EvidenceImage.objects.create(evidence=evidence, image=SimpleUploadedFile('scene.jpg', b'0123456789' * 10))
+        self.client.force_authenticate(user=self.user)
+
+    def _build(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('case-dossier', args=[self.case.id]))
+
+    def test_dossier_is_built_once_per_version(self):
+        """The ZIP holds the trial history and evidence files and is reused until the case changes"""
+        self._build()
+        status_response = self.client.get(reverse('case-dossier', args=[self.case.id]))
+        self.assertEqual(status_response.data['status'], CaseDossier.Status.READY)
+        self.assertIn('download_url', status_response.data)
+        dossier = CaseDossier.objects.get(case=self.case)
+        with zipfile.ZipFile(f'{self.tmp}/{dossier.file_name}') as archive:
+            names = archive.namelist()
+        self.assertIn('trial_history.json', names)
+        self.assertTrue(any(name.startswith('evidence/') and name.endswith('scene.jpg') for name in names))
+
+        self.assertEqual(self._build().data['version'], dossier.version)
+        self.assertEqual(CaseDossier.objects.count(), 1)
+
+        CASE_TRANSITIONS.apply(self.case, Case.Status.PENDING_OFFICER)
+        self.assertNotEqual(self._build().data['version'], dossier.version)
+        self.assertEqual(CaseDossier.objects.count(), 1)
+
+    def test_in_place_edits_change_the_version(self):
+        """Re-scoring an interrogation, editing its feedback or a witness each give a new version"""
+        from investigation.models import Interrogation, InterrogationFeedback, Suspect
+        from .dossier import dossier_version
+
+        suspect = Suspect.objects.create(case=self.case, first_name='S')
+        interrogation = Interrogation.objects.create(suspect=suspect, transcript='t', interrogator_score=4)
+        feedback = InterrogationFeedback.objects.create(interrogation=interrogation, captain=self.user)
+        scene = CrimeScene.objects.create(case=self.case, occurrence_time=timezone.now(), location='L')
+        witness = SceneWitness.objects.create(scene=scene, national_code='0012345678', phone='09120000000')
+
+        def rescore():
+            interrogation.interrogator_score = 7
+            interrogation.save(update_fields=['interrogator_score'])
+
+        def edit_feedback():
+            feedback.notes = 'Reconsidered'
+            feedback.save()
+
+        def edit_witness():
+            witness.phone = '09121111111'
+            witness.save(update_fields=['phone'])
+
+        versions = [dossier_version(self.case)]
+        for edit in (rescore, edit_feedback, edit_witness):
+            edit()
+            versions.append(dossier_version(self.case))
+        self.assertEqual(len(set(versions)), len(versions))
+
+    def test_download_supports_ranges_and_etag(self):
+        """Downloads answer Range with 206 and a matching If-None-Match with 304"""
+        self._build()
+        url = reverse('case-dossier-download', args=[self.case.id])
+        full = self.client.get(url)
+        body = b''.join(full.streaming_content)
+        self.assertEqual(full['Accept-Ranges'], 'bytes')
+
+        partial = self.client.get(url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(b''.join(partial.streaming_content), body[10:20])
+        self.assertEqual(partial['Content-Range'], f'bytes 10-19/{len(body)}')
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=full['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_RANGE=f'bytes={len(body)}-').status_code, 416)
+
+
+class CaseSnapshotTests(APITestCase):
+    def setUp(self):
+        self.User = get_user_model()
+        self.admin = self.User.objects.create_superuser('root', 'r@test.com', 'pass')
+        self.case = Case.objects.create(
+            title='Closing', description='desc', creator=self.admin, status=Case.Status.PENDING_CHIEF,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            CASE_TRANSITIONS.apply(self.case, Case.Status.SOLVED)
+        self.client.force_authenticate(user=self.admin)
+
+    def test_closed_case_reads_come_from_snapshot(self):
+        """Solving a case freezes its detail and trial history; reads no longer hit the live rows"""
+        self.assertTrue(CaseSnapshot.objects.filter(case=self.case).exists())
+        Case.objects.filter(pk=self.case.pk).update(title='Changed behind the snapshot')
+
+        detail = self.client.get(reverse('case-detail', args=[self.case.id]))
+        self.assertEqual(detail.data['title'], 'Closing')
+        history = self.client.get(reverse('case-trial-history', args=[self.case.id]))
+        self.assertEqual(history.data['case']['title'], 'Closing')
+
+    def test_admin_reopen_invalidates_snapshot(self):
+        """Only an admin can reopen; reopening drops the snapshot and serves live data again"""
+        outsider = self.User.objects.create_user('nobody', 'n@test.com', 'pass')
+        self.client.force_authenticate(user=outsider)
+        self.assertEqual(
+            self.client.post(reverse('case-reopen', args=[self.case.id])).status_code, status.HTTP_403_FORBIDDEN
+        )
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(reverse('case-reopen', args=[self.case.id]))
+        self.assertEqual(response.data['new_status'], Case.Status.ACTIVE)
+        self.assertFalse(CaseSnapshot.objects.filter(case=self.case).exists())
+
+        Case.objects.filter(pk=self.case.pk).update(title='Live again')
+        self.assertEqual(self.client.get(reverse('case-detail', args=[self.case.id])).data['title'], 'Live again')
+
+
+class CaseArchiveTests(APITestCase):
+    def setUp(self):
+        from accounts.models import Notification
+        from evidence.models import VehicleEvidence
+        from investigation.models import RewardReport, Suspect, Verdict
+
+        self.User = get_user_model()
+        self.owner = self.User.objects.create_user('owner', 'o@test.com', 'pass')
+        self.case = Case.objects.create(
+            title='Old heist', description='desc', creator=self.owner, status=Case.Status.SOLVED,
+        )
+        self.case.complainants.add(self.owner)
+        VehicleEvidence.objects.create(
+            case=self.case, title='Getaway car', description='d', recorder=self.owner,
+            model_name='Pride', color='black', license_plate='11',
+        )
+        suspect = Suspect.objects.create(case=self.case, first_name='Cole', details='-')
+        Verdict.objects.create(case=self.case, suspect=suspect, judge=self.owner, title='V', result='GUILTY', description='-')
+        self.reward = RewardReport.objects.create(reporter=self.owner, suspect=suspect, description='tip')
+        Notification.objects.create(user=self.owner, title='n', message='m', link=f'/cases/{self.case.id}')
+        Case.objects.filter(pk=self.case.pk).update(updated_at=timezone.now() - timedelta(days=400))
+
+    def test_archive_and_restore_round_trip(self):
+        """Old closed cases move to cold storage with their dependents and come back intact"""
+        from accounts.models import Notification
+        from evidence.models import VehicleEvidence
+        from investigation.models import Suspect
+
+        call_command('archive_cases', '--older-than-days', '365', stdout=io.StringIO())
+        self.assertFalse(Case.objects.filter(pk=self.case.pk).exists())
+        self.assertFalse(Suspect.objects.exists())
+        self.assertFalse(Notification.objects.exists())
+        self.reward.refresh_from_db()
+        self.assertIsNone(self.reward.suspect_id)
+
+        self.client.force_authenticate(user=self.owner)
+        history = self.client.get(reverse('case-trial-history', args=[self.case.id]))
+        self.assertEqual(history.status_code, status.HTTP_200_OK)
+        self.assertEqual(history.data['case']['title'], 'Old heist')
+        self.assertEqual(len(history.data['verdicts']), 1)
+
+        call_command('restore_case', str(self.case.id), stdout=io.StringIO())
+        self.assertFalse(ArchivedCase.objects.exists())
+        restored = Case.objects.get(pk=self.case.pk)
+        self.assertEqual(list(restored.complainants.all()), [self.owner])
+        self.assertEqual(VehicleEvidence.objects.get(case=restored).color, 'black')
+        self.reward.refresh_from_db()
+        self.assertEqual(self.reward.suspect.first_name, 'Cole')
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_cases_archived_before_later_columns_restore_filled(self):
+        """The 0016 migration fills columns added after archiving into the stored rows"""
+        from investigation.models import Interrogation, Suspect
+        from .archive import _pack, archived_rows
+
+        backfill = importlib.import_module('cases.migrations.0016_backfill_archived_rows')
+        scene = CrimeScene.objects.create(case=self.case, occurrence_time=timezone.now(), location='L')
+        SceneWitness.objects.create(scene=scene, national_code='۱۲۳۴۵۶۷۸', phone='+98 912 123 4567')
+        Interrogation.objects.create(suspect=Suspect.objects.get(), transcript='t', interrogator_score=4, supervisor_score=7)
+        archive_case(Case.objects.get(pk=self.case.pk))
+
+        # Strip what an archive written before those migrations would not contain
+        archived = ArchivedCase.objects.get(case_id=self.case.pk)
+        rows = archived_rows(archived)
+        for row in rows:
+            if row['model'] in backfill.UPDATED_AT_MODELS:
+                for name in ('normalized_phone', 'normalized_national_code', 'score', 'updated_at'):
+                    row['fields'].pop(name, None)
+        archived.rows = _pack(rows)
+        archived.save(update_fields=['rows'])
+
+        backfill.backfill_archived_cases(django_apps, None)
+        call_command('restore_case', str(self.case.id), stdout=io.StringIO())
+        witness = SceneWitness.objects.get()
+        self.assertEqual((witness.normalized_phone, witness.normalized_national_code), ('09121234567', '0012345678'))
+        self.assertIsNotNone(witness.updated_at)
+        self.assertEqual(Interrogation.objects.get().score, 6.0)
+
+    def test_recent_and_open_cases_stay_hot(self):
+        """Only closed cases past the threshold are archived; others cannot read archived history"""
+        recent = Case.objects.create(title='Recent', description='d', status=Case.Status.SOLVED)
+        call_command('archive_cases', '--older-than-days', '365', stdout=io.StringIO())
+        self.assertTrue(Case.objects.filter(pk=recent.pk).exists())
+
+        stranger = self.User.objects.create_user('stranger', 's@test.com', 'pass')
+        self.client.force_authenticate(user=stranger)
+        response = self.client.get(reverse('case-trial-history', args=[self.case.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CaseTransitionConcurrencyTests(TransactionTestCase):
+    reset_sequences = True
+
+    def setUp(self):
+        self.case = Case.objects.create(title='Contended', description='desc')
+
+    def test_concurrent_reviewers_only_one_wins(self):
+        """Stress: many reviewers race on the same case; exactly one transition is applied"""
+        workers = 8
+        barrier = threading.Barrier(workers)
+        outcomes = []
+        lock = threading.Lock()
+
+        def review(target):
+            try:
+                # Every reviewer loads the case before anyone writes, like parallel requests would
+                case = Case.objects.get(pk=self.case.pk)
+                barrier.wait()
+                result = 'locked'
+                for _ in range(50):
+                    try:
+                        CASE_TRANSITIONS.apply(case, target, review_notes=f'by {target}')
+                        result = 'applied'
+                        break
+                    except TransitionConflict:
+                        result = 'conflict'
+                        break
+                    except OperationalError:
+                        # SQLite serialises writers with a table lock; retry like a real client would
+                        time.sleep(0.01)
+                with lock:
+                    outcomes.append(result)
+            finally:
+                connection.close()
+
+        targets = [Case.Status.PENDING_OFFICER, Case.Status.REJECTED] * (workers // 2)
+        threads = [threading.Thread(target=review, args=(t,)) for t in targets]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(outcomes.count('applied'), 1)
+        self.assertEqual(outcomes.count('conflict'), workers - 1)
+        case = Case.objects.get(pk=self.case.pk)
+        self.assertEqual(case.review_notes, f'by {case.status}')
+
+
+class ListQueryCountTests(QueryCountMixin, APITestCase):
+    router = cases_router
+
+    def seed_case(self, rows):
+        citizen = get_user_model().objects.create_user(f'qc_citizen_{Case.objects.count()}', password='x')
+        for _ in range(rows):
+            case = Case.objects.create(title='QC', description='d', creator=self.qc_user)
+            case.complainants.add(citizen)
+            CaseComplainant.objects.create(case=case, user=citizen, is_confirmed=True)
+            scene = CrimeScene.objects.create(case=case, occurrence_time=timezone.now(), location='L')
+            SceneWitness.objects.create(scene=scene, phone='0912', national_code='0012345678')
+
+
+class QueryPlanTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser('planner', 'p@test.com', 'pass')
+        self.client.force_authenticate(self.user)
+
+    def test_case_serializer_plan(self):
+        """Nested serializers become joins and prefetches; plain fields restrict the columns."""
+        from config.query_plans import serializer_plan
+        from .serializers import CaseSerializer
+
+        plan = serializer_plan(CaseSerializer, Case)
+        self.assertEqual(plan.select, {'scene_data'})
+        self.assertEqual(set(plan.prefetch), {'complainants', 'complainant_details', 'scene_data__witnesses'})
+        self.assertEqual(plan.prefetch['complainant_details'].select, {'user'})
+        self.assertIn('case', plan.prefetch['complainant_details'].columns)
+        self.assertTrue(plan.complete)
+        self.assertIn('scene_data__location', plan.columns)
+
+    def test_method_fields_keep_all_columns_and_explicit_lookups_win(self):
+        from django.db.models import Prefetch
+        from config.query_plans import apply_plan, serializer_plan
+        from evidence.models import Evidence
+        from evidence.serializers import EvidenceBaseSerializer
+
+        plan = serializer_plan(EvidenceBaseSerializer, Evidence)
+        self.assertFalse(plan.complete)
+        queryset = apply_plan(Evidence.objects.prefetch_related('images'), plan)
+        self.assertEqual(queryset.query.deferred_loading, (frozenset(), True))
+        self.assertEqual(
+            [lookup for lookup in queryset._prefetch_related_lookups if isinstance(lookup, Prefetch)], [],
+        )
+
+    def test_list_defers_unread_columns(self):
+        """Joined users load only the columns CaseSerializer renders; list and detail agree."""
+        case = Case.objects.create(title='Plan', description='d', creator=self.user)
+        CrimeScene.objects.create(case=case, occurrence_time=timezone.now(), location='Square')
+        plain = self.client.get(reverse('case-detail', args=[case.pk]))
+
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as captured:
+            listed = self.client.get(reverse('case-list'))
+        self.assertEqual(listed.data['results'][0], plain.data)
+        joined = [query['sql'] for query in captured.captured_queries if '"auth_user"' in query['sql']]
+        self.assertTrue(joined)
+        self.assertFalse([sql for sql in joined if '"password"' in sql])
+
+
+class CaseConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser('etag', 'e@test.com', 'pass')
+        self.client.force_authenticate(self.user)
+        self.case = Case.objects.create(title='Cached', description='d', creator=self.user)
+        self.url = reverse('case-detail', args=[self.case.pk])
+
+    def test_unchanged_case_is_not_serialized_again(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertTrue(first.has_header('Last-Modified'))
+
+        with CaptureQueriesContext(connection) as captured:
+            again = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'W/{first["ETag"]}')
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(again.content, b'')
+        self.assertFalse([q for q in captured.captured_queries if 'cases_casecomplainant' in q['sql']])
+
+        since = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(since.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_nested_changes_move_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        citizen = get_user_model().objects.create_user('citizen', password='x')
+        self.client.post(reverse('case-add-complainant', args=[self.case.pk]), {'user_id': citizen.pk})
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual([c['username'] for c in response.data['complainant_details']], ['citizen'])
+
+
+class CaseTimeSeriesTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('analyst', 'a@test.com', 'pass')
+        self.client.force_authenticate(self.user)
+        self.today = timezone.localdate()
+        self.cases = [
+            Case.objects.create(title=f'C{level}', description='d', crime_level=level)
+            for level in (Case.CrimeLevel.LEVEL_1, Case.CrimeLevel.LEVEL_1, Case.CrimeLevel.LEVEL_3)
+        ]
+
+    def _stats(self):
+        return {
+            (row.crime_level, row.status): (row.opened, row.entered)
+            for row in CaseDailyStat.objects.filter(day=self.today)
+        }
+
+    def test_rollup_follows_creation_and_transitions(self):
+        CASE_TRANSITIONS.apply(self.cases[0], Case.Status.PENDING_OFFICER)
+        for case in self.cases[1:]:
+            CASE_TRANSITIONS.apply(case, Case.Status.CANCELLED)
+        expected = {
+            (Case.CrimeLevel.LEVEL_1, Case.Status.PENDING_TRAINEE): (2, 2),
+            (Case.CrimeLevel.LEVEL_3, Case.Status.PENDING_TRAINEE): (1, 1),
+            (Case.CrimeLevel.LEVEL_1, Case.Status.PENDING_OFFICER): (0, 1),
+            (Case.CrimeLevel.LEVEL_1, Case.Status.CANCELLED): (0, 1),
+            (Case.CrimeLevel.LEVEL_3, Case.Status.CANCELLED): (0, 1),
+        }
+        self.assertEqual(self._stats(), expected)
+
+        # Rebuilt from case rows and the event log (only the first case has a 'created' event)
+        CaseEvent.objects.create(case=self.cases[0], kind='created', to_status=Case.Status.PENDING_TRAINEE)
+        rebuild_daily_stats()
+        self.assertEqual(self._stats(), expected)
+
+        # Archiving removes the rows, not the history: the rebuild reads archived cases back
+        with transaction.atomic():
+            archive_case(self.cases[2])
+        rebuild_daily_stats()
+        self.assertEqual(self._stats(), expected)
+
+    def test_timeseries_endpoint(self):
+        scene_time = timezone.make_aware(timezone.datetime(self.today.year, self.today.month, self.today.day, 22, 30))
+        CrimeScene.objects.create(case=self.cases[0], occurrence_time=scene_time, location='X')
+        response = self.client.get(reverse('case-timeseries'), {'window': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['days']), 30)
+        self.assertEqual(response.data['days'][-1], self.today.isoformat())
+        level_1 = response.data['series'][0]
+        self.assertEqual((level_1['key'], level_1['total']), (Case.CrimeLevel.LEVEL_1, 2))
+        self.assertEqual(level_1['counts'][-2:], [0, 2])
+        self.assertEqual(level_1['moving_average'][-2:], [0.0, 1.0])
+        occurrence = response.data['occurrence']
+        self.assertEqual(occurrence['by_hour'][22], 1)
+        self.assertEqual(occurrence['by_weekday'][self.today.weekday()], 1)
+        self.assertEqual(sum(occurrence['by_hour']), 1)
+
+        response = self.client.get(reverse('case-timeseries'), {'group_by': 'status', 'metric': 'entered'})
+        self.assertEqual([row['key'] for row in response.data['series']], [Case.Status.PENDING_TRAINEE])
+        invalid = ({'group_by': 'title'}, {'start': 'yesterday'}, {'end': 'garbage'}, {'start': '2000-01-01'}, {'window': 0})
+        for params in invalid:
+            self.assertEqual(self.client.get(reverse('case-timeseries'), params).status_code, 400)
+
+    def test_pure_python_fallback_matches(self):
+        start = self.today - timedelta(days=3)
+        rows = [(start, 'a', 2), (start + timedelta(days=2), 'a', 1), (start + timedelta(days=3), 'b', 5)]
+        values = [3, 0, 4, 1, 1]
+        pairs = [(0, 1), (23, 7), (23, 7)]
+        computed = (analytics.dense_series(rows, start, 4), analytics.moving_average(values, 3),
+                    analytics.occurrence_histogram(pairs))
+        with mock.patch.object(analytics, 'np', None):
+            fallback = (analytics.dense_series(rows, start, 4), analytics.moving_average(values, 3),
+                        analytics.occurrence_histogram(pairs))
+        self.assertEqual(computed, fallback)
+        self.assertEqual(computed[0], {'a': [2, 0, 1, 0], 'b': [0, 0, 0, 5]})
+        self.assertEqual(computed[1], [3.0, 1.5, 2.33, 1.67, 2.0])
+        self.assertEqual(computed[2]['by_weekday'], [1, 0, 0, 0, 0, 0, 2])
+
+
+class CrimeSceneGeoTests(APITestCase):
+    # Around Azadi Square, Tehran; the last scene is ~3.2 km east of the first
+    POINTS = [(35.6997, 51.3380), (35.6990, 51.3385), (35.6995, 51.3390), (35.6997, 51.3730)]
+
+    def setUp(self):
+        self.officer = get_user_model().objects.create_user('geo', 'g@test.com', 'pass')
+        self.officer.roles.add(Role.objects.get_or_create(code='captain', defaults={'name': 'Captain'})[0])
+        self.client.force_authenticate(self.officer)
+        self.scenes = [
+            CrimeScene.objects.create(
+                case=Case.objects.create(title=f'Scene {index}', description='d'),
+                occurrence_time=timezone.now() - timedelta(days=index), location='Tehran',
+                latitude=latitude, longitude=longitude,
+            )
+            for index, (latitude, longitude) in enumerate(self.POINTS)
+        ]
+
+    def test_geohash_is_kept_in_sync(self):
+        scene = self.scenes[0]
+        self.assertEqual(scene.geohash[:6], 'tnke04')
+        scene.latitude = scene.longitude = None
+        scene.save(update_fields=['latitude', 'longitude'])
+        self.assertEqual(CrimeScene.objects.get(pk=scene.pk).geohash, '')
+
+    def test_nearby_by_radius_and_bbox(self):
+        url = reverse('case-nearby')
+        response = self.client.get(url, {'lat': 35.6997, 'lon': 51.3380, 'radius_km': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['case'] for row in response.data][0], self.scenes[0].case_id)
+        self.assertEqual({row['case'] for row in response.data}, {scene.case_id for scene in self.scenes[:3]})
+
+        response = self.client.get(url, {'lat': 35.6997, 'lon': 51.3380, 'radius_km': 5})
+        self.assertAlmostEqual(response.data[-1]['distance_km'], 3.16, places=2)
+
+        response = self.client.get(url, {'bbox': '35.69,51.37,35.71,51.38'})
+        self.assertEqual([row['case'] for row in response.data], [self.scenes[3].case_id])
+
+        for params in ({'bbox': '35.71,51.3,35.69,51.4'}, {'lat': 35.7}, {'lat': 35.7, 'lon': 51.3, 'radius_km': 500}):
+            self.assertEqual(self.client.get(url, params).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_hotspots_within_time_window(self):
+        response = self.client.get(reverse('crime-hotspots'), {'precision': 6})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['hotspots']), 1)
+        hotspot = response.data['hotspots'][0]
+        self.assertEqual(hotspot['count'], 3)
+        south, west, north, east = hotspot['bounds']
+        self.assertTrue(south <= hotspot['latitude'] <= north and west <= hotspot['longitude'] <= east)
+
+        yesterday = (timezone.localdate() - timedelta(days=1)).isoformat()
+        response = self.client.get(reverse('crime-hotspots'), {'precision': 6, 'end': yesterday, 'min_count': 1})
+        self.assertEqual(sum(cell['count'] for cell in response.data['hotspots']), 3)
+
+    def test_hotspots_only_count_visible_cases(self):
+        """Scenes of cases a police officer cannot open do not shape the hotspots"""
+        officer = get_user_model().objects.create_user('patrol', 'p@test.com', 'pass')
+        officer.roles.add(Role.objects.get_or_create(code='police_officer', defaults={'name': 'Officer'})[0])
+        Case.objects.filter(pk__in=[self.scenes[0].case_id, self.scenes[1].case_id]).update(status=Case.Status.ACTIVE)
+        self.client.force_authenticate(officer)
+
+        response = self.client.get(reverse('crime-hotspots'), {'precision': 6, 'min_count': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([cell['count'] for cell in response.data['hotspots']], [2])
+        self.assertEqual(response.data['hotspots'][0]['latitude'], round((self.POINTS[0][0] + self.POINTS[1][0]) / 2, 6))
+
+    def test_geohash_cover_contains_box(self):
+        from . import geo
+
+        for box in [(35.69, 51.33, 35.71, 51.38), (-10, -20, 10, 20), (-90, -180, 90, 180)]:
+            cells = geo.cover(*box)
+            self.assertLessEqual(len(cells), 32)
+            for latitude, longitude in [(box[0], box[1]), (box[2], box[3]), ((box[0] + box[2]) / 2, box[1])]:
+                self.assertTrue(any(geo.encode(latitude, longitude).startswith(cell) for cell in cells))
+
+        distances = geo.distances_km(35.6997, 51.3380, self.POINTS)
+        with mock.patch.object(geo, 'np', None):
+            self.assertEqual([round(d, 9) for d in geo.distances_km(35.6997, 51.3380, self.POINTS)],
+                             [round(d, 9) for d in distances])
+
+
+class WitnessIndexTests(APITestCase):
+    def setUp(self):
+        self.officer = get_user_model().objects.create_user('wit', 'w@test.com', 'pass')
+        self.officer.roles.add(Role.objects.get_or_create(code='captain', defaults={'name': 'Captain'})[0])
+        self.client.force_authenticate(self.officer)
+        self.scenes = [
+            CrimeScene.objects.create(
+                case=Case.objects.create(title=f'W{index}', description='d'),
+                occurrence_time=timezone.now() - timedelta(days=index * 10), location='L',
+            )
+            for index in range(3)
+        ]
+        # The same person typed three different ways
+        SceneWitness.objects.create(scene=self.scenes[0], national_code='0012345678', phone='09121234567')
+        SceneWitness.objects.create(scene=self.scenes[1], national_code='۰۰۱۲۳۴۵۶۷۸', phone='+98 912 123 4567')
+        SceneWitness.objects.create(scene=self.scenes[2], national_code='12345678', phone='9121234567')
+        SceneWitness.objects.create(scene=self.scenes[2], national_code='9999999999', phone='09350000000')
+
+    def test_identifiers_are_normalized(self):
+        self.assertEqual(
+            set(SceneWitness.objects.values_list('normalized_national_code', 'normalized_phone')),
+            {('0012345678', '09121234567'), ('9999999999', '09350000000')},
+        )
+
+    def test_cases_by_witness(self):
+        url = reverse('case-by-witness')
+        response = self.client.get(url, {'phone': '0098-912-123-4567'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['case'] for row in response.data], [scene.case_id for scene in self.scenes])
+        response = self.client.get(url, {'national_code': '9999999999'})
+        self.assertEqual([row['case'] for row in response.data], [self.scenes[2].case_id])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_top_recurring_witnesses(self):
+        url = reverse('recurring-witnesses')
+        # permission roles, visible_cases roles, the GROUP BY and the case ids
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['witnesses']), 1)
+        top = response.data['witnesses'][0]
+        self.assertEqual((top['national_code'], top['scenes']), ('0012345678', 3))
+        self.assertEqual(top['cases'], sorted(scene.case_id for scene in self.scenes))
+
+        start = (timezone.localdate() - timedelta(days=5)).isoformat()
+        response = self.client.get(url, {'by': 'phone', 'start': start, 'min_scenes': 1})
+        self.assertEqual([row['phone'] for row in response.data['witnesses']], ['09121234567'])
+        self.assertEqual(self.client.get(url, {'by': 'name'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_recurring_witnesses_only_come_from_visible_cases(self):
+        """A police officer only sees witnesses of cases in statuses their role may open"""
+        officer = get_user_model().objects.create_user('patrol', 'p@test.com', 'pass')
+        officer.roles.add(Role.objects.get_or_create(code='police_officer', defaults={'name': 'Officer'})[0])
+        Case.objects.filter(pk=self.scenes[2].case_id).update(status=Case.Status.ACTIVE)
+        self.client.force_authenticate(officer)
+
+        response = self.client.get(reverse('recurring-witnesses'), {'min_scenes': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {(row['national_code'], tuple(row['cases'])) for row in response.data['witnesses']},
+            {('0012345678', (self.scenes[2].case_id,)), ('9999999999', (self.scenes[2].case_id,))},
+        )
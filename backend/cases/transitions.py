@@ -0,0 +1,177 @@
+from django.db import transaction
+from django.db.models.expressions import Combinable
+from django.dispatch import Signal
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import Case
+
+
+# Sent after a transition has been written.  Receivers get ``sender`` (the model),
+# ``pks`` (affected primary keys), ``source`` (the status moved from, or None for
+# bulk moves), ``target``, ``instance`` (None for bulk moves), ``actor`` (the user
+# who made the change, if known) and ``changes`` (the other fields written).
+transition_applied = Signal()
+
+
+class TransitionError(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_code = 'invalid_transition'
+
+    def __init__(self, message, current=None, target=None):
+        self.current = current
+        self.target = target
+        super().__init__({'error': message, 'current_status': current, 'target_status': target})
+
+
+class InvalidTransition(TransitionError):
+    """The requested target is not reachable from the row's status."""
+
+
+class TransitionConflict(TransitionError):
+    """Another request changed the row between our read and our update."""
+    status_code = status.HTTP_409_CONFLICT
+    default_code = 'transition_conflict'
+
+
+class StateMachine:
+    """Declared status transitions for a model, applied as conditional updates.
+
+    Every transition is a single ``UPDATE ... SET status = target WHERE pk = ...
+    AND status IN (expected)`` that only writes the status column plus the
+    explicitly passed ``changes``.  If no row matches, someone else moved the row
+    first and ``TransitionConflict`` is raised instead of silently overwriting.
+    """
+
+    def __init__(self, model, transitions, field='status'):
+        self.model = model
+        self.field = field
+        self.transitions = {source: frozenset(targets) for source, targets in transitions.items()}
+        # A self-loop would let two identical concurrent requests both succeed; use stay() instead
+        loops = [source for source, targets in self.transitions.items() if source in targets]
+        if loops:
+            raise ValueError(f'Self-transitions are not allowed: {loops}')
+
+    def _stamp(self, changes):
+        # QuerySet.update() skips auto_now, but delta sync relies on updated_at moving
+        for field in self.model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) and field.name not in changes:
+                changes[field.name] = timezone.now()
+        return changes
+
+    def can_transition(self, source, target):
+        return target in self.transitions.get(source, ())
+
+    def sources_for(self, target):
+        return [source for source, targets in self.transitions.items() if target in targets]
+
+    def apply(self, instance, target, expected=None, match=None, actor=None, **changes):
+        """Move ``instance`` to ``target`` if its row is still in one of ``expected``.
+
+        ``expected`` defaults to the status the caller loaded, which makes the
+        update an optimistic lock on what the reviewer actually saw.  ``match``
+        adds extra equality guards (e.g. a counter read alongside the status).
+        """
+        current = getattr(instance, self.field)
+        if expected is None:
+            expected = [current]
+        allowed = [source for source in expected if self.can_transition(source, target)]
+        if not allowed:
+            raise InvalidTransition(
+                f'Cannot move {self.model._meta.model_name} from {current} to {target}.',
+                current=current, target=target,
+            )
+
+        filters = {'pk': instance.pk, f'{self.field}__in': allowed}
+        filters.update(match or {})
+        changes = self._stamp(changes)
+        self._update_or_conflict(instance, filters, target, {self.field: target, **changes})
+        transition_applied.send(
+            sender=self.model, pks=[instance.pk], source=current, target=target, instance=instance,
+            actor=actor, changes=changes,
+        )
+        return instance
+
+    def stay(self, instance, **changes):
+        """Write ``changes`` for an action that leaves ``instance`` in its current status.
+
+        Not a transition: nothing is validated against the declared graph and
+        ``transition_applied`` is not sent.  The update is still conditional on
+        the status the caller loaded, so a concurrent move raises
+        ``TransitionConflict`` rather than being overwritten.
+        """
+        current = getattr(instance, self.field)
+        changes = self._stamp(changes)
+        self._update_or_conflict(instance, {'pk': instance.pk, self.field: current}, current, changes)
+        return instance
+
+    def apply_or_stay(self, instance, target, actor=None, **changes):
+        """``apply()`` towards ``target``, or ``stay()`` when the row is already there."""
+        if getattr(instance, self.field) == target:
+            return self.stay(instance, **changes)
+        return self.apply(instance, target, actor=actor, **changes)
+
+    def _update_or_conflict(self, instance, filters, target, values):
+        updated = self.model._default_manager.filter(**filters).update(**values)
+        if not updated:
+            latest = (
+                self.model._default_manager.filter(pk=instance.pk)
+                .values_list(self.field, flat=True).first()
+            )
+            raise TransitionConflict(
+                f'{self.model._meta.model_name} was modified concurrently; reload and retry.',
+                current=latest, target=target,
+            )
+        for name, value in values.items():
+            if isinstance(value, Combinable):
+                instance.refresh_from_db(fields=[name])
+            else:
+                setattr(instance, name, value)
+
+    def apply_many(self, queryset, target, actor=None, **changes):
+        """Move every row of ``queryset`` that may legally reach ``target``; returns the count.
+
+        Receivers of ``transition_applied`` get only the rows this UPDATE moved,
+        re-selected inside the same transaction, not every row read beforehand.
+        """
+        sources = self.sources_for(target)
+        with transaction.atomic():
+            pks = list(
+                queryset.select_for_update().filter(**{f'{self.field}__in': sources}).values_list('pk', flat=True)
+            )
+            if not pks:
+                return 0
+            changes = self._stamp(changes)
+            self.model._default_manager.filter(
+                pk__in=pks, **{f'{self.field}__in': sources}
+            ).update(**{self.field: target}, **changes)
+            # No declared self-loops, so rows now in ``target`` are exactly the ones moved above
+            moved = list(
+                self.model._default_manager.filter(pk__in=pks, **{self.field: target}).values_list('pk', flat=True)
+            )
+            if moved:
+                transition_applied.send(
+                    sender=self.model, pks=moved, source=None, target=target, instance=None, actor=actor,
+                    changes=changes,
+                )
+        return len(moved)
+
+
+CASE_TRANSITIONS = StateMachine(Case, {
+    Case.Status.PENDING_TRAINEE: [Case.Status.PENDING_OFFICER, Case.Status.REJECTED, Case.Status.CANCELLED],
+    Case.Status.PENDING_OFFICER: [Case.Status.ACTIVE, Case.Status.PENDING_TRAINEE],
+    Case.Status.REJECTED: [Case.Status.PENDING_TRAINEE],
+    Case.Status.ACTIVE: [Case.Status.PENDING_SERGEANT, Case.Status.PENDING_CHIEF],
+    Case.Status.PENDING_SERGEANT: [Case.Status.IN_PURSUIT, Case.Status.ACTIVE],
+    Case.Status.IN_PURSUIT: [Case.Status.PENDING_CHIEF, Case.Status.ACTIVE],
+    Case.Status.PENDING_CHIEF: [Case.Status.ACTIVE, Case.Status.SOLVED],
+})
+
+
+# Kept apart from CASE_TRANSITIONS so no workflow action can move a closed case;
+# only the admin "reopen" endpoint uses it.
+CASE_REOPEN_TRANSITIONS = StateMachine(Case, {
+    Case.Status.SOLVED: [Case.Status.ACTIVE],
+    Case.Status.CANCELLED: [Case.Status.PENDING_TRAINEE],
+})
@@ -1,138 +1,108 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.views import APIView
+from django.db import transaction
 from django.db.models import Q, Count
-from .models import Case, CrimeScene, SceneWitness
+from django.http import Http404
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import timedelta
+from .analytics import GROUPINGS, METRICS, case_timeseries, occurred_between, occurrence_patterns
+from .geo import bbox_filter, hotspots, parse_bbox, scene_coordinates, within_radius
+from .witnesses import IDENTIFIERS, recurring_witnesses, witness_scenes
+from .models import Case, CaseDossier, CaseEvent, CrimeScene, SceneWitness
 from .serializers import CaseSerializer, WitnessSerializer
-from drf_spectacular.utils import extend_schema
+from .archive import archived_trial_history, find_archived
+from .dossier import build_trial_history, dossier_path, dossier_version, request_dossier
+from .events import event_feed, record_case_event
+from .snapshots import load_snapshot
+from .transitions import CASE_REOPEN_TRANSITIONS, CASE_TRANSITIONS
+from .visibility import visible_cases
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework.reverse import reverse
+from config.http import ConditionalRetrieveMixin, ranged_file_response
+from config.query_plans import QueryPlanMixin
+from accounts.views import IsAdminUser
 
 
 from .permissions import IsTrainee, IsOfficerOrHigher, IsSergeant, IsChief, IsDetective
 
-class CaseViewSet(viewsets.ModelViewSet):
+class CaseViewSet(ConditionalRetrieveMixin, QueryPlanMixin, viewsets.ModelViewSet):
     serializer_class = CaseSerializer
     permission_classes = [permissions.IsAuthenticated]
+    nearby_limit = 200
 
     def get_queryset(self):
-        user = self.request.user
-        roles = list(user.roles.values_list('code', flat=True))
-        
-        # Chiefs and Captains see everything
-        if user.is_superuser or 'police_chief' in roles or 'captain' in roles:
-            return Case.objects.all()
-        
-        # Start with a filter that returns nothing
-        conditions = Q(pk__in=[])
-        
-        # Build conditions based on roles
-        if 'trainee' in roles:
-            conditions |= Q(status=Case.Status.PENDING_TRAINEE)
-            
-        if 'police_officer' in roles:
-            conditions |= Q(status__in=[Case.Status.PENDING_OFFICER, Case.Status.ACTIVE, Case.Status.SOLVED])
-
-        if 'sergeant' in roles:
-            conditions |= Q(status__in=[Case.Status.PENDING_OFFICER, Case.Status.ACTIVE, Case.Status.IN_PURSUIT, Case.Status.PENDING_SERGEANT, Case.Status.PENDING_CHIEF, Case.Status.SOLVED])
-
-        if 'detective' in roles:
-            conditions |= Q(status__in=[Case.Status.ACTIVE, Case.Status.IN_PURSUIT, Case.Status.PENDING_SERGEANT, Case.Status.PENDING_CHIEF, Case.Status.SOLVED])
+        return visible_cases(self.request.user)
 
-        if 'forensic_doctor' in roles:
-            conditions |= Q(status__in=[Case.Status.ACTIVE, Case.Status.SOLVED])
-
-        if 'judge' in roles or 'qazi' in roles:
-            # Match guilty suspects' cases
-            # We use distinct() on the final query because of these joins
-            conditions |= Q(
-                crime_level=0, 
-                suspects__interrogations__feedback__is_chief_confirmed=True, 
-                suspects__interrogations__feedback__decision='GUILTY'
-            )
-            conditions |= Q(
-                crime_level__gt=0, 
-                suspects__interrogations__feedback__is_confirmed=True, 
-                suspects__interrogations__feedback__decision='GUILTY'
-            )
-
-        # Everyone sees cases they created or are involved in
-        conditions |= Q(complainants=user) | Q(creator=user)
-
-        return Case.objects.filter(conditions).distinct()
+    def get_retrieve_data(self, case):
+        # Snapshots hold full rows; sparse requests render live
+        frozen = load_snapshot(case, 'detail') if self.sparse_fieldset() is None else None
+        return frozen if frozen is not None else self.get_serializer(case).data
 
     @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def trial_history(self, request, pk=None):
         """Aggregate all case data for the Judge's/Chief's review (Section 6.4 + Report)"""
-        case = self.get_object()
-        
-        # 1. Base case info
-        data = {
-            'case': CaseSerializer(case).data,
-            'evidence': [],
-            'suspects': [],
-            'verdicts': [],
-            'officers_involved': [],
-            'complainants': [],
-            'witnesses': []
+        try:
+            case = self.get_object()
+        except Http404:
+            # Archived (cold) cases are no longer in the case table but stay readable here
+            archived = find_archived(pk, request.user)
+            if archived is None:
+                raise
+            return Response(archived_trial_history(archived))
+        frozen = load_snapshot(case, 'trial_history')
+        return Response(frozen if frozen is not None else build_trial_history(case))
+
+    def _dossier_payload(self, dossier):
+        payload = {
+            'status': dossier.status,
+            'version': dossier.version,
+            'size': dossier.size,
+            'created_at': dossier.created_at,
+            'finished_at': dossier.finished_at,
         }
-
-        # 2. Get All Evidence
-        from evidence.models import Evidence
-        from evidence.serializers import EvidenceBaseSerializer
-        evidence_objs = Evidence.objects.filter(case=case)
-        data['evidence'] = EvidenceBaseSerializer(evidence_objs, many=True).data
-
-        # 3. Get All Suspects & Interrogations
-        from investigation.models import Suspect, Interrogation
-        from investigation.serializers import SuspectSerializer
-        suspects_objs = Suspect.objects.filter(case=case)
-        data['suspects'] = SuspectSerializer(suspects_objs, many=True).data
-
-        # 4. Get Existing Verdicts
-        from investigation.models import Verdict
-        from investigation.serializers import VerdictSerializer
-        verdicts = Verdict.objects.filter(case=case)
-        data['verdicts'] = VerdictSerializer(verdicts, many=True).data
-
-        # 5. Complainants
-        from .serializers import CaseComplainantSerializer
-        data['complainants'] = CaseComplainantSerializer(case.complainant_details.all(), many=True).data
-
-        # 6. Witnesses
-        if hasattr(case, 'scene_data'):
-            from .serializers import WitnessSerializer
-            data['witnesses'] = WitnessSerializer(case.scene_data.witnesses.all(), many=True).data
-
-        # 7. Involved People (with detail)
-        involved_users = set()
-        if case.creator:
-            involved_users.add(case.creator)
-        
-        for ev in evidence_objs:
-            if ev.recorder:
-                involved_users.add(ev.recorder)
-        
-        for s in suspects_objs:
-            interrogations = Interrogation.objects.filter(suspect=s)
-            for i in interrogations:
-                if i.interrogator:
-                    involved_users.add(i.interrogator)
-                if i.supervisor:
-                    involved_users.add(i.supervisor)
-        
-        detail_involved = []
-        for u in involved_users:
-            detail_involved.append({
-                'username': u.username,
-                'full_name': u.get_full_name(),
-                'roles': [r.name for r in u.roles.all()],
-                'is_staff': u.is_staff
-            })
-        data['officers_involved'] = detail_involved
-
-        return Response(data)
+        if dossier.status == CaseDossier.Status.READY:
+            payload['download_url'] = reverse('case-dossier-download', args=[dossier.case_id], request=self.request)
+        if dossier.status == CaseDossier.Status.FAILED:
+            payload['error'] = dossier.error
+        return payload
+
+    @extend_schema(summary="ساخت / وضعیت پرونده‌ی دادگاه (ZIP شامل تاریخچه، تصاویر مدارک و فایل‌های شهود)")
+    @action(detail=True, methods=['get', 'post'])
+    def dossier(self, request, pk=None):
+        """POST schedules a background build for the case's current version (or reuses the cached one); GET polls."""
+        case = self.get_object()
+        if request.method == 'POST':
+            dossier = request_dossier(case, request.user)
+        else:
+            dossier = CaseDossier.objects.filter(case=case, version=dossier_version(case)).first()
+            if dossier is None:
+                return Response({'status': None, 'error': 'No dossier has been requested for this version of the case.'},
+                                status=status.HTTP_404_NOT_FOUND)
+        code = status.HTTP_200_OK if dossier.status == CaseDossier.Status.READY else status.HTTP_202_ACCEPTED
+        return Response(self._dossier_payload(dossier), status=code)
+
+    @extend_schema(summary="دانلود پرونده‌ی دادگاه (پشتیبانی از Range و ETag)")
+    @action(detail=True, methods=['get'], url_path='dossier/download')
+    def dossier_download(self, request, pk=None):
+        case = self.get_object()
+        dossier = (
+            CaseDossier.objects.filter(case=case, status=CaseDossier.Status.READY)
+            .order_by('-finished_at').first()
+        )
+        if dossier is None or not dossier_path(dossier).exists():
+            return Response({'error': 'Dossier is not ready yet; POST to the dossier endpoint first.'},
+                            status=status.HTTP_404_NOT_FOUND)
+        return ranged_file_response(
+            request, dossier_path(dossier), 'application/zip',
+            filename=f'dossier-case-{case.pk}.zip', etag=f'"dossier-{dossier.version}"',
+        )
 
     def perform_create(self, serializer):
         case = serializer.save(creator=self.request.user)
+        record_case_event(case.pk, CaseEvent.Kind.CREATED, actor=self.request.user, to_status=case.status)
         # If it's a complaint (not from scene), add creator as first complainant
         if case.status == Case.Status.PENDING_TRAINEE:
             case.complainants.add(self.request.user)
@@ -149,10 +119,11 @@ class CaseViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Only rejected cases can be resubmitted'}, status=status.HTTP_400_BAD_REQUEST)
         
         # Allow updating title and description during resubmission
-        case.title = request.data.get('title', case.title)
-        case.description = request.data.get('description', case.description)
-        case.status = Case.Status.PENDING_TRAINEE
-        case.save()
+        CASE_TRANSITIONS.apply(
+            case, Case.Status.PENDING_TRAINEE, actor=request.user,
+            title=request.data.get('title', case.title),
+            description=request.data.get('description', case.description),
+        )
         return Response({'status': 'resubmitted', 'title': case.title})
 
     @action(detail=False, methods=['post'], permission_classes=[IsOfficerOrHigher])
@@ -162,16 +133,22 @@ class CaseViewSet(viewsets.ModelViewSet):
         # Shortcut: Chief bypasses approval
         is_chief = request.user.roles.filter(code='police_chief').exists()
         case_status = Case.Status.ACTIVE if is_chief else Case.Status.PENDING_OFFICER
-        
+        try:
+            latitude, longitude = scene_coordinates(data)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
         case = Case.objects.create(
             title=data['title'], description=data['description'],
             crime_level=data['crime_level'], creator=request.user, status=case_status
         )
         scene = CrimeScene.objects.create(
-            case=case, location=data['location'], occurrence_time=data['occurrence_time']
+            case=case, location=data['location'], occurrence_time=data['occurrence_time'],
+            latitude=latitude, longitude=longitude,
         )
         for w in data.get('witnesses', []):
             SceneWitness.objects.create(scene=scene, **w)
+        record_case_event(case.pk, CaseEvent.Kind.CREATED, actor=request.user, to_status=case.status, data={'from_scene': True})
         return Response(CaseSerializer(case).data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['post'], permission_classes=[IsTrainee])
@@ -179,18 +156,28 @@ class CaseViewSet(viewsets.ModelViewSet):
         """Logic for 3-strike rule (Section 4.2.1)"""
         case = self.get_object()
         approved = request.data.get('approved', False)
-        if approved:
-            case.status = Case.Status.PENDING_OFFICER
-        else:
-            case.submission_attempts += 1
-            case.status = Case.Status.CANCELLED if case.submission_attempts >= 3 else Case.Status.REJECTED
-        case.review_notes = request.data.get('notes', '')
-        case.save()
-        
-        # Confirm/Reject specific complainants
-        complainant_ids = request.data.get('confirmed_complainants', [])
-        case.complainant_details.filter(user_id__in=complainant_ids).update(is_confirmed=True)
-        case.complainant_details.exclude(user_id__in=complainant_ids).update(is_confirmed=False)
+        notes = request.data.get('notes', '')
+        with transaction.atomic():
+            if approved:
+                CASE_TRANSITIONS.apply(case, Case.Status.PENDING_OFFICER, actor=request.user, review_notes=notes)
+            else:
+                # Guard on the attempt counter we read so two rejections can't both count as the same strike
+                attempts = case.submission_attempts + 1
+                target = Case.Status.CANCELLED if attempts >= 3 else Case.Status.REJECTED
+                CASE_TRANSITIONS.apply(
+                    case, target, match={'submission_attempts': case.submission_attempts}, actor=request.user,
+                    submission_attempts=attempts, review_notes=notes,
+                )
+
+            # Confirm/Reject specific complainants
+            complainant_ids = request.data.get('confirmed_complainants', [])
+            now = timezone.now()
+            case.complainant_details.filter(user_id__in=complainant_ids, is_confirmed=False).update(
+                is_confirmed=True, updated_at=now,
+            )
+            case.complainant_details.exclude(user_id__in=complainant_ids).filter(is_confirmed=True).update(
+                is_confirmed=False, updated_at=now,
+            )
         
         return Response({'new_status': case.get_status_display()})
 
@@ -240,13 +227,9 @@ class CaseViewSet(viewsets.ModelViewSet):
                 )
 
         approved = request.data.get('approved', False)
-        if approved:
-            case.status = Case.Status.ACTIVE
-        else:
-            # If officer rejects, it goes back to trainee, NOT plaintiff
-            case.status = Case.Status.PENDING_TRAINEE
-        case.review_notes = request.data.get('notes', '')
-        case.save()
+        # If officer rejects, it goes back to trainee, NOT plaintiff
+        target = Case.Status.ACTIVE if approved else Case.Status.PENDING_TRAINEE
+        CASE_TRANSITIONS.apply(case, target, actor=request.user, review_notes=request.data.get('notes', ''))
         return Response({'new_status': case.get_status_display()})
 
     @action(detail=True, methods=['post'])
@@ -275,6 +258,8 @@ class CaseViewSet(viewsets.ModelViewSet):
         case.complainants.add(user)
         from .models import CaseComplainant
         CaseComplainant.objects.get_or_create(case=case, user=user)
+        # The detail nests complainants; move the case's ETag along
+        Case.objects.filter(pk=case.pk).update(updated_at=timezone.now())
         return Response({'status': 'complainant added'})
 
     @action(detail=True, methods=['post'], permission_classes=[IsDetective])
@@ -288,8 +273,7 @@ class CaseViewSet(viewsets.ModelViewSet):
         if not case.suspects.filter(is_main_suspect=True).exists():
             return Response({'error': 'At least one main suspect must be identified'}, status=400)
             
-        case.status = Case.Status.PENDING_SERGEANT
-        case.save()
+        CASE_TRANSITIONS.apply(case, Case.Status.PENDING_SERGEANT, actor=request.user)
         return Response({'status': 'submitted_for_resolution'})
 
     @action(detail=True, methods=['post'], permission_classes=[IsSergeant])
@@ -298,31 +282,33 @@ class CaseViewSet(viewsets.ModelViewSet):
         case = self.get_object()
         approved = request.data.get('approved', False)
         notes = request.data.get('notes', '')
-        case.review_notes = notes
 
         if approved:
-            case.status = Case.Status.IN_PURSUIT
-            case.save()
-            # Put all main suspects into the pursuit list
             from investigation.models import Suspect
-            updated = case.suspects.filter(is_main_suspect=True).update(
-                status=Suspect.Status.UNDER_ARREST,
-                is_arrested=False
-            )
+            from investigation.transitions import SUSPECT_TRANSITIONS
+            with transaction.atomic():
+                CASE_TRANSITIONS.apply(case, Case.Status.IN_PURSUIT, actor=request.user, review_notes=notes)
+                # Put all main suspects into the pursuit list (already-arrested ones stay arrested)
+                updated = SUSPECT_TRANSITIONS.apply_many(
+                    case.suspects.filter(is_main_suspect=True),
+                    Suspect.Status.UNDER_ARREST,
+                    actor=request.user,
+                    is_arrested=False,
+                )
             return Response({
                 'status': 'in_pursuit',
                 'new_status': case.status,
                 'suspects_updated': updated,
             })
         else:
-            case.status = Case.Status.ACTIVE
-            case.save()
+            CASE_TRANSITIONS.apply(case, Case.Status.ACTIVE, actor=request.user, review_notes=notes)
             return Response({'status': 'returned_to_detective', 'new_status': case.status})
 
     @action(detail=True, methods=['post'], permission_classes=[IsSergeant | IsChief])
     def arrest_suspect(self, request, pk=None):
         """Sergeant/Chief marks a specific suspect as officially arrested -> opens interrogation."""
         from investigation.models import Suspect
+        from investigation.transitions import SUSPECT_TRANSITIONS
         case = self.get_object()
         suspect_id = request.data.get('suspect_id')
         if not suspect_id:
@@ -333,9 +319,7 @@ class CaseViewSet(viewsets.ModelViewSet):
             return Response({'error': 'متهم مربوطه در این پرونده یافت نشد.'}, status=404)
         if suspect.status == Suspect.Status.ARRESTED:
             return Response({'error': 'این متهم قبلاً دستگیر شده است.'}, status=400)
-        suspect.status = Suspect.Status.ARRESTED
-        suspect.is_arrested = True
-        suspect.save()
+        SUSPECT_TRANSITIONS.apply(suspect, Suspect.Status.ARRESTED, actor=request.user, is_arrested=True)
         return Response({
             'status': 'arrested',
             'suspect_id': suspect.id,
@@ -347,15 +331,100 @@ class CaseViewSet(viewsets.ModelViewSet):
         """Chief reviews case and forwards to judge stage (PC)."""
         case = self.get_object()
         approved = request.data.get('approved', False)
-        
-        if approved:
-            case.status = Case.Status.PENDING_CHIEF
-        else:
-            case.status = Case.Status.ACTIVE
-            
-        case.save()
+        target = Case.Status.PENDING_CHIEF if approved else Case.Status.ACTIVE
+        CASE_TRANSITIONS.apply_or_stay(case, target, actor=request.user)
         return Response({'status': 'reviewed_by_chief', 'new_status': case.status})
 
+    @extend_schema(summary="بازگشایی پرونده‌ی مختومه یا باطل شده (فقط مدیر)")
+    @action(detail=True, methods=['post'], permission_classes=[IsAdminUser])
+    def reopen(self, request, pk=None):
+        """Solved cases go back to the detectives, cancelled complaints back to trainee review"""
+        case = self.get_object()
+        if case.status == Case.Status.CANCELLED:
+            CASE_REOPEN_TRANSITIONS.apply(
+                case, Case.Status.PENDING_TRAINEE, actor=request.user,
+                submission_attempts=0, review_notes=request.data.get('notes', ''),
+            )
+        else:
+            CASE_REOPEN_TRANSITIONS.apply(
+                case, Case.Status.ACTIVE, actor=request.user, review_notes=request.data.get('notes', ''),
+            )
+        return Response({'status': 'reopened', 'new_status': case.status})
+
+    @extend_schema(
+        summary="پرونده‌های نزدیک یک نقطه یا درون یک محدوده",
+        parameters=[
+            OpenApiParameter(name='bbox', description='south,west,north,east', required=False, type=str),
+            OpenApiParameter(name='lat', description='عرض جغرافیایی مرکز', required=False, type=float),
+            OpenApiParameter(name='lon', description='طول جغرافیایی مرکز', required=False, type=float),
+            OpenApiParameter(name='radius_km', description='شعاع جستجو به کیلومتر، حداکثر ۵۰ (پیش‌فرض ۱)', required=False, type=float),
+        ],
+    )
+    @action(detail=False, methods=['get'])
+    def nearby(self, request):
+        """Visible cases whose crime scene lies in ``?bbox=`` or within ``?radius_km=`` of ``?lat=&lon=``"""
+        params = request.query_params
+        scenes = CrimeScene.objects.filter(case__in=self.get_queryset().values('pk')).select_related('case')
+        try:
+            if params.get('bbox'):
+                matches = [(scene, None) for scene in scenes.filter(bbox_filter(*parse_bbox(params['bbox'])))
+                           .order_by('-occurrence_time')[:self.nearby_limit]]
+            else:
+                latitude, longitude = scene_coordinates({'latitude': params.get('lat'), 'longitude': params.get('lon')})
+                try:
+                    radius_km = float(params.get('radius_km', 1))
+                except ValueError:
+                    radius_km = 0
+                if latitude is None or not 0 < radius_km <= 50:
+                    raise ValueError('Pass bbox, or lat and lon with radius_km in (0, 50].')
+                matches = within_radius(scenes, latitude, longitude, radius_km)[:self.nearby_limit]
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response([
+            {
+                'case': scene.case_id,
+                'title': scene.case.title,
+                'status': scene.case.status,
+                'crime_level': scene.case.crime_level,
+                'location': scene.location,
+                'latitude': scene.latitude,
+                'longitude': scene.longitude,
+                'occurrence_time': scene.occurrence_time,
+                'distance_km': None if distance is None else round(distance, 3),
+            }
+            for scene, distance in matches
+        ])
+
+    @extend_schema(
+        summary="پرونده‌هایی که یک شاهد در صحنه‌ی جرم آن‌ها حضور داشته است",
+        parameters=[
+            OpenApiParameter(name='national_code', description='کد ملی شاهد', required=False, type=str),
+            OpenApiParameter(name='phone', description='شماره تماس شاهد', required=False, type=str),
+        ],
+    )
+    @action(detail=False, methods=['get'], url_path='by-witness', permission_classes=[IsOfficerOrHigher])
+    def by_witness(self, request):
+        """Visible cases whose crime scene lists the witness given by ``?national_code=`` or ``?phone=``"""
+        identifier = next((name for name in IDENTIFIERS if request.query_params.get(name)), None)
+        if identifier is None:
+            return Response({'error': 'Pass national_code or phone.'}, status=status.HTTP_400_BAD_REQUEST)
+        scenes = witness_scenes(
+            CrimeScene.objects.filter(case__in=self.get_queryset().values('pk')).select_related('case'),
+            identifier, request.query_params[identifier],
+        )
+        return Response([
+            {
+                'case': scene.case_id,
+                'title': scene.case.title,
+                'status': scene.case.status,
+                'crime_level': scene.case.crime_level,
+                'location': scene.location,
+                'occurrence_time': scene.occurrence_time,
+            }
+            for scene in scenes.order_by('-occurrence_time')[:self.nearby_limit]
+        ])
+
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """Checkpoint 1: Aggregated Stats for Dashboard"""
@@ -388,3 +457,178 @@ class CaseViewSet(viewsets.ModelViewSet):
         })
 
 
+
+    def _event_page(self, request, queryset):
+        from .serializers import CaseEventSerializer
+
+        try:
+            after = int(request.query_params.get('after') or 0)
+            limit = min(max(int(request.query_params.get('limit', 100)), 1), 500)
+        except ValueError:
+            return Response({'error': 'after and limit must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        events, cursor, has_more = event_feed(queryset, after=after, limit=limit)
+        return Response({
+            'results': CaseEventSerializer(events, many=True).data,
+            'cursor': cursor,
+            'has_more': has_more,
+        })
+
+    @extend_schema(summary="تاریخچه رویدادهای پرونده (صفحه‌بندی با after=<id آخرین رویداد>)")
+    @action(detail=True, methods=['get'])
+    def events(self, request, pk=None):
+        case = self.get_object()
+        return self._event_page(request, CaseEvent.objects.filter(case=case))
+
+    @extend_schema(summary="فید تغییرات همه‌ی پرونده‌های قابل مشاهده (صفحه‌بندی با after)")
+    @action(detail=False, methods=['get'], url_path='events')
+    def feed(self, request):
+        return self._event_page(request, CaseEvent.objects.filter(case__in=visible_cases(request.user).values('pk')))
+
+
+def _date_range(params, max_days=366, default_days=30):
+    """(start, end) dates from ``?start=`` / ``?end=``, by default the ``default_days`` days up to today.
+
+    Raises ValueError for malformed dates or a range outside 1..``max_days`` days.
+    """
+    try:
+        end = parse_date(params['end']) if params.get('end') else timezone.localdate()
+        start = parse_date(params['start']) if params.get('start') else None
+    except ValueError:
+        start = end = None
+    if end is None or (start is None and params.get('start')):
+        raise ValueError('start/end must be dates (YYYY-MM-DD).')
+    start = start or end - timedelta(days=default_days - 1)
+    if not 0 <= (end - start).days < max_days:
+        raise ValueError(f'The range must span 1-{max_days} days.')
+    return start, end
+
+
+class CaseTimeSeriesView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary="سری زمانی روزانه پرونده‌ها",
+        description=(
+            "تعداد روزانه پرونده‌ها به تفکیک سطح جرم یا وضعیت، همراه با میانگین متحرک، "
+            "و توزیع ساعت و روز هفته‌ی وقوع جرم در صحنه‌های ثبت‌شده در همان بازه."
+        ),
+        parameters=[
+            OpenApiParameter(name='start', description='تاریخ شروع (YYYY-MM-DD، پیش‌فرض ۳۰ روز پیش)', required=False, type=str),
+            OpenApiParameter(name='end', description='تاریخ پایان (YYYY-MM-DD، پیش‌فرض امروز)', required=False, type=str),
+            OpenApiParameter(name='group_by', description='crime_level یا status', required=False, type=str),
+            OpenApiParameter(name='metric', description='opened (ثبت) یا entered (ورود به وضعیت)', required=False, type=str),
+            OpenApiParameter(name='window', description='طول پنجره‌ی میانگین متحرک به روز (پیش‌فرض ۷)', required=False, type=int),
+        ],
+        responses={200: dict}
+    )
+    def get(self, request):
+        params = request.query_params
+        try:
+            start, end = _date_range(params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            window = int(params.get('window', 7))
+        except ValueError:
+            window = 0
+        if not 1 <= window <= 90:
+            return Response({'error': 'window must be an integer in 1-90.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        group_by, metric = params.get('group_by', 'crime_level'), params.get('metric', 'opened')
+        if group_by not in GROUPINGS or metric not in METRICS:
+            return Response({'error': f"group_by must be one of {', '.join(GROUPINGS)}; metric one of {', '.join(METRICS)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'start': start,
+            'end': end,
+            'group_by': group_by,
+            'metric': metric,
+            'window': window,
+            **case_timeseries(start, end, group_by, metric, window),
+            'occurrence': occurrence_patterns(start, end),
+        })
+
+
+class CrimeHotspotView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsOfficerOrHigher]
+
+    @extend_schema(
+        summary="کانون‌های جرم",
+        description=(
+            "پرتراکم‌ترین خانه‌های شبکه‌ی geohash از صحنه‌های جرمی که در بازه‌ی زمانی داده‌شده رخ داده‌اند، "
+            "با تعداد، مرکز ثقل و محدوده‌ی هر خانه."
+        ),
+        parameters=[
+            OpenApiParameter(name='start', description='تاریخ شروع (YYYY-MM-DD، پیش‌فرض ۳۰ روز پیش)', required=False, type=str),
+            OpenApiParameter(name='end', description='تاریخ پایان (YYYY-MM-DD، پیش‌فرض امروز)', required=False, type=str),
+            OpenApiParameter(name='precision', description='دقت geohash خانه‌ها، ۳ تا ۸ (پیش‌فرض ۶، حدود ۱.۲×۰.۶ کیلومتر)', required=False, type=int),
+            OpenApiParameter(name='min_count', description='حداقل تعداد صحنه در هر خانه (پیش‌فرض ۲)', required=False, type=int),
+            OpenApiParameter(name='bbox', description='محدود کردن به south,west,north,east', required=False, type=str),
+        ],
+        responses={200: dict}
+    )
+    def get(self, request):
+        params = request.query_params
+        try:
+            start, end = _date_range(params)
+            scenes = CrimeScene.objects.filter(
+                occurred_between(start, end), case__in=visible_cases(request.user).values('pk'),
+            )
+            if params.get('bbox'):
+                scenes = scenes.filter(bbox_filter(*parse_bbox(params['bbox'])))
+            precision = int(params.get('precision', 6))
+            min_count = int(params.get('min_count', 2))
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if not 3 <= precision <= 8 or min_count < 1:
+            return Response({'error': 'precision must be in 3-8 and min_count at least 1.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'start': start,
+            'end': end,
+            'precision': precision,
+            'hotspots': hotspots(scenes, precision=precision, min_count=min_count),
+        })
+
+
+class RecurringWitnessView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsOfficerOrHigher]
+
+    @extend_schema(
+        summary="شاهدان تکرارشونده در صحنه‌های جرم",
+        description=(
+            "شاهدانی که در صحنه‌ی چند جرم رخ‌داده در بازه‌ی زمانی حضور داشته‌اند، به ترتیب تعداد صحنه‌ها، "
+            "همراه با شناسه‌ی پرونده‌ها. شناسه‌ها پیش از مقایسه یکسان‌سازی می‌شوند (ارقام فارسی، پیش‌شماره‌ی +98 و ...)."
+        ),
+        parameters=[
+            OpenApiParameter(name='start', description='تاریخ شروع (YYYY-MM-DD، پیش‌فرض یک سال پیش)', required=False, type=str),
+            OpenApiParameter(name='end', description='تاریخ پایان (YYYY-MM-DD، پیش‌فرض امروز)', required=False, type=str),
+            OpenApiParameter(name='by', description='national_code (پیش‌فرض) یا phone', required=False, type=str),
+            OpenApiParameter(name='min_scenes', description='حداقل تعداد صحنه (پیش‌فرض ۲)', required=False, type=int),
+        ],
+        responses={200: dict}
+    )
+    def get(self, request):
+        params = request.query_params
+        identifier = params.get('by', 'national_code')
+        try:
+            start, end = _date_range(params, default_days=365)
+            min_scenes = int(params.get('min_scenes', 2))
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if identifier not in IDENTIFIERS or min_scenes < 1:
+            return Response({'error': f"by must be one of {', '.join(IDENTIFIERS)} and min_scenes at least 1."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        witnesses = SceneWitness.objects.filter(
+            scene__in=CrimeScene.objects.filter(occurred_between(start, end)),
+            scene__case__in=visible_cases(request.user).values('pk'),
+        )
+        return Response({
+            'start': start,
+            'end': end,
+            'by': identifier,
+            'witnesses': recurring_witnesses(witnesses, identifier, min_scenes=min_scenes),
+        })
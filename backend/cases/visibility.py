@@ -0,0 +1,87 @@
+from django.db.models import Q
+
+from .models import Case
+
+
+# Judges see cases whose suspect was found guilty: chief-confirmed for critical
+# cases, captain-confirmed otherwise.
+GUILTY_CONFIRMED = Q(
+    crime_level=0,
+    suspects__interrogations__feedback__is_chief_confirmed=True,
+    suspects__interrogations__feedback__decision='GUILTY'
+) | Q(
+    crime_level__gt=0,
+    suspects__interrogations__feedback__is_confirmed=True,
+    suspects__interrogations__feedback__decision='GUILTY'
+)
+
+# Case statuses each working role may read, on top of their own cases
+ROLE_STATUSES = {
+    'trainee': [Case.Status.PENDING_TRAINEE],
+    'police_officer': [Case.Status.PENDING_OFFICER, Case.Status.ACTIVE, Case.Status.SOLVED],
+    'sergeant': [Case.Status.PENDING_OFFICER, Case.Status.ACTIVE, Case.Status.IN_PURSUIT, Case.Status.PENDING_SERGEANT, Case.Status.PENDING_CHIEF, Case.Status.SOLVED],
+    'detective': [Case.Status.ACTIVE, Case.Status.IN_PURSUIT, Case.Status.PENDING_SERGEANT, Case.Status.PENDING_CHIEF, Case.Status.SOLVED],
+    'forensic_doctor': [Case.Status.ACTIVE, Case.Status.SOLVED],
+}
+
+# Roles that may read solved cases
+SOLVED_CASE_ROLES = {role for role, statuses in ROLE_STATUSES.items() if Case.Status.SOLVED in statuses}
+
+ELEVATED_ROLES = {'police_chief', 'captain'}
+JUDGE_ROLES = {'judge', 'qazi'}
+
+
+def visible_cases(user):
+    """Cases ``user`` may see; shared by the case API, delta sync and exports."""
+    roles = list(user.roles.values_list('code', flat=True))
+    
+    # Chiefs and Captains see everything
+    if user.is_superuser or ELEVATED_ROLES.intersection(roles):
+        return Case.objects.all()
+    
+    # Start with a filter that returns nothing
+    conditions = Q(pk__in=[])
+    
+    # Build conditions based on roles
+    for role in roles:
+        if role in ROLE_STATUSES:
+            conditions |= Q(status__in=ROLE_STATUSES[role])
+
+    if JUDGE_ROLES.intersection(roles):
+        # Match guilty suspects' cases
+        # We use distinct() on the final query because of these joins
+        conditions |= GUILTY_CONFIRMED
+
+    # Everyone sees cases they created or are involved in
+    conditions |= Q(complainants=user) | Q(creator=user)
+
+    return Case.objects.filter(conditions).distinct()
+
+
+def case_visibility(case):
+    """What the visibility rules read from a case, kept for rows that outlive it (archives, tombstones)."""
+    return {
+        'status': case.status,
+        'creator_id': case.creator_id,
+        'complainant_ids': list(case.complainants.values_list('pk', flat=True)),
+        'judge_visible': Case.objects.filter(pk=case.pk).filter(GUILTY_CONFIRMED).exists(),
+    }
+
+
+def can_see_kept_case(user, roles, status, creator_id, complainant_ids, judge_visible):
+    """The visible_cases rules evaluated against a case's kept columns; ``roles`` is the user's role codes."""
+    if user.is_superuser or roles & ELEVATED_ROLES:
+        return True
+    if creator_id == user.pk or user.pk in complainant_ids:
+        return True
+    if any(status in ROLE_STATUSES.get(role, ()) for role in roles):
+        return True
+    return bool(roles & JUDGE_ROLES) and judge_visible
+
+
+def can_see_archived(user, archived):
+    """The visible_cases rules evaluated against an ArchivedCase's kept columns."""
+    return can_see_kept_case(
+        user, set(user.roles.values_list('code', flat=True)), archived.status, archived.creator_id,
+        archived.complainant_ids, archived.judge_visible,
+    )
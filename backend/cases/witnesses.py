@@ -0,0 +1,77 @@
+"""Cross-case witness index.
+
+``SceneWitness`` keeps identifiers as typed (Persian digits, dashes, +98
+prefixes...).  Their normalized forms are stored alongside and indexed with
+the scene, so "every scene this person witnessed" is an index lookup and the
+most recurring witnesses are a GROUP BY over the index instead of a scan.
+"""
+import unicodedata
+
+from django.db.models import Count, Max, Min
+
+
+IDENTIFIERS = {'national_code': 'normalized_national_code', 'phone': 'normalized_phone'}
+
+
+def _digits(value):
+    # Accepts Persian/Arabic-Indic digits as well as ASCII
+    return ''.join(str(unicodedata.decimal(ch)) for ch in value or '' if ch.isdecimal())
+
+
+def normalize_national_code(value):
+    digits = _digits(value)
+    # Leading zeros are often dropped when codes pass through spreadsheets
+    return digits.zfill(10) if 0 < len(digits) <= 10 else digits
+
+
+def normalize_phone(value):
+    digits = _digits(value)
+    for prefix in ('0098', '98'):
+        if digits.startswith(prefix) and len(digits) == len(prefix) + 10:
+            return '0' + digits[len(prefix):]
+    if len(digits) == 10 and digits.startswith('9'):
+        return '0' + digits
+    return digits
+
+
+NORMALIZERS = {'national_code': normalize_national_code, 'phone': normalize_phone}
+
+
+def witness_scenes(scenes, identifier, value):
+    """Scenes of ``scenes`` with a witness whose ``identifier`` normalizes like ``value``."""
+    normalized = NORMALIZERS[identifier](value)
+    if not normalized:
+        return scenes.none()
+    return scenes.filter(**{f'witnesses__{IDENTIFIERS[identifier]}': normalized}).distinct()
+
+
+def recurring_witnesses(witnesses, identifier='national_code', min_scenes=2, limit=50):
+    """Witnesses of ``witnesses`` seen at ``min_scenes`` or more scenes, most recurring first, with their cases."""
+    column = IDENTIFIERS[identifier]
+    rows = list(
+        witnesses.exclude(**{column: ''})
+        .values(column)
+        .annotate(
+            scenes=Count('scene', distinct=True),
+            first_seen=Min('scene__occurrence_time'),
+            last_seen=Max('scene__occurrence_time'),
+        )
+        .filter(scenes__gte=min_scenes)
+        .order_by('-scenes', column)[:limit]
+    )
+    cases = {}
+    for value, case_id in (
+        witnesses.filter(**{f'{column}__in': [row[column] for row in rows]})
+        .values_list(column, 'scene__case_id').distinct().order_by(column, 'scene__case_id')
+    ):
+        cases.setdefault(value, []).append(case_id)
+    return [
+        {
+            identifier: row[column],
+            'scenes': row['scenes'],
+            'cases': cases.get(row[column], []),
+            'first_seen': row['first_seen'],
+            'last_seen': row['last_seen'],
+        }
+        for row in rows
+    ]
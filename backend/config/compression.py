@@ -0,0 +1,83 @@
+"""Response compression with brotli (when installed) or gzip.
+
+Like Django's ``GZipMiddleware`` but with a configurable size threshold
+(``COMPRESSION_MIN_SIZE``), brotli negotiation and a type allow-list, so
+uploaded images and ZIP dossiers are not compressed twice.  Streaming
+responses (ranged file downloads) pass through untouched.
+"""
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/msgpack', 'application/javascript', 'application/xml',
+    'application/vnd.oai.openapi', 'text/',
+)
+
+_accept_encoding = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?')
+
+
+def accepted_encodings(header):
+    """Codings of an ``Accept-Encoding`` header, without the ones refused with ``q=0``."""
+    codings = set()
+    for item in header.split(','):
+        match = _accept_encoding.match(item)
+        if not match:
+            continue
+        try:
+            weight = float(match.group(2) or 1)
+        except ValueError:
+            continue
+        if weight > 0:
+            codings.add(match.group(1).lower())
+    return codings
+
+
+def _compress(coding, content):
+    if coding == 'br':
+        return brotli.compress(content, quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5))
+    return compress_string(content)
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+            or not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and 'br' in accepted:
+            coding = 'br'
+        elif 'gzip' in accepted or '*' in accepted:
+            coding = 'gzip'
+        else:
+            return response
+
+        compressed = _compress(coding, response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = coding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            # The compressed body is a different byte sequence
+            response['ETag'] = 'W/' + etag
+        return response
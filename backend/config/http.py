@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import re
+
+from django.db.models import prefetch_related_objects
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.http import content_disposition_header, http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class _RangeFile:
+    """Read-only view of ``length`` bytes of an open file starting at ``start``."""
+
+    def __init__(self, handle, start, length, block_size=64 * 1024):
+        self.handle = handle
+        self.remaining = length
+        self.block_size = block_size
+        handle.seek(start)
+
+    def __iter__(self):
+        while self.remaining > 0:
+            chunk = self.handle.read(min(self.block_size, self.remaining))
+            if not chunk:
+                break
+            self.remaining -= len(chunk)
+            yield chunk
+
+    def close(self):
+        self.handle.close()
+
+
+def ranged_file_response(request, path, content_type, filename, etag=None):
+    """Serve a file from disk with ETag revalidation and single-range ``Range`` support.
+
+    Clients resuming a download send ``Range: bytes=<start>-`` (optionally with
+    ``If-Range: <etag>``) and receive ``206`` with only the missing bytes; a
+    matching ``If-None-Match`` costs nothing at all.  Multi-range requests are
+    answered with the full file, which RFC 9110 allows.
+    """
+    if etag and request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    size = os.path.getsize(path)
+    match = RANGE_HEADER.match(request.headers.get('Range', '').strip())
+    if_range = request.headers.get('If-Range')
+    if match and (not if_range or if_range == etag) and any(match.groups()):
+        first, last = match.groups()
+        if first:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+        else:
+            start, end = max(size - int(last), 0), size - 1
+        if start >= size or start > end:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        response = StreamingHttpResponse(
+            _RangeFile(open(path, 'rb'), start, end - start + 1), status=206, content_type=content_type,
+        )
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=content_type, as_attachment=True, filename=filename)
+
+    response['Accept-Ranges'] = 'bytes'
+    if etag:
+        response['ETag'] = etag
+    return response
+
+
+def version_etag(request, *parts):
+    """Opaque ETag for a version fingerprint (timestamps, counts, ids...) in the negotiated format."""
+    renderer = getattr(request, 'accepted_renderer', None)
+    parts += (renderer.format if renderer is not None else None,)
+    return '"%s"' % hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()[:32]
+
+
+def not_modified(request, etag, last_modified=None):
+    """RFC 9110 revalidation: ``If-None-Match`` (weak comparison, since compression weakens ETags),
+    else ``If-Modified-Since``."""
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        tags = {tag.removeprefix('W/') for tag in parse_etags(if_none_match)}
+        return '*' in tags or etag in tags
+    since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return bool(since and last_modified and int(last_modified.timestamp()) <= since)
+
+
+def conditional_response(request, version, build, last_modified=None, cache_control='private, no-cache'):
+    """``304`` when the client's copy of ``version`` is current, else ``Response(build())``; both carry validators.
+
+    ``build`` only runs on a miss, so an unchanged resource costs the queries
+    that produced ``version`` and nothing else.
+    """
+    etag = version_etag(request, *version)
+    if not_modified(request, etag, last_modified):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(build())
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = cache_control
+    return response
+
+
+class ConditionalRetrieveMixin:
+    """Serves ``retrieve`` as ``304`` while the object's ``updated_at`` is unchanged, before serializing it.
+
+    Code that changes rows the serializer nests without saving the object
+    itself touches its ``updated_at``.  The query plan's prefetches only run
+    when the object is actually rendered.
+    """
+    detail_cache_control = 'private, no-cache'
+
+    def get_retrieve_data(self, instance):
+        return self.get_serializer(instance).data
+
+    def retrieve(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookups = queryset._prefetch_related_lookups
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        instance = get_object_or_404(
+            queryset.prefetch_related(None), **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+        )
+        self.check_object_permissions(request, instance)
+
+        def build():
+            prefetch_related_objects([instance], *lookups)
+            return self.get_retrieve_data(instance)
+
+        version = (instance._meta.label_lower, instance.pk, instance.updated_at)
+        return conditional_response(request, version, build, instance.updated_at, self.detail_cache_control)
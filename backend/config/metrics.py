@@ -0,0 +1,187 @@
+"""Per-endpoint request metrics, exposed in the Prometheus text format.
+
+``RequestMetricsMiddleware`` times every request, counts its SQL queries and
+their total time through ``connection.execute_wrapper`` and records them per
+URL name (routers name every action, e.g. ``case-trial-history``).  Requests
+slower than ``METRICS_SLOW_REQUEST_MS`` are logged with their slowest
+statements.
+
+Metrics live in the worker process, like the in-process board broker: each
+worker reports its own counters, which Prometheus aggregates by instance.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 ** 2, 10 * 1024 ** 2)
+
+# Statements quoted in a slow-request log line
+SLOW_LOG_STATEMENTS = 10
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a label tuple."""
+
+    def __init__(self, name, help_text, buckets, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label_names = label_names
+        self.series = {}
+
+    def observe(self, labels, value):
+        counts, total = self.series.get(labels, (None, 0))
+        if counts is None:
+            counts = [0] * (len(self.buckets) + 1)
+        counts[bisect_left(self.buckets, value)] += 1
+        self.series[labels] = (counts, total + value)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total) in sorted(self.series.items()):
+            base = _labels(self.label_names, labels)
+            running = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                running += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {running}')
+            lines.append(f'{self.name}_sum{{{base}}} {round(total, 6)}')
+            lines.append(f'{self.name}_count{{{base}}} {running}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.series = {}
+
+    def inc(self, labels, amount=1):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        lines.extend(
+            f'{self.name}{{{_labels(self.label_names, labels)}}} {value}'
+            for labels, value in sorted(self.series.items())
+        )
+        return lines
+
+
+def _labels(names, values):
+    return ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for name, value in zip(names, values)
+    )
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.extra = []
+        self.reset()
+
+    def reset(self):
+        """Start every series from zero; registered metrics stay registered."""
+        buckets = getattr(settings, 'METRICS_LATENCY_BUCKETS', DEFAULT_LATENCY_BUCKETS)
+        endpoint = ('view', 'method')
+        self.requests = Counter('http_requests_total', 'Requests by endpoint and status.', endpoint + ('status',))
+        self.latency = Histogram(
+            'http_request_duration_seconds', 'Time spent producing the response.', buckets, endpoint,
+        )
+        self.queries = Histogram('http_request_db_queries', 'SQL statements per request.', QUERY_BUCKETS, endpoint)
+        self.db_time = Histogram(
+            'http_request_db_duration_seconds', 'Time spent in SQL per request.', buckets, endpoint,
+        )
+        self.size = Histogram('http_response_size_bytes', 'Response body size.', SIZE_BUCKETS, endpoint)
+        for metric in self.extra:
+            metric.series.clear()
+
+    def register(self, metric):
+        """Add a metric owned by another module (it must offer ``series`` and ``render()``)."""
+        with self.lock:
+            self.extra.append(metric)
+        return metric
+
+    def record(self, view, method, status, duration, queries, db_time, size):
+        labels = (view, method)
+        with self.lock:
+            self.requests.inc(labels + (status,))
+            self.latency.observe(labels, duration)
+            self.queries.observe(labels, queries)
+            self.db_time.observe(labels, db_time)
+            if size is not None:
+                self.size.observe(labels, size)
+
+    def render(self):
+        with self.lock:
+            lines = []
+            for metric in (self.requests, self.latency, self.queries, self.db_time, self.size, *self.extra):
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class QueryTimer:
+    """``execute_wrapper`` callback collecting (offset, duration, sql) of every statement.
+
+    Offsets are seconds since the timer was created, so the list doubles as a timeline.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.statements.append((started - self.origin, time.perf_counter() - started, sql))
+
+    @property
+    def total(self):
+        return sum(duration for _, duration, _ in self.statements)
+
+
+def endpoint_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else 'unmatched'
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        view = endpoint_name(request)
+        db_time = timer.total
+        size = None if response.streaming else len(response.content)
+        registry.record(view, request.method, response.status_code, duration, len(timer.statements), db_time, size)
+
+        threshold = getattr(settings, 'METRICS_SLOW_REQUEST_MS', 500)
+        if threshold is not None and duration * 1000 >= threshold:
+            slowest = sorted(timer.statements, key=lambda item: item[1], reverse=True)[:SLOW_LOG_STATEMENTS]
+            logger.warning(
+                'Slow request %s %s (%s) took %.0fms: %d queries, %.0fms in SQL\n%s',
+                request.method, request.get_full_path(), view, duration * 1000, len(timer.statements),
+                db_time * 1000, '\n'.join(f'  {elapsed * 1000:.1f}ms  {sql}' for _, elapsed, sql in slowest),
+            )
+        return response
@@ -0,0 +1,129 @@
+"""Opt-in, per-request profiling for superusers.
+
+A superuser adds ``?profile=1`` (or an ``X-Profile: 1`` header) to any request;
+the request then runs under ``cProfile`` with a SQL timeline and is stored in
+``PROFILE_ROOT`` as a ``.prof`` file (pstats format, for snakeviz & co.) next
+to a ``.json`` summary.  Only the newest ``PROFILE_KEEP`` profiles are kept.
+The response names the profile in ``X-Profile-Id``; ``/api/profiles/`` lists
+and serves them.
+"""
+import cProfile
+import io
+import json
+import pstats
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .metrics import QueryTimer, endpoint_name
+
+
+PROFILE_ID = re.compile(r'^\d{8}T\d{12}-[0-9a-f]{8}$')
+
+# Functions quoted in the stored summary, by cumulative time
+SUMMARY_FUNCTIONS = 40
+
+
+def profile_root():
+    root = settings.PROFILE_ROOT
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def profile_path(profile_id, suffix):
+    if not PROFILE_ID.match(profile_id):
+        raise FileNotFoundError(profile_id)
+    return profile_root() / f'{profile_id}{suffix}'
+
+
+def list_profiles():
+    """Summaries (without stats text and SQL) of stored profiles, newest first."""
+    profiles = []
+    for path in sorted(profile_root().glob('*.json'), reverse=True):
+        with open(path, encoding='utf-8') as handle:
+            summary = json.load(handle)
+        summary.pop('stats', None)
+        summary.pop('sql', None)
+        profiles.append(summary)
+    return profiles
+
+
+def load_profile(profile_id):
+    with open(profile_path(profile_id, '.json'), encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def _prune(keep):
+    for path in sorted(profile_root().glob('*.json'), reverse=True)[keep:]:
+        path.with_suffix('.prof').unlink(missing_ok=True)
+        path.unlink(missing_ok=True)
+
+
+def _requesting_user(request):
+    """The session user, or the JWT bearer (DRF authenticates it only later, inside the view)."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user
+    from rest_framework.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return authenticated[0] if authenticated else None
+
+
+def wants_profile(request):
+    if request.GET.get('profile') != '1' and request.headers.get('X-Profile') != '1':
+        return False
+    user = _requesting_user(request)
+    return bool(user and user.is_superuser)
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not wants_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = profiler.runcall(self.get_response, request)
+        duration = time.perf_counter() - started
+
+        now = timezone.now()
+        profile_id = f"{now.strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+        stats = io.StringIO()
+        pstats.Stats(profiler, stream=stats).sort_stats('cumulative').print_stats(SUMMARY_FUNCTIONS)
+        profiler.dump_stats(profile_path(profile_id, '.prof'))
+        summary = {
+            'id': profile_id,
+            'created_at': now.isoformat(),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': endpoint_name(request),
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'queries': len(timer.statements),
+            'db_ms': round(timer.total * 1000, 2),
+            'sql': [
+                {'at_ms': round(offset * 1000, 2), 'duration_ms': round(elapsed * 1000, 2), 'sql': sql}
+                for offset, elapsed, sql in timer.statements
+            ],
+            'stats': stats.getvalue(),
+        }
+        with open(profile_path(profile_id, '.json'), 'w', encoding='utf-8') as handle:
+            json.dump(summary, handle, ensure_ascii=False)
+        _prune(settings.PROFILE_KEEP)
+
+        response['X-Profile-Id'] = profile_id
+        return response
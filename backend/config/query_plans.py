@@ -0,0 +1,288 @@
+"""Derive select_related / prefetch_related / only() from what a serializer reads.
+
+``QueryPlanMixin`` walks a viewset's serializer once per class:
+
+* dotted sources (``requester.username``) and nested single serializers over
+  forward or reverse one-to-one relations become ``select_related`` joins;
+* nested ``many=True`` serializers and many-related fields become
+  ``Prefetch`` objects whose querysets carry the nested serializer's own plan;
+* when every field at a level maps onto model columns, that level is
+  restricted with ``only()``.  Method fields, properties, ``source='*'`` and
+  custom ``to_representation`` read arbitrary attributes, so they leave the
+  level's columns untouched.
+
+Lookups the view already asks for win over derived ones, so a view can still
+hand-tune a path the serializer cannot describe (e.g. relations read inside a
+``SerializerMethodField``).
+
+Read requests may also ask for sparse rows.  ``?fields=id,name,interrogations.id``
+keeps only the listed fields (dotted names reach into nested serializers) and
+``?expand=interrogations`` adds the heavy nested fields a serializer lists in
+``Meta.expandable_fields``.  Without either parameter responses keep their
+full shape; with one of them, expandable fields are left out unless named.
+The plan is derived from the trimmed serializer, so dropped relations are not
+fetched and dropped text columns are deferred.
+"""
+import re
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import permissions, relations, serializers
+
+
+DISPLAY_METHOD = re.compile(r'^get_(\w+)_display$')
+
+
+class QueryPlan:
+    def __init__(self, model):
+        self.model = model
+        self.select = set()
+        self.prefetch = {}      # lookup -> QueryPlan of the related model
+        self.columns = set()
+        self.deferred = set()   # text columns only read by fields a sparse request dropped
+        self.complete = True    # False when some field reads something only() could defer
+
+    def queryset(self):
+        return apply_plan(self.model._default_manager.all(), self)
+
+
+def _add_columns(plan, prefix, *names):
+    plan.columns.update(f'{prefix}{name}' for name in names)
+
+
+def _walk(serializer, model, plan, prefix=''):
+    """Add what ``serializer`` (bound to ``model`` rows reached via ``prefix``) reads to ``plan``."""
+    if type(serializer).to_representation is not serializers.Serializer.to_representation:
+        plan.complete = False
+    for field in getattr(serializer, 'sparse_dropped', ()):
+        if len(field.source_attrs) == 1 and _is_text(model, field.source_attrs[0]):
+            plan.deferred.add(f'{prefix}{field.source_attrs[0]}')
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*' or isinstance(field, serializers.SerializerMethodField):
+            plan.complete = False
+            continue
+
+        if isinstance(field, serializers.ListSerializer) or isinstance(field, relations.ManyRelatedField):
+            _walk_many(field, model, plan, prefix)
+        elif isinstance(field, serializers.BaseSerializer):
+            target = _follow(field.source_attrs, model, plan, prefix, join_last=True)
+            if target is not None:
+                related_model, path = target
+                _walk(field, related_model, plan, f'{path}__')
+        else:
+            _follow(field.source_attrs, model, plan, prefix, join_last=not isinstance(field, relations.PrimaryKeyRelatedField))
+
+
+def _follow(attrs, model, plan, prefix, join_last):
+    """Record the joins and column behind a dotted source; returns (model, path) of a joined relation."""
+    for index, attr in enumerate(attrs):
+        last = index == len(attrs) - 1
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            display = DISPLAY_METHOD.match(attr)
+            if last and display and _is_column(model, display.group(1)):
+                _add_columns(plan, prefix, display.group(1))
+            else:
+                plan.complete = False
+            return None
+
+        if not model_field.is_relation:
+            _add_columns(plan, prefix, attr)
+            return None
+        if model_field.many_to_many or model_field.one_to_many:
+            # Reached through a dotted source: fetch whole rows, nothing else is known about their use
+            plan.prefetch.setdefault(f'{prefix}{attr}', QueryPlan(model_field.related_model)).complete = False
+            plan.complete = False
+            return None
+        if last and not join_last:
+            # Primary-key relation: reads the local foreign-key column only
+            _add_columns(plan, prefix, attr)
+            return None
+
+        path = f'{prefix}{attr}'
+        plan.select.add(path)
+        if model_field.concrete:
+            _add_columns(plan, prefix, attr)
+        model, prefix = model_field.related_model, f'{path}__'
+        if last:
+            return model, path
+    return None
+
+
+def _walk_many(field, model, plan, prefix):
+    attrs = field.source_attrs
+    related = _follow(attrs[:-1], model, plan, prefix, join_last=True) if len(attrs) > 1 else (model, prefix.rstrip('_'))
+    if related is None:
+        return
+    owner, path = related
+    owner_prefix = f'{path}__' if path else ''
+    try:
+        model_field = owner._meta.get_field(attrs[-1])
+    except FieldDoesNotExist:
+        plan.complete = False
+        return
+    if not (model_field.many_to_many or model_field.one_to_many):
+        plan.complete = False
+        return
+
+    child_plan = QueryPlan(model_field.related_model)
+    if isinstance(field, relations.ManyRelatedField):
+        if isinstance(field.child_relation, relations.PrimaryKeyRelatedField):
+            _add_columns(child_plan, '', model_field.related_model._meta.pk.name)
+        else:
+            child_plan.complete = False
+    else:
+        _walk(field.child, model_field.related_model, child_plan)
+    if model_field.one_to_many:
+        # The prefetch matches rows back to their parent through this column
+        _add_columns(child_plan, '', model_field.field.name)
+    plan.prefetch[f'{owner_prefix}{attrs[-1]}'] = child_plan
+
+
+def _is_column(model, name):
+    try:
+        return model._meta.get_field(name).concrete
+    except FieldDoesNotExist:
+        return False
+
+
+def _is_text(model, name):
+    try:
+        return model._meta.get_field(name).get_internal_type() == 'TextField'
+    except FieldDoesNotExist:
+        return False
+
+
+# Bounded: sparse selections come from query strings
+@lru_cache(maxsize=512)
+def serializer_plan(serializer_class, model, sparse=None):
+    """The plan for ``serializer_class``, trimmed to a ``parse_sparse()`` selection if given."""
+    serializer = serializer_class()
+    if sparse is not None:
+        trim(serializer, *sparse)
+    plan = QueryPlan(model)
+    _walk(serializer, model, plan)
+    return plan
+
+
+def apply_plan(queryset, plan):
+    existing = {
+        lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup
+        for lookup in queryset._prefetch_related_lookups
+    }
+    if plan.select:
+        queryset = queryset.select_related(*sorted(plan.select))
+    prefetches = [
+        Prefetch(lookup, queryset=child.queryset())
+        for lookup, child in sorted(plan.prefetch.items())
+        if lookup not in existing and not any(lookup.startswith(f'{seen}__') for seen in existing)
+    ]
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+
+    query = queryset.query
+    selected = query.select_related if isinstance(query.select_related, dict) else {}
+    untouched = query.deferred_loading == (frozenset(), True) and not query.annotations
+    if plan.complete and plan.columns and untouched and _paths(selected) <= plan.select:
+        queryset = queryset.only(*sorted(plan.columns))
+    elif plan.deferred and untouched:
+        queryset = queryset.defer(*sorted(plan.deferred))
+    return queryset
+
+
+def _paths(tree, prefix=''):
+    """Flatten Query.select_related's nested dict into '__' paths."""
+    paths = set()
+    for name, children in tree.items():
+        path = f'{prefix}{name}'
+        paths.add(path)
+        paths |= _paths(children, f'{path}__')
+    return paths
+
+
+def _parse_tree(value):
+    """``'id,interrogations.id'`` -> ``{'id': None, 'interrogations': {'id': None}}``; None means the whole field."""
+    tree = {}
+    for path in filter(None, (item.strip() for item in value.split(','))):
+        node = tree
+        *parents, leaf = path.split('.')
+        for name in parents:
+            if name in node and node[name] is None:
+                break
+            node = node.setdefault(name, {})
+        else:
+            node[leaf] = None
+    return tree
+
+
+def _freeze(tree):
+    return None if tree is None else tuple(sorted((name, _freeze(child)) for name, child in tree.items()))
+
+
+def parse_sparse(query_params):
+    """Hashable ``(fields, expand)`` selection from ``?fields=`` / ``?expand=``, or None for full rows."""
+    fields, expand = query_params.get('fields'), query_params.get('expand')
+    if fields is None and expand is None:
+        return None
+    return (_freeze(_parse_tree(fields)) if fields else None), _freeze(_parse_tree(expand or ''))
+
+
+def trim(serializer, fields, expand):
+    """Drop the fields of ``serializer`` a ``parse_sparse()`` selection leaves out, recursing into nested ones.
+
+    Unknown names are ignored.  Dropped fields are kept on ``sparse_dropped`` for the query plan.
+    """
+    fields = dict(fields) if fields is not None else None
+    expand = dict(expand or ())
+    expandable = getattr(getattr(serializer, 'Meta', None), 'expandable_fields', ())
+    dropped = []
+    for name in list(serializer.fields):
+        named = fields is not None and name in fields
+        wanted = named or name in expand or (fields is None and name not in expandable)
+        if not wanted:
+            dropped.append(serializer.fields.pop(name))
+            continue
+        nested = serializer.fields[name]
+        if isinstance(nested, serializers.ListSerializer):
+            nested = nested.child
+        if isinstance(nested, serializers.BaseSerializer):
+            trim(nested, fields.get(name) if named else None, expand.get(name))
+    serializer.sparse_dropped = dropped
+    return serializer
+
+
+class SparseFieldsMixin:
+    """Honours ``?fields=`` and ``?expand=`` on read requests."""
+
+    def sparse_fieldset(self):
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return None
+        return parse_sparse(request.query_params)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        sparse = self.sparse_fieldset()
+        if sparse is not None:
+            trim(getattr(serializer, 'child', serializer), *sparse)
+        return serializer
+
+
+class QueryPlanMixin(SparseFieldsMixin):
+    """Applies the serializer's query plan on read actions.
+
+    Hooks ``filter_queryset`` rather than ``get_queryset`` so it composes with
+    whatever ``get_queryset`` a viewset already defines.
+    """
+    query_plan_actions = ('list', 'retrieve')
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if getattr(self, 'action', None) in self.query_plan_actions:
+            plan = serializer_plan(self.get_serializer_class(), queryset.model, self.sparse_fieldset())
+            queryset = apply_plan(queryset, plan)
+        return queryset
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -57,6 +59,23 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 100,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # orjson-backed JSON; MessagePack for internal clients. orjson, msgpack, Brotli and numpy are pinned in
+    # requirements.txt; the pure-Python fallbacks only cover environments installed without them.
+    'DEFAULT_RENDERER_CLASSES': [
+        'config.renderers.FastJSONRenderer',
+        *(['config.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'config.renderers.FastJSONParser',
+        *(['config.renderers.MessagePackParser'] if find_spec('msgpack') else []),
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Only views that name a throttle_scope listed in THROTTLE_RATES are limited
+    'DEFAULT_THROTTLE_CLASSES': ['config.throttling.TokenBucketThrottle'],
+    # Trusted reverse proxies in front of the app; X-Forwarded-For is ignored when unset
+    'NUM_PROXIES': int(os.environ['NUM_PROXIES']) if os.environ.get('NUM_PROXIES') else None,
 }
 
 from datetime import timedelta
@@ -79,6 +98,8 @@ SPECTACULAR_SETTINGS = {
 
 
 MIDDLEWARE = [
+    'config.metrics.RequestMetricsMiddleware',
+    'config.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -87,11 +108,21 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'config.profiling.ProfilingMiddleware',
 ]
 
 # Development convenience: allow CORS from any origin so the landing page can call the API
 CORS_ALLOW_ALL_ORIGINS = True
 
+# Live detective-board events (config/asgi.py). The in-process broker only reaches
+# WebSocket clients of the same ASGI worker; point this at a shared-bus broker when scaling out.
+BOARD_EVENTS_BROKER = 'investigation.realtime.InProcessBoardBroker'
+
+# Request metrics (config/metrics.py, served at /api/metrics/ for admins). Requests at or
+# above METRICS_SLOW_REQUEST_MS are logged with their slowest SQL; None disables the log.
+METRICS_SLOW_REQUEST_MS = 500
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
 
 ROOT_URLCONF = 'config.urls'
 
@@ -167,6 +198,46 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR
 
+# Court dossier ZIPs (cases/dossier.py). Kept outside MEDIA_ROOT so they are only
+# reachable through the permission-checked download endpoint.
+DOSSIER_ROOT = BASE_DIR.parent / 'var' / 'dossiers'
+DOSSIER_BUILD_ASYNC = True
+
+# Per-request profiles (config/profiling.py): superusers add ?profile=1 or an
+# "X-Profile: 1" header; only the newest PROFILE_KEEP are kept on disk.
+PROFILE_ROOT = BASE_DIR.parent / 'var' / 'profiles'
+PROFILE_KEEP = 50
+
+# Response compression (config/compression.py): brotli when installed, else gzip,
+# for compressible bodies of at least COMPRESSION_MIN_SIZE bytes
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_BROTLI_QUALITY = 5
+
+# Throttling (config/throttling.py): per scope, a bucket of `burst` requests refilled
+# at the `sustained` rate, kept per endpoint and user/IP. Set REDIS_URL to share the
+# buckets between workers; without it each process limits on its own.
+THROTTLE_ENABLED = True
+THROTTLE_RATES = {
+    'login': {'burst': 5, 'sustained': '10/min'},
+    'public_read': {'burst': 60, 'sustained': '300/min'},
+    'public_stats': {'burst': 20, 'sustained': '60/min'},
+    'payments': {'burst': 10, 'sustained': '30/min'},
+}
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}
+if os.environ.get('REDIS_URL'):
+    CACHES['throttle'] = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': os.environ['REDIS_URL']}
+THROTTLE_CACHE = 'throttle' if 'throttle' in CACHES else 'default'
+
+# Notification retention (accounts/retention.py, manage.py purge_notifications)
+NOTIFICATION_RETENTION = {
+    'MAX_AGE_DAYS': 180,        # delete anything older
+    'MAX_PER_USER': 500,        # keep only the newest N per user
+    'COMPACT_AFTER_DAYS': 14,   # fold older read notifications into one summary per user per day
+    'BATCH_SIZE': 1000,         # rows per DELETE statement / transaction
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,77 @@
+"""Test helpers shared by the apps' ``tests.py`` modules."""
+import re
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import Role
+
+
+# Roles that together pass every permission class guarding a list endpoint
+ALL_ACCESS_ROLES = ('police_chief', 'captain', 'detective', 'sergeant', 'judge', 'police_officer')
+
+_LITERALS = re.compile(r"'[^']*'|\b\d+\b")
+
+
+class _Rollback(Exception):
+    pass
+
+
+def all_access_user(username='qc_admin'):
+    user = get_user_model().objects.create_superuser(username, f'{username}@test.com', 'pass123')
+    for code in ALL_ACCESS_ROLES:
+        Role.objects.get_or_create(code=code, defaults={'name': code})[0].users.add(user)
+    return user
+
+
+class QueryCountMixin:
+    """Asserts that list endpoints run the same number of queries for 1 and for 50 rows.
+
+    Subclasses set ``router`` (an app's ``DefaultRouter``) and define one
+    ``seed_<basename>(count)`` method per registered viewset that creates
+    ``count`` rows the list will return, with every relation its serializer
+    walks.  ``test_list_queries_do_not_grow`` then covers every viewset of the
+    router, so a new viewset without a seeder fails until one is added.
+    """
+    router = None
+    small, large = 1, 50
+
+    def setUp(self):
+        super().setUp()
+        self.qc_user = all_access_user()
+        self.client.force_authenticate(self.qc_user)
+
+    def _list_queries(self, url):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, f'{url}: {response.status_code} {response.content[:200]!r}')
+        return [query['sql'] for query in captured.captured_queries]
+
+    def assertListQueriesConstant(self, basename, seed):
+        url = reverse(f'{basename}-list')
+        try:
+            with transaction.atomic():
+                seed(self.small)
+                few = self._list_queries(url)
+                seed(self.large - self.small)
+                many = self._list_queries(url)
+                raise _Rollback
+        except _Rollback:
+            pass
+        if len(many) > len(few):
+            shapes = Counter(_LITERALS.sub('?', sql) for sql in many)
+            repeated = '\n'.join(f'  {count}x  {sql}' for sql, count in shapes.most_common() if count > 1)
+            self.fail(
+                f'{url} ran {len(few)} queries for {self.small} row(s) but {len(many)} for {self.large}. '
+                f'Repeated statements:\n{repeated}'
+            )
+
+    def test_list_queries_do_not_grow(self):
+        for _, viewset, basename in self.router.registry:
+            with self.subTest(basename=basename):
+                seed = getattr(self, f"seed_{basename.replace('-', '_')}", None)
+                self.assertIsNotNone(seed, f'{viewset.__name__} has no seed_{basename.replace("-", "_")}()')
+                self.assertListQueriesConstant(basename, seed)
@@ -0,0 +1,84 @@
+"""Token-bucket throttling for the public and abuse-prone endpoints.
+
+A view opts in by naming a ``throttle_scope`` (viewset actions pass it to
+``@action``).  ``THROTTLE_RATES`` gives each scope a bucket of ``burst``
+tokens refilled at the ``sustained`` rate, so short bursts pass while a
+steady scraper or password sprayer is held to the sustained rate.  Buckets
+are kept per scope, endpoint and client (the user when authenticated, else
+the IP) in the ``THROTTLE_CACHE`` cache: a shared backend such as Redis
+limits across workers, the default local-memory cache per worker.
+
+Anonymous clients are keyed by ``REMOTE_ADDR``.  ``X-Forwarded-For`` is
+client-supplied, so it is only used when ``REST_FRAMEWORK['NUM_PROXIES']``
+says how many trusted proxies sit in front of the app.
+
+Bucket updates are read-modify-write without a lock, so concurrent requests
+from one client may occasionally spend the same token; the limit is a brake,
+not an exact quota.  Rejections are counted in ``http_throttled_total``.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .metrics import Counter, endpoint_name, registry
+
+
+DURATIONS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+rejections = registry.register(
+    Counter('http_throttled_total', 'Requests rejected by throttling.', ('scope', 'view', 'client')),
+)
+
+
+def parse_rate(rate):
+    """``'120/min'`` -> tokens per second."""
+    count, period = rate.split('/')
+    return int(count) / DURATIONS[period]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    def __init__(self):
+        self.wait_seconds = None
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        config = getattr(settings, 'THROTTLE_RATES', {}).get(scope)
+        if not getattr(settings, 'THROTTLE_ENABLED', True) or config is None:
+            return True
+
+        capacity, refill = config['burst'], parse_rate(config['sustained'])
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            client, ident = 'user', user.pk
+        else:
+            client, ident = 'anon', self.get_ident(request)
+        view_name = endpoint_name(request)
+        key = f'throttle:{scope}:{view_name}:{ident}'
+
+        cache = caches[getattr(settings, 'THROTTLE_CACHE', 'default')]
+        now = time.time()
+        tokens, stamp = cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - stamp) * refill)
+        # An untouched bucket is full again after this long, so it may expire
+        timeout = math.ceil(capacity / refill)
+        if tokens < 1:
+            cache.set(key, (tokens, now), timeout)
+            self.wait_seconds = (1 - tokens) / refill
+            with registry.lock:
+                rejections.inc((scope, view_name, client))
+            return False
+        cache.set(key, (tokens - 1, now), timeout)
+        return True
+
+    def get_ident(self, request):
+        if api_settings.NUM_PROXIES is None:
+            # Rotating X-Forwarded-For must not buy a fresh bucket
+            return request.META.get('REMOTE_ADDR')
+        return super().get_ident(request)
+
+    def wait(self):
+        return self.wait_seconds
@@ -20,7 +20,8 @@ from django.views.generic import TemplateView
 from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
-from investigation.views import CriminalRankingView, GlobalStatsView
+from cases.views import CaseTimeSeriesView, CrimeHotspotView, RecurringWitnessView
+from investigation.views import CriminalRankingView, ExportView, GlobalStatsView, InterrogationPerformanceView, SyncView
 
 from . import views
 
@@ -30,6 +31,16 @@ urlpatterns = [
     path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
     path('api/ranking/', CriminalRankingView.as_view(), name='criminal-ranking'),
     path('api/global-stats/', GlobalStatsView.as_view(), name='global-stats'),
+    path('api/analytics/interrogations/', InterrogationPerformanceView.as_view(), name='interrogation-performance'),
+    path('api/analytics/timeseries/', CaseTimeSeriesView.as_view(), name='case-timeseries'),
+    path('api/analytics/hotspots/', CrimeHotspotView.as_view(), name='crime-hotspots'),
+    path('api/analytics/witnesses/', RecurringWitnessView.as_view(), name='recurring-witnesses'),
+    path('api/sync/', SyncView.as_view(), name='sync'),
+    path('api/export/<str:dataset>/', ExportView.as_view(), name='export'),
+    path('api/metrics/', views.MetricsView.as_view(), name='metrics'),
+    path('api/profiles/', views.ProfileListView.as_view(), name='profile-list'),
+    path('api/profiles/<str:profile_id>/', views.ProfileDetailView.as_view(), name='profile-detail'),
+    path('api/profiles/<str:profile_id>/download/', views.ProfileDownloadView.as_view(), name='profile-download'),
 
     path('', TemplateView.as_view(template_name='landing/index.html'), name='landing'),
 
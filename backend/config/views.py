@@ -1,5 +1,57 @@
+from django.http import FileResponse, HttpResponse
 from django.shortcuts import render
+from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.views import IsAdminUser, IsSuperUser
+from .metrics import registry
+from .profiling import list_profiles, load_profile, profile_path
 
 
 def role_dashboard(request, role_code: str):
     return render(request, 'landing/dashboard_role.html', {'role_code': role_code})
+
+
+class MetricsView(APIView):
+    """Request metrics of this worker in the Prometheus text format."""
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(summary="متریک‌های درخواست‌ها (Prometheus)", responses={200: str})
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class ProfileListView(APIView):
+    """Stored request profiles (see config/profiling.py), newest first."""
+    permission_classes = [IsSuperUser]
+
+    @extend_schema(summary="فهرست پروفایل‌های درخواست‌ها", responses={200: dict})
+    def get(self, request):
+        return Response(list_profiles())
+
+
+class ProfileDetailView(APIView):
+    permission_classes = [IsSuperUser]
+
+    @extend_schema(summary="خلاصه پروفایل و خط زمانی SQL", responses={200: dict})
+    def get(self, request, profile_id):
+        try:
+            return Response(load_profile(profile_id))
+        except FileNotFoundError:
+            return Response({'error': 'Profile not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+
+class ProfileDownloadView(APIView):
+    permission_classes = [IsSuperUser]
+
+    @extend_schema(summary="دریافت فایل pstats پروفایل", responses={200: bytes})
+    def get(self, request, profile_id):
+        try:
+            handle = open(profile_path(profile_id, '.prof'), 'rb')
+        except FileNotFoundError:
+            return Response({'error': 'Profile not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(
+            handle, as_attachment=True, filename=f'{profile_id}.prof', content_type='application/octet-stream',
+        )
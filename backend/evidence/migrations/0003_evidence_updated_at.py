@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evidence', '0002_evidence_is_on_board'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evidence',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-19 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evidence', '0003_evidence_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evidenceimage',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -10,6 +10,7 @@ class Evidence(models.Model):
     recorded_at = models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ثبت")
     recorder = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, verbose_name="ثبت‌کننده")
     is_on_board = models.BooleanField(default=False, verbose_name="روی تخته")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.title} ({self.case.id})"
@@ -49,3 +50,4 @@ class OtherEvidence(Evidence):
 class EvidenceImage(models.Model):
     evidence = models.ForeignKey(Evidence, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='evidence/images/')
+    updated_at = models.DateTimeField(auto_now=True)
@@ -4,6 +4,14 @@ from .models import (
     VehicleEvidence, IdentificationDocument, OtherEvidence, EvidenceImage
 )
 
+# Child accessor -> (type, type_display)
+EVIDENCE_KINDS = {
+    'witnesstestimony': ('witness', "استشهاد شاهد"),
+    'biologicalevidence': ('biological', "شواهد زیستی"),
+    'vehicleevidence': ('vehicle', "وسایل نقلیه"),
+    'identificationdocument': ('identification', "مدارک شناسایی"),
+}
+
 class EvidenceImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = EvidenceImage
@@ -19,20 +27,21 @@ class EvidenceBaseSerializer(serializers.ModelSerializer):
         model = Evidence
         fields = ['id', 'case', 'title', 'description', 'recorded_at', 'recorder', 'recorder_name', 'images', 'is_on_board', 'type_display', 'type']
         read_only_fields = ['recorder']
+        expandable_fields = ['images']
+
+    def _kind(self, obj):
+        if type(obj) is not Evidence:
+            name = obj._meta.model_name
+        else:
+            # Plain Evidence rows need the child one-to-ones; EvidenceViewSet select_related()s them
+            name = next((accessor for accessor in EVIDENCE_KINDS if hasattr(obj, accessor)), None)
+        return EVIDENCE_KINDS.get(name, ('other', "سایر موارد"))
 
     def get_type_display(self, obj):
-        if hasattr(obj, 'witnesstestimony'): return "استشهاد شاهد"
-        if hasattr(obj, 'biologicalevidence'): return "شواهد زیستی"
-        if hasattr(obj, 'vehicleevidence'): return "وسایل نقلیه"
-        if hasattr(obj, 'identificationdocument'): return "مدارک شناسایی"
-        return "سایر موارد"
+        return self._kind(obj)[1]
 
     def get_type(self, obj):
-        if hasattr(obj, 'witnesstestimony'): return "witness"
-        if hasattr(obj, 'biologicalevidence'): return "biological"
-        if hasattr(obj, 'vehicleevidence'): return "vehicle"
-        if hasattr(obj, 'identificationdocument'): return "identification"
-        return "other"
+        return self._kind(obj)[0]
 
 class WitnessTestimonySerializer(EvidenceBaseSerializer):
     class Meta(EvidenceBaseSerializer.Meta):
@@ -9,8 +9,9 @@ from django.contrib.auth import get_user_model
 @receiver(post_save, sender=VehicleEvidence)
 @receiver(post_save, sender=IdentificationDocument)
 @receiver(post_save, sender=OtherEvidence)
-def notify_detectives_on_new_evidence(sender, instance, created, **kwargs):
-    if created:
+def notify_detectives_on_new_evidence(sender, instance, created, raw=False, **kwargs):
+    # raw saves are fixtures and archive restores, not newly recorded evidence
+    if created and not raw:
         User = get_user_model()
         # Find all users with roles detective, officer, etc.
         detective_roles = ['detective', 'police_officer', 'patrol_officer', 'sergeant', 'captain', 'police_chief']
@@ -1,3 +1,43 @@
-from django.test import TestCase
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from cases.models import Case
+from config.testing import QueryCountMixin
+from .models import (
+    BiologicalEvidence, EvidenceImage, IdentificationDocument, OtherEvidence, VehicleEvidence, WitnessTestimony,
+)
+from .urls import router as evidence_router
+
+
+class ListQueryCountTests(QueryCountMixin, APITestCase):
+    router = evidence_router
+
+    def setUp(self):
+        super().setUp()
+        self.case = Case.objects.create(title='QC', description='d', creator=self.qc_user)
+
+    def _seed(self, model, rows, **fields):
+        for _ in range(rows):
+            evidence = model.objects.create(case=self.case, title='QC', description='d', recorder=self.qc_user, **fields)
+            EvidenceImage.objects.create(evidence=evidence, image='evidence/images/qc.png')
+
+    def seed_all_evidence(self, rows):
+        # The combined list mixes every kind
+        kinds = [self.seed_witnesstestimony, self.seed_biologicalevidence, self.seed_vehicleevidence,
+                 self.seed_identificationdocument, self.seed_otherevidence]
+        for n in range(rows):
+            kinds[n % len(kinds)](1)
+
+    def seed_witnesstestimony(self, rows):
+        self._seed(WitnessTestimony, rows, transcript='t')
+
+    def seed_biologicalevidence(self, rows):
+        self._seed(BiologicalEvidence, rows)
+
+    def seed_vehicleevidence(self, rows):
+        self._seed(VehicleEvidence, rows, model_name='m', color='c', license_plate='12ب345')
+
+    def seed_identificationdocument(self, rows):
+        self._seed(IdentificationDocument, rows, owner_full_name='o')
+
+    def seed_otherevidence(self, rows):
+        self._seed(OtherEvidence, rows)
@@ -1,28 +1,33 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.utils import timezone
 from .models import (
     Evidence, WitnessTestimony, BiologicalEvidence, 
     VehicleEvidence, IdentificationDocument, OtherEvidence, EvidenceImage
 )
 from .serializers import (
-    EvidenceBaseSerializer,
+    EVIDENCE_KINDS, EvidenceBaseSerializer,
     WitnessTestimonySerializer, BiologicalEvidenceSerializer, 
     VehicleEvidenceSerializer, IdentificationDocumentSerializer, OtherEvidenceSerializer,
     EvidenceImageSerializer
 )
 from cases.permissions import IsOfficerOrHigher, IsForensicDoctor, IsInvestigator
+from config.http import ConditionalRetrieveMixin
+from config.query_plans import QueryPlanMixin
 
-class EvidenceViewSet(viewsets.ModelViewSet):
-    queryset = Evidence.objects.all()
+class EvidenceViewSet(ConditionalRetrieveMixin, QueryPlanMixin, viewsets.ModelViewSet):
+    # The subtype joins feed EvidenceBaseSerializer.get_type(), which the query plan cannot see into
+    queryset = Evidence.objects.select_related(*EVIDENCE_KINDS)
     serializer_class = EvidenceBaseSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
+        queryset = super().get_queryset()
         case_id = self.request.query_params.get('case')
         if case_id:
-            return self.queryset.filter(case_id=case_id)
-        return self.queryset
+            return queryset.filter(case_id=case_id)
+        return queryset
 
     @action(detail=True, methods=['post'])
     def toggle_board(self, request, pk=None):
@@ -31,7 +36,7 @@ class EvidenceViewSet(viewsets.ModelViewSet):
         evidence.save()
         return Response({'is_on_board': evidence.is_on_board})
 
-class EvidenceBaseViewSet(viewsets.ModelViewSet):
+class EvidenceBaseViewSet(ConditionalRetrieveMixin, QueryPlanMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, IsInvestigator]
 
     def perform_create(self, serializer):
@@ -55,6 +60,8 @@ class EvidenceBaseViewSet(viewsets.ModelViewSet):
         
         for img in images:
             EvidenceImage.objects.create(evidence=evidence, image=img)
+        # The detail nests images; move the evidence's ETag along
+        Evidence.objects.filter(pk=evidence.pk).update(updated_at=timezone.now())
         return Response({'status': f'{len(images)} images uploaded successfully'})
 
     @action(detail=True, methods=['post'])
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class InvestigationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'investigation'
+
+    def ready(self):
+        import investigation.signals
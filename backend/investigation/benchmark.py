@@ -0,0 +1,141 @@
+"""Latency and query-count benchmarks for the hot API endpoints.
+
+Each scenario is a request made through DRF's test client as a user of a
+given role; it is repeated and reduced to p50/p95 latency, the SQL query
+count of the slowest-path request and the response size.  Results are plain
+dicts so ``manage.py benchmark_endpoints`` can write them as JSON and compare
+them with a budget file.
+"""
+import math
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import NoReverseMatch, reverse
+from rest_framework.test import APIClient
+
+from cases.models import Case
+from .models import Verdict
+
+
+# Dataset presets for ``--sizes``; each size adds to the previous one
+DATASET_SIZES = {
+    'small': dict(users=200, cases=1000, evidence=5000, suspects=1500, notifications=5000),
+    'medium': dict(users=1000, cases=10000, evidence=50000, suspects=15000, notifications=50000),
+    'large': dict(users=5000, cases=100000, evidence=500000, suspects=150000, notifications=500000),
+}
+
+
+def _solved_case_with_verdict():
+    return Verdict.objects.filter(case__status=Case.Status.SOLVED).values_list('case_id', flat=True).first()
+
+
+def _complainant_with_verdict():
+    return (
+        get_user_model().objects.filter(involved_cases__verdicts__isnull=False)
+        .values_list('pk', flat=True).first()
+    )
+
+
+# name -> (method, url, role whose user makes the request, request body)
+# ``url`` and ``role`` may be callables resolved against the database being measured;
+# role None means anonymous, role 'complainant_with_verdict' a complainant who has something to pay.
+SCENARIOS = {
+    'login': ('post', lambda: reverse('login'), None, 'credentials'),
+    'system_stats': ('get', lambda: reverse('system-stats'), None, None),
+    'most_wanted': ('get', lambda: reverse('suspect-most-wanted'), None, None),
+    'status_list': ('get', lambda: reverse('suspect-status-list'), 'detective', None),
+    'case_list_detective': ('get', lambda: reverse('case-list'), 'detective', None),
+    'case_list_sergeant': ('get', lambda: reverse('case-list'), 'sergeant', None),
+    'case_list_judge': ('get', lambda: reverse('case-list'), 'judge', None),
+    'case_list_complainant': ('get', lambda: reverse('case-list'), 'complainant', None),
+    'case_list_chief': ('get', lambda: reverse('case-list'), 'police_chief', None),
+    'trial_history': (
+        'get', lambda: reverse('case-trial-history', args=[_solved_case_with_verdict()]), 'police_chief', None,
+    ),
+    'pending_payments': (
+        'get', lambda: reverse('verdict-pending-payments'), 'complainant_with_verdict', None,
+    ),
+    'evidence_list': ('get', lambda: reverse('all-evidence-list'), 'detective', None),
+    'vehicle_evidence_list': ('get', lambda: reverse('vehicleevidence-list'), 'detective', None),
+    'global_stats': ('get', lambda: reverse('global-stats'), 'detective', None),
+    'criminal_ranking': ('get', lambda: reverse('criminal-ranking'), 'police_officer', None),
+    'admin_stats': ('get', lambda: reverse('admin-stats'), 'police_chief', None),
+}
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _resolve_user(role):
+    User = get_user_model()
+    if role == 'complainant_with_verdict':
+        pk = _complainant_with_verdict()
+        return User.objects.filter(pk=pk).first() if pk else None
+    return User.objects.filter(roles__code=role, is_active=True).order_by('pk').first()
+
+
+def measure(name, repeat=10, password='password123'):
+    """Run one scenario ``repeat`` times (after a warm-up request); ``None`` if the dataset can't host it."""
+    method, url, role, body = SCENARIOS[name]
+    client = APIClient()
+    user = _resolve_user(role) if role else None
+    if role and user is None:
+        return None
+    if user is not None:
+        client.force_authenticate(user)
+    if body == 'credentials':
+        user = _resolve_user('detective')
+        if user is None:
+            return None
+        body = {'identifier': user.username, 'password': password}
+    try:
+        url = url()
+    except NoReverseMatch:
+        # No solved case with a verdict to open
+        return None
+
+    send = getattr(client, method)
+    timings, queries, size, status_code = [], 0, 0, None
+    # Repeated requests from one client would be throttled; the benchmark measures the endpoint itself
+    with override_settings(THROTTLE_ENABLED=False):
+        send(url, body, format='json')
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = send(url, body, format='json')
+                timings.append((time.perf_counter() - started) * 1000)
+            queries = max(queries, len(captured))
+            size, status_code = len(response.content), response.status_code
+    return {
+        'status': status_code,
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'max_ms': round(max(timings), 2),
+        'queries': queries,
+        'response_bytes': size,
+    }
+
+
+def check_budgets(results, budgets):
+    """Compare ``{size: {scenario: result}}`` with ``{size: {scenario: {metric: limit}}}``.
+
+    A budget under the size ``"*"`` applies to every size.  Returns a list of
+    human-readable violations; a scenario that errored counts as one.
+    """
+    violations = []
+    for size, scenarios in results.items():
+        for name, result in scenarios.items():
+            if result is None:
+                continue
+            if result['status'] >= 400:
+                violations.append(f'{size}/{name}: HTTP {result["status"]}')
+            limits = {**budgets.get('*', {}).get(name, {}), **budgets.get(size, {}).get(name, {})}
+            for metric, limit in limits.items():
+                if result.get(metric, 0) > limit:
+                    violations.append(f'{size}/{name}: {metric} {result[metric]} > budget {limit}')
+    return violations
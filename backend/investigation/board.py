@@ -0,0 +1,246 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from evidence.models import Evidence
+from .models import Board, BoardConnection, BoardNodeLayout, Suspect
+from .realtime import publish_board_event
+
+
+_deferred = threading.local()
+
+
+EVIDENCE_KIND = models.Case(
+    models.When(witnesstestimony__isnull=False, then=models.Value('witness')),
+    models.When(biologicalevidence__isnull=False, then=models.Value('biological')),
+    models.When(vehicleevidence__isnull=False, then=models.Value('vehicle')),
+    models.When(identificationdocument__isnull=False, then=models.Value('identification')),
+    default=models.Value('other'),
+    output_field=models.CharField(),
+)
+
+
+def _is_deferred(case_id):
+    pending = getattr(_deferred, 'cases', None)
+    return pending is not None and int(case_id) in pending
+
+
+def bump_board_version(case_id):
+    """Invalidate cached board graphs for a case (no-op until the board exists)."""
+    if not case_id or _is_deferred(case_id):
+        return
+    Board.objects.filter(case_id=case_id).update(version=F('version') + 1)
+
+
+def board_changed(case_id, event):
+    """Record a single board change: bump the version and broadcast ``event`` to live watchers."""
+    if not case_id or _is_deferred(case_id):
+        return
+    bump_board_version(case_id)
+    publish_board_event(case_id, event)
+
+
+def edge_payload(connection):
+    return {
+        'id': connection.id,
+        'from': _node_ref(connection.from_evidence_id, connection.from_suspect_id),
+        'to': _node_ref(connection.to_evidence_id, connection.to_suspect_id),
+        'description': connection.description,
+    }
+
+
+@contextmanager
+def deferred_board_bump(case_id):
+    """Collapse every version bump (and live event) for ``case_id`` inside the block into a single bump."""
+    pending = getattr(_deferred, 'cases', None)
+    if pending is None:
+        pending = _deferred.cases = set()
+    case_id = int(case_id)
+    nested = case_id in pending
+    pending.add(case_id)
+    try:
+        yield
+    finally:
+        if not nested:
+            pending.discard(case_id)
+    if not nested:
+        bump_board_version(case_id)
+
+
+def board_etag(board):
+    return f'"board-{board.case_id}-v{board.version}"'
+
+
+def _node_ref(evidence_id, suspect_id):
+    if evidence_id:
+        return {'kind': 'evidence', 'id': evidence_id}
+    return {'kind': 'suspect', 'id': suspect_id}
+
+
+def build_board_graph(board):
+    """Nodes and edges of a case board in four queries, independent of board size."""
+    case_id = board.case_id
+    image_storage = Suspect._meta.get_field('image').storage
+    positions = {
+        ('evidence', row['evidence_id']) if row['evidence_id'] else ('suspect', row['suspect_id']): (row['x'], row['y'])
+        # An unsaved board (not created yet) has no layout rows
+        for row in BoardNodeLayout.objects.filter(board_id=board.pk).values('evidence_id', 'suspect_id', 'x', 'y')
+    }
+
+    evidence_nodes = [
+        {'kind': 'evidence', 'id': row['id'], 'title': row['title'], 'type': row['evidence_type']}
+        for row in (
+            Evidence.objects.filter(case_id=case_id, is_on_board=True)
+            .annotate(evidence_type=EVIDENCE_KIND)
+            .order_by('id')
+            .values('id', 'title', 'evidence_type')
+        )
+    ]
+
+    suspect_nodes = [
+        {
+            'kind': 'suspect',
+            'id': row['id'],
+            'title': f"{row['first_name']} {row['last_name']}".strip() or row['name'],
+            'national_code': row['national_code'],
+            'status': row['status'],
+            'is_main_suspect': row['is_main_suspect'],
+            'image': image_storage.url(row['image']) if row['image'] else None,
+        }
+        for row in (
+            Suspect.objects.filter(case_id=case_id, is_on_board=True)
+            .order_by('id')
+            .values('id', 'name', 'first_name', 'last_name', 'national_code', 'status', 'is_main_suspect', 'image')
+        )
+    ]
+
+    edges = [
+        {
+            'id': row['id'],
+            'from': _node_ref(row['from_evidence_id'], row['from_suspect_id']),
+            'to': _node_ref(row['to_evidence_id'], row['to_suspect_id']),
+            'description': row['description'],
+        }
+        for row in (
+            BoardConnection.objects.filter(case_id=case_id)
+            .order_by('id')
+            .values('id', 'from_evidence_id', 'from_suspect_id', 'to_evidence_id', 'to_suspect_id', 'description')
+        )
+    ]
+
+    nodes = evidence_nodes + suspect_nodes
+    for node in nodes:
+        x, y = positions.get((node['kind'], node['id']), (None, None))
+        node['x'] = x
+        node['y'] = y
+
+    return {
+        'case': case_id,
+        'board': board.id,
+        'version': board.version,
+        'nodes': nodes,
+        'edges': edges,
+    }
+
+
+class BoardVersionConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_code = 'board_version_conflict'
+
+
+def apply_board_patch(board, operations, base_version=None):
+    """Apply validated board operations atomically with one bulk statement per kind of change.
+
+    Operations are applied in order semantically (a later add/remove of the same
+    node wins), but grouped into bulk writes: ``is_on_board`` flips become one
+    UPDATE per model and state, connections one INSERT and one DELETE, and moves
+    one upsert per node kind.  Returns the board with its new version.
+    """
+    case_id = board.case_id
+    visibility = {'evidence': {}, 'suspect': {}}
+    positions = {'evidence': {}, 'suspect': {}}
+    new_connections = []
+    removed_connections = set()
+
+    for op in operations:
+        kind = op['op']
+        if kind in ('add_node', 'remove_node'):
+            visibility[op['kind']][op['id']] = kind == 'add_node'
+        elif kind == 'move':
+            positions[op['kind']][op['id']] = (op['x'], op['y'])
+        elif kind == 'connect':
+            new_connections.append(op)
+        elif kind == 'disconnect':
+            removed_connections.add(op['id'])
+
+    referenced = {'evidence': set(), 'suspect': set()}
+    for kind in ('evidence', 'suspect'):
+        referenced[kind].update(visibility[kind], positions[kind])
+    for op in new_connections:
+        referenced[op['from']['kind']].add(op['from']['id'])
+        referenced[op['to']['kind']].add(op['to']['id'])
+
+    with transaction.atomic(), deferred_board_bump(case_id):
+        board = Board.objects.select_for_update().get(pk=board.pk)
+        if base_version is not None and base_version != board.version:
+            raise BoardVersionConflict({
+                'error': 'Board was modified by someone else; reload and retry.',
+                'version': board.version,
+            })
+
+        models_by_kind = {'evidence': Evidence, 'suspect': Suspect}
+        for kind, ids in referenced.items():
+            if not ids:
+                continue
+            found = set(models_by_kind[kind].objects.filter(case_id=case_id, pk__in=ids).values_list('pk', flat=True))
+            missing = sorted(ids - found)
+            if missing:
+                raise ValidationError({'operations': f'{kind} {missing} not found in case {case_id}.'})
+
+        if removed_connections:
+            found = set(
+                BoardConnection.objects.filter(case_id=case_id, pk__in=removed_connections).values_list('pk', flat=True)
+            )
+            missing = sorted(removed_connections - found)
+            if missing:
+                raise ValidationError({'operations': f'connections {missing} not found in case {case_id}.'})
+
+        now = timezone.now()
+        for kind, states in visibility.items():
+            for on_board in (True, False):
+                ids = [pk for pk, state in states.items() if state is on_board]
+                if ids:
+                    models_by_kind[kind].objects.filter(pk__in=ids).update(is_on_board=on_board, updated_at=now)
+
+        if removed_connections:
+            BoardConnection.objects.filter(pk__in=removed_connections).delete()
+        if new_connections:
+            BoardConnection.objects.bulk_create([
+                BoardConnection(
+                    case_id=case_id,
+                    description=op.get('description', ''),
+                    **{f"from_{op['from']['kind']}_id": op['from']['id'], f"to_{op['to']['kind']}_id": op['to']['id']},
+                )
+                for op in new_connections
+            ])
+
+        for kind, moves in positions.items():
+            if moves:
+                BoardNodeLayout.objects.bulk_create(
+                    [
+                        BoardNodeLayout(board=board, x=x, y=y, updated_at=now, **{f'{kind}_id': pk})
+                        for pk, (x, y) in moves.items()
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['board', kind],
+                    update_fields=['x', 'y', 'updated_at'],
+                )
+
+    board.refresh_from_db(fields=['version'])
+    publish_board_event(case_id, {'type': 'patch', 'version': board.version, 'operations': operations})
+    return board
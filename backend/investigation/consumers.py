@@ -0,0 +1,95 @@
+import asyncio
+import json
+import re
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+
+from .realtime import get_board_broker
+
+
+BOARD_PATH = re.compile(r'^/ws/board/(?P<case_id>\d+)/?$')
+
+# Same roles that may use the board REST endpoints (investigation.permissions.IsDetective)
+BOARD_ROLES = ['detective', 'captain', 'police_chief']
+
+
+def _authenticate(token):
+    """Resolve a JWT access token to a user allowed to watch boards, or None."""
+    from rest_framework_simplejwt.exceptions import TokenError
+    from rest_framework_simplejwt.settings import api_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    try:
+        validated = AccessToken(token)
+    except TokenError:
+        return None
+    user = get_user_model().objects.filter(
+        pk=validated[api_settings.USER_ID_CLAIM], is_active=True
+    ).first()
+    if not user:
+        return None
+    if not user.is_superuser and not user.roles.filter(code__in=BOARD_ROLES).exists():
+        return None
+    return user
+
+
+def _case_exists(case_id):
+    from cases.models import Case
+    return Case.objects.filter(pk=case_id).exists()
+
+
+async def board_websocket(scope, receive, send):
+    """ASGI WebSocket endpoint streaming live delta events for one case board.
+
+    Connect to ``/ws/board/<case_id>/?token=<JWT access token>``.  After the
+    handshake the server sends ``{"type": "hello"}`` and then one JSON message
+    per board change; ``{"type": "resync"}`` means events were dropped and the
+    client should refetch ``/api/investigation/boards/graph/``.  Clients may send
+    ``"ping"`` and get ``{"type": "pong"}`` back.
+    """
+    match = BOARD_PATH.match(scope.get('path', ''))
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    if not match:
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+
+    case_id = int(match.group('case_id'))
+    token = (parse_qs(scope.get('query_string', b'').decode()).get('token') or [''])[0]
+    user = await sync_to_async(_authenticate)(token) if token else None
+    if user is None:
+        await send({'type': 'websocket.close', 'code': 4401})
+        return
+    if not await sync_to_async(_case_exists)(case_id):
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+
+    broker = get_board_broker()
+    queue = broker.subscribe(case_id)
+    try:
+        await send({'type': 'websocket.accept'})
+        await send({'type': 'websocket.send', 'text': json.dumps({'type': 'hello', 'case': case_id})})
+
+        next_event = asyncio.ensure_future(queue.get())
+        next_message = asyncio.ensure_future(receive())
+        try:
+            while True:
+                done, _ = await asyncio.wait({next_event, next_message}, return_when=asyncio.FIRST_COMPLETED)
+                if next_event in done:
+                    await send({'type': 'websocket.send', 'text': json.dumps(next_event.result(), default=str)})
+                    next_event = asyncio.ensure_future(queue.get())
+                if next_message in done:
+                    message = next_message.result()
+                    if message['type'] == 'websocket.disconnect':
+                        break
+                    if message.get('text') == 'ping':
+                        await send({'type': 'websocket.send', 'text': json.dumps({'type': 'pong'})})
+                    next_message = asyncio.ensure_future(receive())
+        finally:
+            next_event.cancel()
+            next_message.cancel()
+    finally:
+        broker.unsubscribe(case_id, queue)
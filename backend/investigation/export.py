@@ -0,0 +1,106 @@
+import csv
+import json
+
+from cases.models import Case
+from cases.visibility import visible_cases
+from evidence.models import Evidence
+from .board import EVIDENCE_KIND
+from .models import RewardReport, Suspect, Verdict
+from .visibility import visible_reward_reports
+
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+# Rows are read as .values() tuples; subtype columns of evidence come from LEFT JOINs
+# on the multi-table-inheritance children and are empty for other kinds.
+EXPORT_DATASETS = {
+    'cases': {
+        'model': Case,
+        'case_lookup': 'pk',
+        'columns': [
+            'id', 'title', 'description', 'crime_level', 'status', 'submission_attempts',
+            'creator__username', 'created_at', 'updated_at',
+        ],
+    },
+    'evidence': {
+        'model': Evidence,
+        'case_lookup': 'case_id',
+        'annotate': {'kind': EVIDENCE_KIND},
+        'columns': [
+            'id', 'case_id', 'kind', 'title', 'description', 'recorder__username', 'recorded_at',
+            'is_on_board', 'updated_at',
+            'witnesstestimony__transcript', 'witnesstestimony__media',
+            'biologicalevidence__is_verified', 'biologicalevidence__medical_follow_up',
+            'biologicalevidence__database_follow_up',
+            'vehicleevidence__model_name', 'vehicleevidence__color', 'vehicleevidence__license_plate',
+            'vehicleevidence__serial_number',
+            'identificationdocument__owner_full_name', 'identificationdocument__extra_info',
+        ],
+    },
+    'suspects': {
+        'model': Suspect,
+        'case_lookup': 'case_id',
+        'columns': [
+            'id', 'case_id', 'name', 'first_name', 'last_name', 'national_code', 'details', 'status',
+            'is_main_suspect', 'is_arrested', 'is_on_board', 'created_at', 'updated_at',
+        ],
+    },
+    'verdicts': {
+        'model': Verdict,
+        'case_lookup': 'case_id',
+        'columns': [
+            'id', 'case_id', 'suspect_id', 'judge__username', 'title', 'result', 'punishment', 'description',
+            'bail_amount', 'bail_paid', 'bail_paid_at', 'fine_amount', 'fine_paid', 'fine_paid_at',
+            'created_at', 'updated_at',
+        ],
+    },
+    'rewards': {
+        'model': RewardReport,
+        # Reports follow the reward API's rule rather than case visibility; tracking codes are never exported
+        'scope': visible_reward_reports,
+        'columns': [
+            'id', 'suspect__case_id', 'suspect_id', 'suspect_full_name', 'suspect_national_code', 'status',
+            'reporter__username', 'reward_amount', 'is_paid', 'paid_at', 'created_at',
+        ],
+    },
+}
+
+
+def export_queryset(dataset, user=None):
+    """Rows of ``dataset`` as a values_list queryset; ``user=None`` exports everything (CLI use)."""
+    spec = EXPORT_DATASETS[dataset]
+    queryset = spec['model'].objects.all()
+    if user is not None and spec.get('scope'):
+        queryset = spec['scope'](user, queryset)
+    elif user is not None:
+        queryset = queryset.filter(**{f"{spec['case_lookup']}__in": visible_cases(user).values('pk')})
+    if spec.get('annotate'):
+        queryset = queryset.annotate(**spec['annotate'])
+    return queryset.order_by('pk').values_list(*spec['columns'])
+
+
+class _Echo:
+    """File-like object whose write() returns the line instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def _cell(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def iter_export(dataset, fmt, user=None, chunk_size=2000):
+    """Yield the export line by line; memory use does not depend on the number of rows."""
+    columns = EXPORT_DATASETS[dataset]['columns']
+    rows = export_queryset(dataset, user).iterator(chunk_size=chunk_size)
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow([_cell(value) for value in row])
+    else:
+        for row in rows:
+            yield json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) + '\n'
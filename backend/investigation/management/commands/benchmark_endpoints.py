@@ -0,0 +1,111 @@
+import json
+from datetime import datetime, time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from investigation.benchmark import DATASET_SIZES, SCENARIOS, check_budgets, measure
+from investigation.synthetic import SyntheticDataset
+
+
+DEFAULT_BUDGETS = Path(__file__).resolve().parents[2] / 'benchmark_budgets.json'
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the hot API endpoints (p50/p95 latency, SQL queries, response size) against generated '
+        'datasets of several sizes in a throwaway test database, write the results as JSON and fail '
+        'when a budget is exceeded.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='small', help=f"Comma-separated dataset sizes: {', '.join(DATASET_SIZES)}.",
+        )
+        parser.add_argument('--scenarios', help=f"Comma-separated subset of: {', '.join(SCENARIOS)}.")
+        parser.add_argument('--repeat', type=int, default=10, help='Measured requests per scenario.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write the JSON results to this file (default: stdout).')
+        parser.add_argument(
+            '--budgets', default=str(DEFAULT_BUDGETS),
+            help='JSON file of {size|"*": {scenario: {metric: limit}}}; metrics are p50_ms, p95_ms, max_ms, '
+                 'queries and response_bytes. Pass "" to skip budget checks.',
+        )
+        parser.add_argument(
+            '--current-db', action='store_true',
+            help='Measure the configured database as it is instead of generating datasets.',
+        )
+        parser.add_argument('--password', default='password123', help='Password of the user used for login.')
+
+    def handle(self, *args, **options):
+        names = options['scenarios'].split(',') if options['scenarios'] else list(SCENARIOS)
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        budgets = {}
+        if options['budgets']:
+            with open(options['budgets'], encoding='utf-8') as handle:
+                budgets = json.load(handle)
+
+        if options['current_db']:
+            results = {'current': self._run(names, options)}
+        else:
+            sizes = options['sizes'].split(',')
+            if set(sizes) - set(DATASET_SIZES):
+                raise CommandError(f"--sizes must be among: {', '.join(DATASET_SIZES)}")
+            results = self._run_generated(sorted(sizes, key=list(DATASET_SIZES).index), names, options)
+
+        violations = check_budgets(results, budgets)
+        report = json.dumps({
+            'measured_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'results': results,
+            'violations': violations,
+        }, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(report)
+        else:
+            self.stdout.write(report)
+
+        if violations:
+            raise CommandError('Budget exceeded:\n' + '\n'.join(violations))
+        self.stdout.write(self.style.SUCCESS('All scenarios within budget.'))
+
+    def _run(self, names, options):
+        results = {}
+        for name in names:
+            results[name] = measure(name, repeat=options['repeat'], password=options['password'])
+            result = results[name]
+            summary = 'skipped (no data)' if result is None else (
+                f"p50 {result['p50_ms']}ms  p95 {result['p95_ms']}ms  {result['queries']} queries"
+            )
+            self.stderr.write(f'  {name}: {summary}')
+        return results
+
+    def _run_generated(self, sizes, names, options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results, generated = {}, {}
+            # Fixed anchor so every run measures the same rows
+            anchor = timezone.make_aware(datetime.combine(datetime(2025, 1, 1), time.min))
+            for step, size in enumerate(sizes):
+                # Grow the same database: generate only what the previous size did not
+                delta = {key: value - generated.get(key, 0) for key, value in DATASET_SIZES[size].items()}
+                self.stderr.write(f"Generating {size} dataset ({DATASET_SIZES[size]['cases']} cases)...")
+                dataset = SyntheticDataset(
+                    seed=options['seed'] + step, prefix=f'bench{step}', anchor=anchor, password=options['password'],
+                )
+                for _ in dataset.generate(**delta):
+                    pass
+                generated = DATASET_SIZES[size]
+                results[size] = self._run(names, options)
+            return results
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from investigation.export import EXPORT_DATASETS, EXPORT_FORMATS, iter_export
+
+
+class Command(BaseCommand):
+    help = 'Stream cases, evidence, suspects, verdicts or reward reports to CSV / NDJSON with constant memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(EXPORT_DATASETS))
+        parser.add_argument('--output-format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--file', help='Write to this path instead of stdout.')
+        parser.add_argument(
+            '--as-user',
+            help="Only export rows visible to this username (same rules as the case API). Default: everything.",
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        user = None
+        if options['as_user']:
+            user = get_user_model().objects.filter(username=options['as_user']).first()
+            if user is None:
+                raise CommandError(f"User {options['as_user']!r} does not exist.")
+
+        lines = iter_export(
+            options['dataset'], options['output_format'], user=user, chunk_size=options['chunk_size'],
+        )
+        if not options['file']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        count = 0
+        with open(options['file'], 'w', encoding='utf-8', newline='') as out:
+            for line in lines:
+                out.write(line)
+                count += 1
+        rows = count - 1 if options['output_format'] == 'csv' else count
+        self.stdout.write(self.style.SUCCESS(f"Exported {rows} {options['dataset']} rows to {options['file']}"))
@@ -0,0 +1,54 @@
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from investigation.synthetic import SyntheticDataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-insert a deterministic synthetic dataset (users, cases, evidence of all five kinds, suspects, '
+        'interrogations, verdicts, notifications) for load testing. Does not touch existing rows.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--cases', type=int, default=10000)
+        parser.add_argument('--evidence', type=int, default=50000)
+        parser.add_argument('--suspects', type=int, default=15000)
+        parser.add_argument('--notifications', type=int, default=50000)
+        parser.add_argument('--days', type=int, default=730, help='Spread case creation over this many days.')
+        parser.add_argument(
+            '--anchor', help='Newest timestamp as YYYY-MM-DD (default: today). Fix it to reproduce a dataset exactly.',
+        )
+        parser.add_argument('--prefix', default='load', help='Username prefix of generated users.')
+        parser.add_argument('--password', default='password123', help='Password of every generated user.')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per INSERT statement.')
+
+    def handle(self, *args, **options):
+        anchor = None
+        if options['anchor']:
+            try:
+                day = datetime.strptime(options['anchor'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--anchor must be YYYY-MM-DD.')
+            anchor = timezone.make_aware(datetime.combine(day, time.min))
+
+        dataset = SyntheticDataset(
+            seed=options['seed'], prefix=options['prefix'], anchor=anchor, days=options['days'],
+            batch_size=options['batch_size'], password=options['password'],
+        )
+        rows = dataset.generate(
+            users=options['users'], cases=options['cases'], evidence=options['evidence'],
+            suspects=options['suspects'], notifications=options['notifications'],
+        )
+        try:
+            for counts in rows:
+                self.stdout.write(f"{counts.get('case', 0)}/{options['cases']} cases...")
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        summary = ', '.join(f'{count} {label}' for label, count in dataset.counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Inserted {summary}.'))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investigation', '0020_verdict_bail_amount_verdict_bail_paid_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
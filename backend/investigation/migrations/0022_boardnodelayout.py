@@ -0,0 +1,35 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evidence', '0002_evidence_is_on_board'),
+        ('investigation', '0021_board_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardNodeLayout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('x', models.FloatField(default=0)),
+                ('y', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='layouts', to='investigation.board')),
+                ('evidence', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='board_layouts', to='evidence.evidence')),
+                ('suspect', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='board_layouts', to='investigation.suspect')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='boardnodelayout',
+            constraint=models.UniqueConstraint(fields=('board', 'evidence'), name='unique_board_evidence_layout'),
+        ),
+        migrations.AddConstraint(
+            model_name='boardnodelayout',
+            constraint=models.UniqueConstraint(fields=('board', 'suspect'), name='unique_board_suspect_layout'),
+        ),
+    ]
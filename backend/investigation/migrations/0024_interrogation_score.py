@@ -0,0 +1,42 @@
+# Generated by Django 4.2.27 on 2026-10-19 17:18
+
+from django.db import migrations, models
+
+
+def weighted_score(interrogator_score, supervisor_score):
+    # Copy of investigation.models.weighted_score as of this migration
+    if interrogator_score is not None and supervisor_score is not None:
+        return round((interrogator_score + 2 * supervisor_score) / 3, 1)
+    elif supervisor_score is not None:
+        return float(supervisor_score)
+    elif interrogator_score is not None:
+        return float(interrogator_score)
+    return 0.0
+
+
+def backfill_scores(apps, schema_editor):
+    Interrogation = apps.get_model('investigation', 'Interrogation')
+    batch = []
+    for interrogation in Interrogation.objects.only('interrogator_score', 'supervisor_score').iterator(chunk_size=2000):
+        interrogation.score = weighted_score(interrogation.interrogator_score, interrogation.supervisor_score)
+        batch.append(interrogation)
+        if len(batch) == 2000:
+            Interrogation.objects.bulk_update(batch, ['score'])
+            batch = []
+    Interrogation.objects.bulk_update(batch, ['score'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investigation', '0023_tombstone_and_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interrogation',
+            name='score',
+            field=models.FloatField(db_index=True, default=0.0, editable=False, verbose_name='امتیاز نهایی'),
+        ),
+        migrations.RunPython(backfill_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-19 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investigation', '0024_interrogation_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tombstone',
+            name='visibility',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.27 on 2026-10-19 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investigation', '0025_tombstone_visibility'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interrogation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='interrogationfeedback',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -28,10 +28,21 @@ class Suspect(models.Model):
         default=Status.IDENTIFIED,
         verbose_name="وضعیت مظنون"
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.case.id})"
 
+def weighted_score(interrogator_score, supervisor_score):
+    """Average score between interrogator and supervisor (weighted towards supervisor)"""
+    if interrogator_score is not None and supervisor_score is not None:
+        return round((interrogator_score + 2 * supervisor_score) / 3, 1)
+    elif supervisor_score is not None:
+        return float(supervisor_score)
+    elif interrogator_score is not None:
+        return float(interrogator_score)
+    return 0.0
+
 class Interrogation(models.Model):
     suspect = models.ForeignKey(Suspect, on_delete=models.CASCADE, related_name='interrogations')
     interrogator = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='interrogations', verbose_name="کارآگاه")
@@ -41,21 +52,17 @@ class Interrogation(models.Model):
     supervisor_score = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="امتیاز گروهبان (۱-۱۰)")
     is_interrogator_confirmed = models.BooleanField(default=False, verbose_name="تایید نهایی کارآگاه")
     is_supervisor_confirmed = models.BooleanField(default=False, verbose_name="تایید نهایی گروهبان")
+    # weighted_score() of the two scores, stored so it can be sorted and aggregated in SQL; save() keeps it in sync
+    score = models.FloatField(default=0.0, db_index=True, editable=False, verbose_name="امتیاز نهایی")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
-    @property
-    def score(self):
-        """Average score between interrogator and supervisor (weighted towards supervisor)"""
-        i_score = self.interrogator_score or 0
-        s_score = self.supervisor_score or 0
-        
-        if self.interrogator_score is not None and self.supervisor_score is not None:
-            return round((i_score + 2 * s_score) / 3, 1)
-        elif self.supervisor_score is not None:
-            return float(s_score)
-        elif self.interrogator_score is not None:
-            return float(i_score)
-        return 0.0
+    def save(self, *args, **kwargs):
+        self.score = weighted_score(self.interrogator_score, self.supervisor_score)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'interrogator_score', 'supervisor_score'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'score', 'updated_at'}
+        super().save(*args, **kwargs)
 
 class InterrogationFeedback(models.Model):
     class Decision(models.TextChoices):
@@ -74,14 +81,32 @@ class InterrogationFeedback(models.Model):
     chief = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='chief_feedbacks')
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
 class Board(models.Model):
     case = models.OneToOneField(Case, on_delete=models.CASCADE, related_name='board')
+    # Bumped on every change to the board's nodes or connections; drives the graph ETag
+    version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"Board for Case {self.case.id}"
 
+class BoardNodeLayout(models.Model):
+    """Persisted position of an evidence or suspect node on a case board."""
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='layouts')
+    evidence = models.ForeignKey(Evidence, on_delete=models.CASCADE, null=True, blank=True, related_name='board_layouts')
+    suspect = models.ForeignKey(Suspect, on_delete=models.CASCADE, null=True, blank=True, related_name='board_layouts')
+    x = models.FloatField(default=0)
+    y = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'evidence'], name='unique_board_evidence_layout'),
+            models.UniqueConstraint(fields=['board', 'suspect'], name='unique_board_suspect_layout'),
+        ]
+
 class BoardConnection(models.Model):
     case = models.ForeignKey(Case, on_delete=models.CASCADE, related_name='board_connections')
     
@@ -93,6 +118,7 @@ class BoardConnection(models.Model):
     to_suspect = models.ForeignKey(Suspect, on_delete=models.CASCADE, null=True, blank=True, related_name='connections_to')
 
     description = models.CharField(max_length=255, blank=True, verbose_name="علت اتصال")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
 class Verdict(models.Model):
     class Result(models.TextChoices):
@@ -119,6 +145,7 @@ class Verdict(models.Model):
     fine_tracking_code = models.CharField(max_length=20, unique=True, null=True, blank=True, verbose_name="کد پیگیری جریمه")
     
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ('case', 'suspect')
@@ -128,12 +155,14 @@ class Verdict(models.Model):
     def __str__(self):
         return f"Verdict for {self.suspect.name}: {self.result}"
     
+    # Only suspects of level 2 and 3 crimes may be released on bail
+    BAIL_CRIME_LEVELS = (Case.CrimeLevel.LEVEL_2, Case.CrimeLevel.LEVEL_3)
+
     def is_eligible_for_bail(self):
         """Check if suspect can pay bail (crime level 2 or 3 only)"""
         if not self.case:
             return False
-        from cases.models import Case
-        return self.case.crime_level in [Case.CrimeLevel.LEVEL_2, Case.CrimeLevel.LEVEL_3]
+        return self.case.crime_level in self.BAIL_CRIME_LEVELS
 
 class Warrant(models.Model):
     class WarrantType(models.TextChoices):
@@ -164,6 +193,20 @@ class Warrant(models.Model):
         return f"Warrant {self.type} for {self.suspect.name if self.suspect else 'Case '+str(self.case.id)} - {self.status}"
 
 
+class Tombstone(models.Model):
+    """Marker left behind when a synced row is deleted, so delta-sync clients can drop it."""
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    case_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    # Case tombstones only: cases.visibility.case_visibility() of the deleted case, so sync can
+    # tell whether a user ever could have seen it
+    visibility = models.JSONField(default=dict, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} deleted"
+
+
 class RewardReport(models.Model):
     class Status(models.TextChoices):
         PENDING_OFFICER = 'PO', 'در انتظار بررسی افسر'
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class BaseBoardBroker:
+    """Fan-out of board delta events to everyone watching a case board.
+
+    ``publish`` is called from request threads (sync code); ``subscribe`` and
+    ``unsubscribe`` from the ASGI event loop.  A multi-process deployment plugs
+    in a backend built on a shared bus (e.g. Redis pub/sub) via the
+    ``BOARD_EVENTS_BROKER`` setting; the default only reaches subscribers of the
+    current process.
+    """
+
+    def publish(self, case_id, event):
+        raise NotImplementedError
+
+    def subscribe(self, case_id):
+        """Return an ``asyncio.Queue`` that receives every event for ``case_id``."""
+        raise NotImplementedError
+
+    def unsubscribe(self, case_id, queue):
+        raise NotImplementedError
+
+
+class InProcessBoardBroker(BaseBoardBroker):
+    # A watcher that falls this far behind is told to refetch the graph instead
+    max_pending = 256
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def publish(self, case_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(int(case_id), ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, event)
+            except RuntimeError:
+                # The subscriber's loop is closed; it will unsubscribe itself
+                pass
+
+    def _deliver(self, queue, event):
+        if queue.full():
+            while not queue.empty():
+                queue.get_nowait()
+            event = {'type': 'resync'}
+        queue.put_nowait(event)
+
+    def subscribe(self, case_id):
+        queue = asyncio.Queue(maxsize=self.max_pending)
+        with self._lock:
+            self._subscribers.setdefault(int(case_id), set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, case_id, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(int(case_id), set())
+            subscribers.difference_update({entry for entry in subscribers if entry[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(int(case_id), None)
+
+    def subscriber_count(self, case_id):
+        with self._lock:
+            return len(self._subscribers.get(int(case_id), ()))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_board_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, 'BOARD_EVENTS_BROKER', 'investigation.realtime.InProcessBoardBroker')
+                _broker = import_string(path)()
+    return _broker
+
+
+def publish_board_event(case_id, event):
+    """Broadcast ``event`` to the case board once the surrounding transaction commits."""
+    if not case_id:
+        return
+    transaction.on_commit(lambda: get_board_broker().publish(case_id, event))
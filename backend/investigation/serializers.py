@@ -73,6 +73,7 @@ class SuspectSerializer(serializers.ModelSerializer):
             'national_code', 'image', 'details', 'created_at', 
             'is_main_suspect', 'is_on_board', 'is_arrested', 'status', 'interrogations'
         ]
+        expandable_fields = ['interrogations']
 
 class BoardConnectionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -86,6 +87,48 @@ class BoardConnectionSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("مقصد اتصال مشخص نشده است.")
         return data
 
+class BoardNodeRefSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=['evidence', 'suspect'])
+    id = serializers.IntegerField(min_value=1)
+
+
+class BoardOperationSerializer(serializers.Serializer):
+    OPS = ['add_node', 'remove_node', 'move', 'connect', 'disconnect']
+
+    op = serializers.ChoiceField(choices=OPS)
+    kind = serializers.ChoiceField(choices=['evidence', 'suspect'], required=False)
+    id = serializers.IntegerField(min_value=1, required=False)
+    x = serializers.FloatField(required=False)
+    y = serializers.FloatField(required=False)
+    # 'from' is a Python keyword, so the source side is declared in __init__
+    to = BoardNodeRefSerializer(required=False)
+    description = serializers.CharField(max_length=255, required=False, allow_blank=True)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['from'] = BoardNodeRefSerializer(required=False)
+
+    def validate(self, data):
+        op = data['op']
+        required = {
+            'add_node': ['kind', 'id'],
+            'remove_node': ['kind', 'id'],
+            'move': ['kind', 'id', 'x', 'y'],
+            'connect': ['from', 'to'],
+            'disconnect': ['id'],
+        }[op]
+        missing = [name for name in required if name not in data]
+        if missing:
+            raise serializers.ValidationError(f"عملیات {op} به فیلدهای {', '.join(missing)} نیاز دارد.")
+        return data
+
+
+class BoardPatchSerializer(serializers.Serializer):
+    case = serializers.PrimaryKeyRelatedField(queryset=Case.objects.all())
+    base_version = serializers.IntegerField(min_value=0, required=False)
+    operations = BoardOperationSerializer(many=True, allow_empty=False, max_length=2000)
+
+
 class SuspectStatusSerializer(serializers.ModelSerializer):
     case_title = serializers.CharField(source='case.title', read_only=True)
     case_status = serializers.CharField(source='case.status', read_only=True)
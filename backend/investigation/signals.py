@@ -0,0 +1,119 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from cases.events import record_case_event, record_case_events
+from cases.models import Case, CaseEvent
+from cases.snapshots import TERMINAL_STATUSES, freeze_case
+from cases.transitions import transition_applied
+from cases.visibility import case_visibility
+from evidence.models import (
+    Evidence, WitnessTestimony, BiologicalEvidence, VehicleEvidence, IdentificationDocument, OtherEvidence
+)
+from .board import board_changed, edge_payload
+from .models import Suspect, BoardConnection, Verdict, Tombstone, Warrant
+
+
+@receiver(post_save, sender=Evidence)
+@receiver(post_save, sender=WitnessTestimony)
+@receiver(post_save, sender=BiologicalEvidence)
+@receiver(post_save, sender=VehicleEvidence)
+@receiver(post_save, sender=IdentificationDocument)
+@receiver(post_save, sender=OtherEvidence)
+def board_evidence_saved(sender, instance, **kwargs):
+    board_changed(instance.case_id, {
+        'type': 'node', 'kind': 'evidence', 'id': instance.pk, 'on_board': instance.is_on_board,
+    })
+
+
+@receiver(post_delete, sender=Evidence)
+def board_evidence_deleted(sender, instance, **kwargs):
+    board_changed(instance.case_id, {'type': 'node.deleted', 'kind': 'evidence', 'id': instance.pk})
+
+
+@receiver(post_save, sender=Suspect)
+def board_suspect_saved(sender, instance, **kwargs):
+    board_changed(instance.case_id, {
+        'type': 'node', 'kind': 'suspect', 'id': instance.pk,
+        'on_board': instance.is_on_board, 'status': instance.status,
+    })
+
+
+@receiver(post_delete, sender=Suspect)
+def board_suspect_deleted(sender, instance, **kwargs):
+    board_changed(instance.case_id, {'type': 'node.deleted', 'kind': 'suspect', 'id': instance.pk})
+
+
+@receiver(post_save, sender=BoardConnection)
+def board_connection_saved(sender, instance, **kwargs):
+    board_changed(instance.case_id, {'type': 'edge', 'edge': edge_payload(instance)})
+
+
+@receiver(post_delete, sender=BoardConnection)
+def board_connection_deleted(sender, instance, **kwargs):
+    board_changed(instance.case_id, {'type': 'edge.deleted', 'id': instance.pk})
+
+
+@receiver(transition_applied, sender=Suspect)
+def board_suspect_transitioned(sender, pks, target, instance=None, **kwargs):
+    if instance is not None:
+        rows = [(instance.pk, instance.case_id)]
+    else:
+        rows = Suspect.objects.filter(pk__in=pks).values_list('pk', 'case_id')
+    for pk, case_id in rows:
+        board_changed(case_id, {'type': 'node', 'kind': 'suspect', 'id': pk, 'status': target})
+
+
+@receiver(transition_applied, sender=Suspect)
+def log_suspect_transition(sender, pks, source, target, instance=None, actor=None, **kwargs):
+    if instance is not None:
+        rows = [(instance.case_id, instance.pk)]
+    else:
+        rows = Suspect.objects.filter(pk__in=pks).values_list('case_id', 'pk')
+    record_case_events(rows, CaseEvent.Kind.SUSPECT_STATUS, actor=actor, from_status=source or '', to_status=target)
+
+
+@receiver(transition_applied, sender=Warrant)
+def log_warrant_transition(sender, instance, source, target, actor=None, **kwargs):
+    record_case_event(
+        instance.case_id, CaseEvent.Kind.WARRANT, actor=actor, object_id=instance.pk,
+        from_status=source or '', to_status=target, notes=instance.approver_notes or '',
+        data={'suspect': instance.suspect_id},
+    )
+
+
+@receiver(pre_delete, sender=Case)
+def keep_case_visibility(sender, instance, **kwargs):
+    # Complainants and suspects are deleted before post_delete fires for the case
+    instance._sync_visibility = case_visibility(instance)
+
+
+@receiver(post_delete, sender=Case)
+@receiver(post_delete, sender=Evidence)
+@receiver(post_delete, sender=Suspect)
+@receiver(post_delete, sender=BoardConnection)
+@receiver(post_delete, sender=Verdict)
+def record_tombstone(sender, instance, **kwargs):
+    # Lets /api/sync/ tell offline clients which rows to drop
+    Tombstone.objects.create(
+        model=sender._meta.model_name,
+        object_id=instance.pk,
+        case_id=instance.pk if sender is Case else instance.case_id,
+        visibility=getattr(instance, '_sync_visibility', {}) if sender is Case else {},
+    )
+
+
+@receiver(post_save, sender=Verdict)
+def refresh_closed_case_snapshot(sender, instance, **kwargs):
+    # Bail and fine payments land on verdicts after the case is solved
+    if instance.case.status in TERMINAL_STATUSES:
+        transaction.on_commit(lambda: freeze_case(instance.case_id))
+
+
+@receiver(transition_applied, sender=Suspect)
+def refresh_snapshot_after_suspect_move(sender, pks, instance=None, **kwargs):
+    # Suspects of a solved case are still released on bail
+    case_ids = [instance.case_id] if instance is not None else Suspect.objects.filter(pk__in=pks).values('case_id')
+    closed = Case.objects.filter(pk__in=case_ids, status__in=TERMINAL_STATUSES).values_list('pk', flat=True)
+    for case_id in closed:
+        transaction.on_commit(lambda case_id=case_id: freeze_case(case_id))
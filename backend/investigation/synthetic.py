@@ -0,0 +1,349 @@
+"""Deterministic, production-sized synthetic data for load and performance testing.
+
+Rows are inserted in chunks with explicit primary keys through the same
+InsertQuery machinery ``bulk_create`` uses, in raw mode: ``auto_now``/
+``auto_now_add`` keep the generated timestamps, no signals fire (no
+notification fan-out, no event log, no board broadcasts), and multi-table
+inheritance children (the five evidence kinds) are written as a parent row
+plus a child row, which ``bulk_create`` refuses to do.
+
+The same seed, anchor and volumes produce the same rows on the same starting database.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from accounts.models import Notification, Role, UserProfile
+from cases.models import Case
+from evidence.models import (
+    BiologicalEvidence, Evidence, IdentificationDocument, OtherEvidence, VehicleEvidence, WitnessTestimony,
+)
+from .models import Interrogation, InterrogationFeedback, Suspect, Verdict, weighted_score
+
+
+# Cases generated (and committed) per transaction; fixed so the output does not depend on --batch-size
+BLOCK_SIZE = 1000
+
+ROLE_WEIGHTS = {
+    'complainant': 700, 'police_officer': 90, 'patrol_officer': 60, 'detective': 80, 'sergeant': 20,
+    'captain': 6, 'police_chief': 1, 'trainee': 20, 'forensic_doctor': 8, 'judge': 15,
+}
+
+CASE_STATUS_WEIGHTS = {
+    Case.Status.SOLVED: 38, Case.Status.ACTIVE: 18, Case.Status.IN_PURSUIT: 9, Case.Status.PENDING_TRAINEE: 8,
+    Case.Status.PENDING_OFFICER: 7, Case.Status.REJECTED: 6, Case.Status.CANCELLED: 6,
+    Case.Status.PENDING_SERGEANT: 5, Case.Status.PENDING_CHIEF: 3,
+}
+
+CRIME_LEVEL_WEIGHTS = {
+    Case.CrimeLevel.LEVEL_3: 55, Case.CrimeLevel.LEVEL_2: 28, Case.CrimeLevel.LEVEL_1: 13, Case.CrimeLevel.CRITICAL: 4,
+}
+
+EVIDENCE_KIND_WEIGHTS = {
+    WitnessTestimony: 30, OtherEvidence: 25, BiologicalEvidence: 15, VehicleEvidence: 15, IdentificationDocument: 15,
+}
+
+# Suspects only exist once a case is under investigation
+INVESTIGATED = {
+    Case.Status.ACTIVE, Case.Status.IN_PURSUIT, Case.Status.PENDING_SERGEANT,
+    Case.Status.PENDING_CHIEF, Case.Status.SOLVED,
+}
+INTERROGATED = {Case.Status.PENDING_SERGEANT, Case.Status.PENDING_CHIEF, Case.Status.SOLVED}
+
+SUSPECT_STATUS_WEIGHTS = {
+    Case.Status.ACTIVE: {Suspect.Status.IDENTIFIED: 90, Suspect.Status.UNDER_ARREST: 10},
+    Case.Status.IN_PURSUIT: {Suspect.Status.IDENTIFIED: 30, Suspect.Status.UNDER_ARREST: 70},
+    Case.Status.PENDING_SERGEANT: {Suspect.Status.ARRESTED: 90, Suspect.Status.UNDER_ARREST: 10},
+    Case.Status.PENDING_CHIEF: {Suspect.Status.ARRESTED: 100},
+    Case.Status.SOLVED: {Suspect.Status.ARRESTED: 85, Suspect.Status.FREE: 15},
+}
+
+# Share of suspects drawn from a small pool of recurring offenders (same national code across cases)
+REPEAT_OFFENDER_RATE = 0.25
+
+FIRST_NAMES = ['علی', 'رضا', 'مریم', 'زهرا', 'حسین', 'سارا', 'محمد', 'نرگس', 'امیر', 'لیلا', 'مهدی', 'فاطمه']
+LAST_NAMES = ['احمدی', 'رضایی', 'کریمی', 'موسوی', 'حسینی', 'محمدی', 'جعفری', 'نوری', 'صادقی', 'رحیمی']
+CRIMES = ['سرقت', 'کلاهبرداری', 'ضرب و جرح', 'قتل', 'آدم‌ربایی', 'جعل اسناد', 'قاچاق', 'تصادف منجر به فوت']
+PLACES = ['خیابان ولیعصر', 'میدان آزادی', 'بازار بزرگ', 'شهرک غرب', 'نارمک', 'تجریش', 'پیروزی', 'جنت‌آباد']
+COLORS = ['مشکی', 'سفید', 'نقره‌ای', 'قرمز', 'آبی']
+CAR_MODELS = ['پژو ۲۰۶', 'پراید', 'سمند', 'تیبا', 'دنا', 'ال۹۰']
+
+
+def insert_rows(model, objs, batch_size, using=DEFAULT_DB_ALIAS):
+    """INSERT ``objs`` into ``model``'s own table in chunks, keeping every value as assigned.
+
+    For an inheritance child only the child table is written; insert the
+    parent model first with the same objects.
+    """
+    if not objs:
+        return
+    fields = model._meta.local_concrete_fields
+    connection = connections[using]
+    size = max(1, min(batch_size, connection.ops.bulk_batch_size(fields, objs)))
+    for start in range(0, len(objs), size):
+        model._base_manager._insert(objs[start:start + size], fields=fields, raw=True, using=using)
+
+
+class SyntheticDataset:
+    """Generates users, cases, evidence, suspects, interrogations, verdicts and notifications.
+
+    Volumes are totals; evidence, suspects and notifications are spread over
+    the cases block by block, so memory stays flat however large the run.
+    """
+
+    def __init__(self, seed=0, prefix='load', anchor=None, days=730, batch_size=2000,
+                 password='password123', using=DEFAULT_DB_ALIAS):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.anchor = anchor or timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.days = days
+        self.batch_size = batch_size
+        self.password = password
+        self.using = using
+        self.counts = {}
+        self._next_pk = {}
+
+    def _pks(self, model, count):
+        start = self._next_pk.get(model)
+        if start is None:
+            start = (model._base_manager.using(self.using).aggregate(top=Max('pk'))['top'] or 0) + 1
+        self._next_pk[model] = start + count
+        return range(start, start + count)
+
+    def _insert(self, model, objs, label=None):
+        insert_rows(model, objs, self.batch_size, self.using)
+        label = label or model._meta.model_name
+        self.counts[label] = self.counts.get(label, 0) + len(objs)
+
+    def _pick(self, weights):
+        return self.rng.choices(list(weights), weights=list(weights.values()))[0]
+
+    def _between(self, start, end):
+        span = max(int((end - start).total_seconds()), 0)
+        return start + timedelta(seconds=self.rng.randint(0, span))
+
+    def _name(self, index=None):
+        if index is None:
+            return self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+        return FIRST_NAMES[index % len(FIRST_NAMES)], LAST_NAMES[index // len(FIRST_NAMES) % len(LAST_NAMES)]
+
+    @staticmethod
+    def _share(total, cases, start, end):
+        """Rows of ``total`` that belong to cases ``start:end`` (the shares add up exactly)."""
+        return total * end // cases - total * start // cases if cases else 0
+
+    def generate(self, users=1000, cases=10000, evidence=50000, suspects=15000, notifications=50000):
+        """Insert everything; yields ``self.counts`` after each committed block."""
+        User = get_user_model()
+        if User.objects.using(self.using).filter(username__startswith=f'{self.prefix}_').exists():
+            raise ValueError(f"Users prefixed '{self.prefix}_' already exist; pick another prefix.")
+
+        with transaction.atomic(using=self.using):
+            self._users(User, max(users, len(ROLE_WEIGHTS)))
+        yield self.counts
+
+        offender_pool = max(1, suspects // 20)
+        for start in range(0, cases, BLOCK_SIZE):
+            end = min(start + BLOCK_SIZE, cases)
+            with transaction.atomic(using=self.using):
+                block = self._cases(end - start)
+                self._evidence(block, self._share(evidence, cases, start, end))
+                self._suspects(block, self._share(suspects, cases, start, end), offender_pool)
+                self._notifications(block, self._share(notifications, cases, start, end))
+            yield self.counts
+
+        self._reset_sequences(User)
+
+    def _users(self, User, count):
+        password = make_password(self.password)
+        codes = list(ROLE_WEIGHTS)
+        self.staff = {code: [] for code in codes}
+        rows, profiles = [], []
+        for index, pk in enumerate(self._pks(User, count)):
+            # Every role gets at least one user, the rest follow the weights
+            code = codes[index] if index < len(codes) else self._pick(ROLE_WEIGHTS)
+            first_name, last_name = self._name()
+            username = f'{self.prefix}_{index:07d}'
+            rows.append(User(
+                pk=pk, username=username, email=f'{username}@example.com', password=password,
+                first_name=first_name, last_name=last_name, is_active=True,
+                date_joined=self.anchor - timedelta(days=self.days + self.rng.randint(0, 365)),
+            ))
+            profiles.append(UserProfile(user_id=pk, national_code=f'8{pk:09d}', phone=f'0900{pk:07d}'))
+            self.staff[code].append(pk)
+        self._insert(User, rows, 'user')
+        for profile, pk in zip(profiles, self._pks(UserProfile, len(profiles))):
+            profile.pk = pk
+        self._insert(UserProfile, profiles)
+
+        roles = {code: Role.objects.using(self.using).get_or_create(code=code, defaults={'name': code})[0]
+                 for code in codes}
+        Role.users.through.objects.using(self.using).bulk_create(
+            [Role.users.through(role_id=roles[code].pk, user_id=pk) for code in codes for pk in self.staff[code]],
+            batch_size=self.batch_size,
+        )
+
+    def _user(self, *codes):
+        return self.rng.choice(self.staff[self.rng.choice(codes)])
+
+    def _cases(self, count):
+        rows, complainants = [], []
+        for pk in self._pks(Case, count):
+            status = self._pick(CASE_STATUS_WEIGHTS)
+            created_at = self.anchor - timedelta(seconds=self.rng.randint(0, self.days * 86400))
+            citizen = self._user('complainant')
+            rows.append(Case(
+                pk=pk,
+                title=f'{self.rng.choice(CRIMES)} در {self.rng.choice(PLACES)}',
+                description=f'گزارش {self.rng.choice(CRIMES)} ثبت‌شده توسط شاکی.',
+                crime_level=self._pick(CRIME_LEVEL_WEIGHTS),
+                status=status,
+                submission_attempts=self.rng.randint(0, 2),
+                # Scene reports come from officers, complaints from citizens
+                creator_id=citizen if self.rng.random() < 0.7 else self._user('police_officer', 'patrol_officer'),
+                created_at=created_at,
+                updated_at=self._between(created_at, self.anchor),
+            ))
+            complainants.append(Case.complainants.through(case_id=pk, user_id=citizen))
+        self._insert(Case, rows)
+        Case.complainants.through.objects.using(self.using).bulk_create(complainants, batch_size=self.batch_size)
+        return rows
+
+    def _evidence(self, cases, count):
+        by_kind = {kind: [] for kind in EVIDENCE_KIND_WEIGHTS}
+        for pk in self._pks(Evidence, count):
+            case = self.rng.choice(cases)
+            kind = self._pick(EVIDENCE_KIND_WEIGHTS)
+            recorded_at = self._between(case.created_at, case.updated_at)
+            obj = kind(
+                case_id=case.pk, title=f'مدرک شماره {pk}', description='یافت‌شده در محل وقوع.',
+                recorder_id=self._user('detective', 'police_officer', 'forensic_doctor'),
+                is_on_board=self.rng.random() < 0.2, recorded_at=recorded_at, updated_at=recorded_at,
+            )
+            obj.pk = obj.id = pk
+            self._fill_evidence(obj)
+            by_kind[kind].append(obj)
+
+        self._insert(Evidence, [obj for objs in by_kind.values() for obj in objs])
+        for kind, objs in by_kind.items():
+            self._insert(kind, objs)
+
+    def _fill_evidence(self, obj):
+        if isinstance(obj, WitnessTestimony):
+            obj.transcript = 'شاهد اظهار داشت که فرد مظنون را در محل دیده است.'
+        elif isinstance(obj, BiologicalEvidence):
+            obj.is_verified = self.rng.random() < 0.6
+            obj.medical_follow_up = 'تطابق DNA' if obj.is_verified else None
+        elif isinstance(obj, VehicleEvidence):
+            obj.model_name, obj.color = self.rng.choice(CAR_MODELS), self.rng.choice(COLORS)
+            # Exactly one of plate and serial, as VehicleEvidence.clean() requires
+            if self.rng.random() < 0.8:
+                obj.license_plate = f'{self.rng.randint(10, 99)}ب{self.rng.randint(100, 999)}-{self.rng.randint(10, 99)}'
+            else:
+                obj.serial_number = f'SN{self.rng.randrange(10 ** 9):09d}'
+        elif isinstance(obj, IdentificationDocument):
+            obj.owner_full_name = ' '.join(self._name())
+
+    def _suspects(self, cases, count, offender_pool):
+        candidates = [case for case in cases if case.status in INVESTIGATED] or cases
+        rows = []
+        for pk in self._pks(Suspect, count):
+            case = self.rng.choice(candidates)
+            if self.rng.random() < REPEAT_OFFENDER_RATE:
+                offender = self.rng.randrange(offender_pool)
+                national_code, (first_name, last_name) = f'7{offender:09d}', self._name(offender)
+            else:
+                national_code, (first_name, last_name) = f'6{pk:09d}', self._name()
+            status = self._pick(SUSPECT_STATUS_WEIGHTS.get(case.status, {Suspect.Status.IDENTIFIED: 1}))
+            created_at = self._between(case.created_at, case.updated_at)
+            rows.append(Suspect(
+                pk=pk, case_id=case.pk, name=f'{first_name} {last_name}', first_name=first_name,
+                last_name=last_name, national_code=national_code, details='سابقه کیفری دارد.',
+                is_main_suspect=self.rng.random() < 0.4, is_on_board=self.rng.random() < 0.5,
+                is_arrested=status == Suspect.Status.ARRESTED, status=status,
+                created_at=created_at, updated_at=created_at,
+            ))
+        self._insert(Suspect, rows)
+        self._interrogations({case.pk: case for case in candidates}, rows)
+
+    def _interrogations(self, cases, suspects):
+        interrogations, feedbacks, verdicts = [], [], []
+        interrogated = [s for s in suspects if cases.get(s.case_id) and cases[s.case_id].status in INTERROGATED]
+        for suspect, pk in zip(interrogated, self._pks(Interrogation, len(interrogated))):
+            case = cases[suspect.case_id]
+            created_at = self._between(suspect.created_at, case.updated_at)
+            scores = self.rng.randint(1, 10), self.rng.randint(1, 10)
+            interrogations.append(Interrogation(
+                pk=pk, suspect_id=suspect.pk, interrogator_id=self._user('detective'),
+                supervisor_id=self._user('sergeant'), transcript='متهم اتهامات را رد کرد.',
+                interrogator_score=scores[0], supervisor_score=scores[1], score=weighted_score(*scores),
+                is_interrogator_confirmed=True, is_supervisor_confirmed=True, created_at=created_at,
+                updated_at=created_at,
+            ))
+            if case.status == Case.Status.PENDING_SERGEANT:
+                continue
+            guilty = self.rng.random() < 0.75
+            critical = case.crime_level == Case.CrimeLevel.CRITICAL
+            feedbacks.append(InterrogationFeedback(
+                interrogation_id=pk, captain_id=self._user('captain'), is_confirmed=True,
+                decision=InterrogationFeedback.Decision.GUILTY if guilty else InterrogationFeedback.Decision.INNOCENT,
+                is_chief_confirmed=True if critical else None, chief_id=self._user('police_chief') if critical else None,
+                created_at=created_at, updated_at=created_at,
+            ))
+            if case.status == Case.Status.SOLVED and guilty:
+                verdicts.append(self._verdict(case, suspect, created_at))
+        self._insert(Interrogation, interrogations)
+        for feedback, pk in zip(feedbacks, self._pks(InterrogationFeedback, len(feedbacks))):
+            feedback.pk = pk
+        self._insert(InterrogationFeedback, feedbacks)
+        # unique (case, suspect): each generated suspect has at most one interrogation
+        for verdict, pk in zip(verdicts, self._pks(Verdict, len(verdicts))):
+            verdict.pk = pk
+            if verdict.bail_paid:
+                verdict.bail_tracking_code = f'B{pk:012d}'
+            if verdict.fine_paid:
+                verdict.fine_tracking_code = f'F{pk:012d}'
+        self._insert(Verdict, verdicts)
+
+    def _verdict(self, case, suspect, created_at):
+        minor = case.crime_level in (Case.CrimeLevel.LEVEL_2, Case.CrimeLevel.LEVEL_3)
+        bail_paid = minor and self.rng.random() < 0.3
+        fine_paid = minor and self.rng.random() < 0.5
+        return Verdict(
+            case_id=case.pk, suspect_id=suspect.pk, judge_id=self._user('judge'),
+            title=f'حکم {suspect.name}', result=Verdict.Result.GUILTY, punishment='حبس تعزیری',
+            description='بر اساس مدارک موجود', bail_amount=self.rng.randint(10, 500) * 10 ** 6 if minor else None,
+            fine_amount=self.rng.randint(1, 100) * 10 ** 6 if minor else None,
+            bail_paid=bail_paid, fine_paid=fine_paid,
+            bail_paid_at=case.updated_at if bail_paid else None, fine_paid_at=case.updated_at if fine_paid else None,
+            created_at=created_at, updated_at=case.updated_at,
+        )
+
+    def _notifications(self, cases, count):
+        rows = []
+        for pk in self._pks(Notification, count):
+            case = self.rng.choice(cases)
+            rows.append(Notification(
+                pk=pk, user_id=self._user('detective', 'sergeant', 'captain', 'police_officer', 'complainant'),
+                title=f'به‌روزرسانی پرونده #{case.pk}', message=f'وضعیت پرونده «{case.title}» تغییر کرد.',
+                link=f'/cases/{case.pk}', is_read=self.rng.random() < 0.7,
+                created_at=self._between(case.created_at, self.anchor),
+            ))
+        self._insert(Notification, rows)
+
+    def _reset_sequences(self, User):
+        """Explicit pks bypass sequences on PostgreSQL/Oracle; move them past the new rows (as loaddata does)."""
+        connection = connections[self.using]
+        models = [User, UserProfile, Case, Evidence, Suspect, Interrogation, InterrogationFeedback, Verdict, Notification]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
@@ -1,10 +1,37 @@
-from rest_framework.test import APITestCase
+import base64
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+from unittest import mock
+
+from asgiref.testing import ApplicationCommunicator
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from .models import Suspect, Warrant, Board
-from cases.models import Case
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count, Max
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from .models import (
+    Board, BoardConnection, Interrogation, InterrogationFeedback, RewardReport, Suspect, Verdict, Warrant,
+)
+from .urls import router as investigation_router
+from .synthetic import SyntheticDataset
+from config.testing import QueryCountMixin
+from cases.models import Case, CaseEvent
+from evidence.models import (
+    BiologicalEvidence, Evidence, IdentificationDocument, OtherEvidence, VehicleEvidence, WitnessTestimony,
+)
 from accounts.models import Role
+from .consumers import board_websocket
+from .realtime import get_board_broker
 
 class InvestigationAPITests(APITestCase):
     def setUp(self):
@@ -49,3 +76,609 @@ class InvestigationAPITests(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['first_name'], 'John')
+
+    def test_reward_payment_event_keeps_only_type_and_amount(self):
+        """The case timeline records a reward payment without its tracking code"""
+        report = RewardReport.objects.create(
+            reporter=self.detective, suspect=self.suspect, description="Seen him",
+            status=RewardReport.Status.APPROVED, reward_amount=5000, tracking_code="R0001",
+        )
+        self.client.force_authenticate(user=self.detective)
+        response = self.client.post(reverse("reward-report-mark-paid", args=[report.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        event = CaseEvent.objects.get(case=self.case, kind=CaseEvent.Kind.PAYMENT)
+        self.assertEqual(event.data, {'type': 'reward', 'amount': 5000})
+
+
+class BoardGraphTests(APITestCase):
+    def setUp(self):
+        self.User = get_user_model()
+        detective_role, _ = Role.objects.get_or_create(code='detective', defaults={'name': 'Detective'})
+        self.detective = self.User.objects.create_user("det", "d@t.com", "pass")
+        self.detective.roles.add(detective_role)
+        self.case = Case.objects.create(title="Board", creator=self.detective)
+        self.suspect = Suspect.objects.create(case=self.case, first_name="John", last_name="Doe", is_on_board=True)
+        self.evidence = VehicleEvidence.objects.create(
+            case=self.case, title="Car", description="d", recorder=self.detective,
+            model_name="Mazda", color="Black", license_plate="11A111", is_on_board=True,
+        )
+        OtherEvidence.objects.create(case=self.case, title="Hidden", description="d", recorder=self.detective)
+        BoardConnection.objects.create(case=self.case, from_evidence=self.evidence, to_suspect=self.suspect)
+        self.board = Board.objects.create(case=self.case)
+        self.url = reverse("board-graph") + f"?case={self.case.id}"
+        self.client.force_authenticate(user=self.detective)
+
+    def test_graph_returns_on_board_nodes_and_edges(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        nodes = {(n['kind'], n['id']): n for n in response.data['nodes']}
+        self.assertEqual(set(nodes), {('evidence', self.evidence.id), ('suspect', self.suspect.id)})
+        self.assertEqual(nodes[('evidence', self.evidence.id)]['type'], 'vehicle')
+        self.assertEqual(response.data['edges'][0]['from'], {'kind': 'evidence', 'id': self.evidence.id})
+
+    def test_graph_query_count_does_not_grow_with_board(self):
+        self.client.get(self.url)
+        for i in range(10):
+            OtherEvidence.objects.create(case=self.case, title=f"E{i}", description="d", recorder=self.detective, is_on_board=True)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url)
+        # roles check + case existence + board + layouts + evidence + suspects + edges
+        self.assertLessEqual(len(ctx.captured_queries), 7)
+
+    def test_unchanged_board_is_not_modified(self):
+        first = self.client.get(self.url)
+        etag = first['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.post(reverse("suspect-toggle-board", args=[self.suspect.id]))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_if_none_match_compares_whole_tags(self):
+        """A longer version that merely contains the current tag does not match; weak and listed tags do"""
+        Board.objects.filter(pk=self.board.pk).update(version=3)
+        etag = f'"board-{self.case.id}-v3"'
+        longer = f'"board-{self.case.id}-v31"'
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=longer).status_code, status.HTTP_200_OK)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'{longer}, W/{etag}')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_reading_a_missing_board_does_not_create_it(self):
+        """GET serves version 0 without an ETag and without writing a board row"""
+        self.board.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['board'], response.data['version']), (None, 0))
+        self.assertEqual(len(response.data['nodes']), 2)
+        self.assertNotIn('ETag', response)
+        self.assertFalse(Board.objects.filter(case=self.case).exists())
+
+
+class BoardPatchTests(APITestCase):
+    def setUp(self):
+        self.User = get_user_model()
+        detective_role, _ = Role.objects.get_or_create(code='detective', defaults={'name': 'Detective'})
+        self.detective = self.User.objects.create_user("det", "d@t.com", "pass")
+        self.detective.roles.add(detective_role)
+        self.case = Case.objects.create(title="Board", creator=self.detective)
+        self.suspect = Suspect.objects.create(case=self.case, first_name="John", last_name="Doe")
+        self.evidence = [
+            OtherEvidence.objects.create(case=self.case, title=f"E{i}", description="d", recorder=self.detective)
+            for i in range(20)
+        ]
+        self.url = reverse("board-apply-patch")
+        self.client.force_authenticate(user=self.detective)
+
+    def _patch(self, operations, **extra):
+        return self.client.post(self.url, {'case': self.case.id, 'operations': operations, **extra}, format='json')
+
+    def test_patch_applies_all_operations_in_one_request(self):
+        ops = [{'op': 'add_node', 'kind': 'evidence', 'id': e.id} for e in self.evidence]
+        ops += [{'op': 'move', 'kind': 'evidence', 'id': e.id, 'x': i * 10, 'y': 5} for i, e in enumerate(self.evidence)]
+        ops += [
+            {'op': 'add_node', 'kind': 'suspect', 'id': self.suspect.id},
+            {'op': 'connect', 'from': {'kind': 'evidence', 'id': self.evidence[0].id},
+             'to': {'kind': 'suspect', 'id': self.suspect.id}, 'description': 'weapon'},
+            {'op': 'remove_node', 'kind': 'evidence', 'id': self.evidence[1].id},
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._patch(ops)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLess(len(ctx.captured_queries), 25)
+
+        self.assertEqual(len(response.data['nodes']), 20)
+        moved = next(n for n in response.data['nodes'] if n['id'] == self.evidence[3].id and n['kind'] == 'evidence')
+        self.assertEqual((moved['x'], moved['y']), (30, 5))
+        self.assertEqual(len(response.data['edges']), 1)
+        self.assertEqual(response.data['version'], 1)
+
+        second = self._patch([{'op': 'move', 'kind': 'evidence', 'id': self.evidence[3].id, 'x': 1, 'y': 2}])
+        moved = next(n for n in second.data['nodes'] if n['id'] == self.evidence[3].id and n['kind'] == 'evidence')
+        self.assertEqual((moved['x'], moved['y']), (1, 2))
+
+    def test_invalid_operation_rolls_back_whole_patch(self):
+        other_case = Case.objects.create(title="Other", creator=self.detective)
+        foreign = Suspect.objects.create(case=other_case, first_name="X")
+        response = self._patch([
+            {'op': 'add_node', 'kind': 'evidence', 'id': self.evidence[0].id},
+            {'op': 'add_node', 'kind': 'suspect', 'id': foreign.id},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.evidence[0].refresh_from_db()
+        self.assertFalse(self.evidence[0].is_on_board)
+
+    def test_stale_base_version_conflicts(self):
+        self._patch([{'op': 'add_node', 'kind': 'suspect', 'id': self.suspect.id}])
+        response = self._patch([{'op': 'remove_node', 'kind': 'suspect', 'id': self.suspect.id}], base_version=0)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+
+class BoardRealtimeTests(TestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        detective_role, _ = Role.objects.get_or_create(code='detective', defaults={'name': 'Detective'})
+        self.detective = get_user_model().objects.create_user("det", "d@t.com", "pass")
+        self.detective.roles.add(detective_role)
+        self.case = Case.objects.create(title="Live", creator=self.detective)
+        self.suspect = Suspect.objects.create(case=self.case, first_name="John")
+        self.token = str(AccessToken.for_user(self.detective))
+
+    def _communicator(self, token):
+        return ApplicationCommunicator(board_websocket, {
+            'type': 'websocket',
+            'path': f'/ws/board/{self.case.id}/',
+            'query_string': f'token={token}'.encode(),
+        })
+
+    async def test_watcher_receives_published_events(self):
+        communicator = self._communicator(self.token)
+        await communicator.send_input({'type': 'websocket.connect'})
+        self.assertEqual((await communicator.receive_output())['type'], 'websocket.accept')
+        self.assertEqual(json.loads((await communicator.receive_output())['text'])['type'], 'hello')
+
+        get_board_broker().publish(self.case.id, {'type': 'edge.deleted', 'id': 7})
+        message = await communicator.receive_output()
+        self.assertEqual(json.loads(message['text']), {'type': 'edge.deleted', 'id': 7})
+
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait()
+        self.assertEqual(get_board_broker().subscriber_count(self.case.id), 0)
+
+    async def test_invalid_token_is_refused(self):
+        communicator = self._communicator('not-a-token')
+        await communicator.send_input({'type': 'websocket.connect'})
+        self.assertEqual(await communicator.receive_output(), {'type': 'websocket.close', 'code': 4401})
+
+    def test_board_changes_are_broadcast_after_commit(self):
+        self.client.force_authenticate(user=self.detective)
+        with mock.patch.object(get_board_broker(), 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse("suspect-toggle-board", args=[self.suspect.id]))
+        publish.assert_called_once()
+        case_id, event = publish.call_args.args
+        self.assertEqual(case_id, self.case.id)
+        self.assertEqual(event['kind'], 'suspect')
+        self.assertTrue(event['on_board'])
+
+
+class DeltaSyncTests(APITestCase):
+    def setUp(self):
+        self.User = get_user_model()
+        detective_role, _ = Role.objects.get_or_create(code='detective', defaults={'name': 'Detective'})
+        self.detective = self.User.objects.create_user("det", "d@t.com", "pass")
+        self.detective.roles.add(detective_role)
+        self.outsider = self.User.objects.create_user("out", "o@t.com", "pass")
+        self.case = Case.objects.create(title="Sync", creator=self.detective, status=Case.Status.ACTIVE)
+        self.suspect = Suspect.objects.create(case=self.case, first_name="John")
+        self.url = reverse("sync")
+
+    def test_changes_and_deletions_after_cursor(self):
+        """A second sync returns only rows changed or deleted since the cursor"""
+        self.client.force_authenticate(user=self.detective)
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in first.data['changes']['suspects']], [self.suspect.id])
+
+        evidence = OtherEvidence.objects.create(case=self.case, title="Knife", recorder=self.detective)
+        suspect_id = self.suspect.id
+        self.suspect.delete()
+        second = self.client.get(self.url, {'since': first.data['cursor']})
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in second.data['changes']['evidence']], [evidence.id])
+        self.assertEqual(second.data['changes']['cases'], [])
+        self.assertEqual(second.data['deleted']['suspects'], [suspect_id])
+
+        third = self.client.get(self.url, {'since': second.data['cursor']})
+        self.assertFalse(any(third.data['changes'].values()))
+        self.assertFalse(any(third.data['deleted'].values()))
+
+    def test_sync_respects_case_visibility_and_pages(self):
+        """Invisible cases are excluded and has_more pages through the rest"""
+        self.client.force_authenticate(user=self.outsider)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['changes']['cases'], [])
+        self.assertEqual(response.data['changes']['suspects'], [])
+
+        Suspect.objects.create(case=self.case, first_name="Jane")
+        self.client.force_authenticate(user=self.detective)
+        page = self.client.get(self.url, {'limit': 1})
+        self.assertTrue(page.data['has_more'])
+        rest = self.client.get(self.url, {'since': page.data['cursor'], 'limit': 1})
+        seen = [row['id'] for row in page.data['changes']['suspects'] + rest.data['changes']['suspects']]
+        self.assertEqual(len(set(seen)), 2)
+
+        self.assertEqual(self.client.get(self.url, {'since': 'garbage!'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_malformed_stream_position_is_rejected(self):
+        """A cursor decoding to the wrong shapes is a 400, not a server error"""
+        self.client.force_authenticate(user=self.detective)
+        for position in ({'cases': 5}, {'cases': [1]}, {'suspects': ['a', 1]}, {'tombstone': True}):
+            cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+            response = self.client.get(self.url, {'since': cursor})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, position)
+
+    def test_deleted_cases_only_reach_users_who_could_see_them(self):
+        """Case tombstones go to the case's creator, not to every user"""
+        cursors = {}
+        for user in (self.detective, self.outsider):
+            self.client.force_authenticate(user=user)
+            cursors[user] = self.client.get(self.url).data['cursor']
+        private = Case.objects.create(title="Private", creator=self.outsider, status=Case.Status.PENDING_TRAINEE)
+        private_id = private.id
+        private.delete()
+
+        self.client.force_authenticate(user=self.detective)
+        self.assertEqual(self.client.get(self.url, {'since': cursors[self.detective]}).data['deleted']['cases'], [])
+        self.client.force_authenticate(user=self.outsider)
+        self.assertEqual(
+            self.client.get(self.url, {'since': cursors[self.outsider]}).data['deleted']['cases'], [private_id]
+        )
+
+
+class BailSnapshotTests(APITransactionTestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser("root", "r@t.com", "pass")
+        self.case = Case.objects.create(title="Closed", creator=self.admin, status=Case.Status.SOLVED)
+        self.suspect = Suspect.objects.create(
+            case=self.case, first_name="John", status=Suspect.Status.ARRESTED, is_arrested=True,
+        )
+        self.verdict = Verdict.objects.create(
+            case=self.case, suspect=self.suspect, judge=self.admin, title="Bail",
+            result=Verdict.Result.GUILTY, bail_amount=1000,
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def _suspect_statuses(self):
+        history = self.client.get(reverse("case-trial-history", args=[self.case.id]))
+        return [suspect['status'] for suspect in history.data['suspects']]
+
+    def test_bail_release_reaches_the_closed_case_snapshot(self):
+        """Paying bail on a solved case refreshes its snapshot after the suspect is released"""
+        self.assertEqual(self._suspect_statuses(), [Suspect.Status.ARRESTED])
+        response = self.client.post(
+            reverse("verdict-bail-payment-callback", args=[self.verdict.id]), {'status': 'success'}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._suspect_statuses(), [Suspect.Status.FREE])
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        self.User = get_user_model()
+        detective_role, _ = Role.objects.get_or_create(code='detective', defaults={'name': 'Detective'})
+        self.detective = self.User.objects.create_user("det", "d@t.com", "pass")
+        self.detective.roles.add(detective_role)
+        self.case = Case.objects.create(title="Visible", creator=self.detective, status=Case.Status.ACTIVE)
+        self.hidden = Case.objects.create(title="Hidden", status=Case.Status.PENDING_TRAINEE)
+        VehicleEvidence.objects.create(
+            case=self.case, title="Car", description="d", recorder=self.detective,
+            model_name="Pride", color="white", license_plate="12",
+        )
+        OtherEvidence.objects.create(case=self.hidden, title="Secret", recorder=self.detective)
+
+    def _stream(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_streams_visible_rows_with_subtype_columns(self):
+        """Evidence export is streamed, includes subtype fields and skips invisible cases"""
+        self.client.force_authenticate(user=self.detective)
+        response = self.client.get(reverse("export", args=["evidence"]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        rows = list(csv.DictReader(io.StringIO(self._stream(response))))
+        self.assertEqual([(r['title'], r['kind'], r['vehicleevidence__color']) for r in rows], [("Car", "vehicle", "white")])
+
+    def test_ndjson_export_and_command(self):
+        """NDJSON lines parse as objects; the command exports everything by default"""
+        self.client.force_authenticate(user=self.detective)
+        response = self.client.get(reverse("export", args=["cases"]), {'output': 'ndjson'})
+        lines = [json.loads(line) for line in self._stream(response).splitlines()]
+        self.assertEqual([line['title'] for line in lines], ["Visible"])
+        self.assertEqual(self.client.get(reverse("export", args=["nope"])).status_code, status.HTTP_404_NOT_FOUND)
+
+        out = io.StringIO()
+        call_command('export_data', 'cases', '--output-format', 'ndjson', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
+
+    def test_rewards_export_only_has_own_reports_for_citizens(self):
+        """A citizen exports only reports they filed, even on a case they can see, and never tracking codes"""
+        citizen = self.User.objects.create_user("cit", "c@t.com", "pass")
+        own_case = Case.objects.create(title="Mine", creator=citizen, status=Case.Status.ACTIVE)
+        suspect = Suspect.objects.create(case=own_case, first_name="John")
+        mine = RewardReport.objects.create(reporter=citizen, suspect=suspect, description="a", tracking_code="R1")
+        RewardReport.objects.create(reporter=self.detective, suspect=suspect, description="b", tracking_code="R2")
+
+        self.client.force_authenticate(user=citizen)
+        response = self.client.get(reverse("export", args=["rewards"]), {'output': 'ndjson'})
+        lines = [json.loads(line) for line in self._stream(response).splitlines()]
+        self.assertEqual([line['id'] for line in lines], [mine.id])
+        self.assertNotIn('tracking_code', lines[0])
+
+        self.client.force_authenticate(user=self.detective)
+        response = self.client.get(reverse("export", args=["rewards"]), {'output': 'ndjson'})
+        self.assertEqual(len(self._stream(response).splitlines()), 2)
+
+
+class SyntheticDatasetTests(TestCase):
+    ANCHOR = timezone.make_aware(datetime(2026, 1, 1))
+    VOLUMES = dict(users=40, cases=1500, evidence=3000, suspects=900, notifications=600)
+
+    def _generate(self, prefix):
+        dataset = SyntheticDataset(seed=7, prefix=prefix, anchor=self.ANCHOR, days=90, batch_size=250)
+        list(dataset.generate(**self.VOLUMES))
+        return dataset
+
+    def test_generates_requested_volumes_across_blocks(self):
+        """Totals are exact across blocks; every evidence kind gets parent and child rows."""
+        dataset = self._generate('load')
+
+        self.assertEqual(Case.objects.count(), 1500)
+        self.assertEqual(Evidence.objects.count(), 3000)
+        self.assertEqual(Suspect.objects.count(), 900)
+        self.assertEqual(dataset.counts['notification'], 600)
+        kinds = [WitnessTestimony, BiologicalEvidence, VehicleEvidence, IdentificationDocument, OtherEvidence]
+        self.assertEqual(sum(kind.objects.count() for kind in kinds), 3000)
+        self.assertTrue(all(kind.objects.exists() for kind in kinds))
+        self.assertFalse(VehicleEvidence.objects.filter(license_plate__isnull=True, serial_number__isnull=True).exists())
+        # Generated timestamps survive auto_now_add, and recurring offenders share national codes
+        self.assertLessEqual(Case.objects.aggregate(newest=Max('created_at'))['newest'], self.ANCHOR)
+        repeated = Suspect.objects.values('national_code').annotate(n=Count('pk')).filter(n__gt=1)
+        self.assertTrue(repeated.exists())
+        self.assertTrue(Verdict.objects.filter(case__status=Case.Status.SOLVED).exists())
+
+    def test_same_seed_produces_same_rows(self):
+        """A second run with the same seed repeats the first one row for row."""
+        self._generate('first')
+        first = list(Case.objects.order_by('pk').values_list('title', 'status', 'crime_level', 'created_at'))
+        self._generate('second')
+        second = list(Case.objects.order_by('pk').values_list('title', 'status', 'crime_level', 'created_at'))[1500:]
+
+        self.assertEqual(first, second)
+
+        with self.assertRaises(ValueError):
+            self._generate('first')
+
+
+class EndpointBenchmarkTests(TestCase):
+    def setUp(self):
+        dataset = SyntheticDataset(seed=3, anchor=timezone.make_aware(datetime(2026, 1, 1)))
+        list(dataset.generate(users=30, cases=60, evidence=120, suspects=80, notifications=40))
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.output = os.path.join(tmp.name, 'bench.json')
+
+    def _run(self, *args):
+        call_command(
+            'benchmark_endpoints', '--current-db', '--repeat', '2', '--output', self.output,
+            '--scenarios', 'case_list_detective,most_wanted', *args, stderr=io.StringIO(), stdout=io.StringIO(),
+        )
+        with open(self.output, encoding='utf-8') as handle:
+            return json.load(handle)
+
+    def test_writes_latency_and_query_counts(self):
+        """Results carry percentiles and query counts per scenario and fit the shipped budgets."""
+        report = self._run()
+
+        result = report['results']['current']['case_list_detective']
+        self.assertEqual(result['status'], 200)
+        self.assertGreater(result['queries'], 0)
+        self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+        self.assertEqual(report['violations'], [])
+
+    def test_exceeded_budget_fails(self):
+        """A scenario above its query budget makes the command fail after writing the report."""
+        budgets = os.path.join(os.path.dirname(self.output), 'budgets.json')
+        with open(budgets, 'w', encoding='utf-8') as handle:
+            json.dump({'*': {'most_wanted': {'queries': 0}}}, handle)
+
+        with self.assertRaises(CommandError):
+            self._run('--budgets', budgets)
+        with open(self.output, encoding='utf-8') as handle:
+            self.assertIn('current/most_wanted: queries 2 > budget 0', json.load(handle)['violations'])
+
+
+class ListQueryCountTests(QueryCountMixin, APITestCase):
+    router = investigation_router
+
+    def setUp(self):
+        super().setUp()
+        self.case = Case.objects.create(title='QC', description='d', creator=self.qc_user)
+
+    def _suspects(self, rows):
+        return [Suspect.objects.create(case=self.case, first_name='S', details='d') for _ in range(rows)]
+
+    def _interrogations(self, rows):
+        interrogations = []
+        for suspect in self._suspects(rows):
+            interrogation = Interrogation.objects.create(
+                suspect=suspect, interrogator=self.qc_user, supervisor=self.qc_user, transcript='t',
+            )
+            InterrogationFeedback.objects.create(
+                interrogation=interrogation, captain=self.qc_user, chief=self.qc_user, decision='GUILTY',
+            )
+            interrogations.append(interrogation)
+        return interrogations
+
+    def seed_board(self, rows):
+        for _ in range(rows):
+            Board.objects.create(case=Case.objects.create(title='QC', description='d'))
+
+    def seed_suspect(self, rows):
+        self._interrogations(rows)
+
+    def seed_interrogation(self, rows):
+        self._interrogations(rows)
+
+    def seed_boardconnection(self, rows):
+        suspect, = self._suspects(1)
+        for _ in range(rows):
+            BoardConnection.objects.create(case=self.case, from_suspect=suspect, to_suspect=suspect)
+
+    def seed_verdict(self, rows):
+        for suspect in self._suspects(rows):
+            Verdict.objects.create(
+                case=self.case, suspect=suspect, judge=self.qc_user, title='v', result='GUILTY', description='d',
+            )
+
+    def seed_warrant(self, rows):
+        Warrant.objects.bulk_create([
+            Warrant(case=self.case, requester=self.qc_user, approver=self.qc_user, description='d')
+            for _ in range(rows)
+        ])
+
+    def seed_reward_report(self, rows):
+        RewardReport.objects.bulk_create([
+            RewardReport(reporter=self.qc_user, officer=self.qc_user, detective=self.qc_user, description='d')
+            for _ in range(rows)
+        ])
+
+    def test_pending_payments_queries_do_not_grow(self):
+        """Pending payments loads verdicts with their case and suspect and checks bail eligibility in SQL"""
+        Case.objects.filter(pk=self.case.pk).update(crime_level=Case.CrimeLevel.LEVEL_2)
+        ineligible = Case.objects.create(
+            title='QC', description='d', creator=self.qc_user, crime_level=Case.CrimeLevel.LEVEL_1,
+        )
+        Verdict.objects.create(
+            case=ineligible, suspect=Suspect.objects.create(case=ineligible, first_name='S'),
+            judge=self.qc_user, title='v', result='GUILTY', description='d',
+        )
+        url = reverse('verdict-pending-payments')
+        self.seed_verdict(self.small)
+        few = self._list_queries(url)
+        self.seed_verdict(self.large - self.small)
+        many = self._list_queries(url)
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(len(self.client.get(url).data), self.large)
+
+
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser('sparse', 's@test.com', 'pass')
+        detective, _ = Role.objects.get_or_create(code='detective', defaults={'name': 'Detective'})
+        detective.users.add(self.user)
+        self.client.force_authenticate(self.user)
+        case = Case.objects.create(title='Sparse', description='d', creator=self.user)
+        self.suspect = Suspect.objects.create(case=case, first_name='S', details='long details')
+        Interrogation.objects.create(
+            suspect=self.suspect, interrogator=self.user, supervisor=self.user, transcript='long transcript',
+            interrogator_score=7, supervisor_score=7,
+        )
+
+    def _get(self, name, params=''):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse(name) + params)
+        self.assertEqual(response.status_code, 200)
+        return response.data['results'], ' '.join(query['sql'] for query in captured.captured_queries)
+
+    def test_default_rows_are_unchanged(self):
+        rows, _ = self._get('suspect-list')
+        self.assertEqual(rows[0]['interrogations'][0]['transcript'], 'long transcript')
+        self.assertEqual(rows[0]['details'], 'long details')
+
+    def test_fields_trim_rows_and_skip_unrequested_relations(self):
+        rows, sql = self._get('suspect-list', '?fields=id,first_name')
+        self.assertEqual(set(rows[0]), {'id', 'first_name'})
+        self.assertNotIn('investigation_interrogation', sql)
+        self.assertNotIn('"details"', sql)
+
+    def test_expand_opts_into_nested_fields(self):
+        rows, _ = self._get('suspect-list', '?expand=')
+        self.assertNotIn('interrogations', rows[0])
+        self.assertIn('details', rows[0])
+
+        rows, _ = self._get('suspect-list', '?fields=id&expand=interrogations')
+        self.assertEqual(set(rows[0]), {'id', 'interrogations'})
+        self.assertEqual(rows[0]['interrogations'][0]['final_score'], 7)
+
+    def test_dotted_fields_reach_nested_serializers_and_defer_text(self):
+        rows, sql = self._get('suspect-list', '?fields=id,interrogations.id,interrogations.final_score')
+        self.assertEqual(rows[0]['interrogations'], [{'id': rows[0]['interrogations'][0]['id'], 'final_score': 7}])
+        self.assertNotIn('"transcript"', sql)
+
+        rows, sql = self._get('interrogation-list', '?fields=id,final_score')
+        self.assertEqual(set(rows[0]), {'id', 'final_score'})
+        self.assertNotIn('"transcript"', sql)
+
+
+class MostWantedCachingTests(APITestCase):
+    def test_most_wanted_revalidates(self):
+        Suspect.objects.create(case=Case.objects.create(title='MW', description='d'), first_name='A')
+        first = self.client.get(reverse('suspect-most-wanted'))
+        self.assertEqual(first['Cache-Control'], 'public, max-age=60')
+        self.assertEqual(
+            self.client.get(reverse('suspect-most-wanted'), HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304,
+        )
+
+        Suspect.objects.create(case=Case.objects.create(title='MW2', description='d'), first_name='B')
+        self.assertEqual(
+            self.client.get(reverse('suspect-most-wanted'), HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200,
+        )
+
+
+class InterrogationPerformanceTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        captain, _ = Role.objects.get_or_create(code='captain', defaults={'name': 'Captain'})
+        self.captain = User.objects.create_user('cap', 'c@test.com', 'pass')
+        self.captain.roles.add(captain)
+        self.detective = User.objects.create_user('det', 'd@test.com', 'pass')
+        self.sergeant = User.objects.create_user('sgt', 's@test.com', 'pass')
+        self.suspect = Suspect.objects.create(case=Case.objects.create(title='Perf', description='d'), first_name='P')
+
+    def _interrogate(self, interrogator_score, supervisor_score, confirmed=False):
+        return Interrogation.objects.create(
+            suspect=self.suspect, interrogator=self.detective, supervisor=self.sergeant,
+            interrogator_score=interrogator_score, supervisor_score=supervisor_score,
+            is_interrogator_confirmed=confirmed, is_supervisor_confirmed=confirmed,
+        )
+
+    def test_score_is_stored_and_kept_in_sync(self):
+        interrogation = self._interrogate(4, None)
+        self.assertEqual(Interrogation.objects.get(pk=interrogation.pk).score, 4.0)
+
+        interrogation.supervisor_score = 7
+        interrogation.save(update_fields=['supervisor_score'])
+        self.assertEqual(Interrogation.objects.get(pk=interrogation.pk).score, 6.0)
+
+    def test_rollups_group_by_officer(self):
+        self._interrogate(6, 9, confirmed=True)
+        self._interrogate(3, 3)
+        # Not scored yet: counted, but left out of the mean
+        self._interrogate(None, None)
+        self.client.force_authenticate(self.captain)
+        response = self.client.get(reverse('interrogation-performance'))
+        self.assertEqual(response.status_code, 200)
+        expected = {'interrogations': 3, 'scored': 2, 'mean_score': 5.5, 'confirmed': 1, 'confirmation_rate': 0.333}
+        self.assertEqual(response.data['detectives'], [{'user_id': self.detective.pk, 'username': 'det', **expected}])
+        self.assertEqual(response.data['sergeants'], [{'user_id': self.sergeant.pk, 'username': 'sgt', **expected}])
+
+        response = self.client.get(reverse('interrogation-performance'), {'since': '2999-01-01'})
+        self.assertEqual(response.data['detectives'], [])
+        self.assertEqual(self.client.get(reverse('interrogation-performance'), {'since': 'soon'}).status_code, 400)
+
+    def test_requires_captain(self):
+        self.client.force_authenticate(self.detective)
+        self.assertEqual(self.client.get(reverse('interrogation-performance')).status_code, 403)
@@ -0,0 +1,14 @@
+from cases.transitions import StateMachine
+
+from .models import Suspect, Warrant
+
+
+SUSPECT_TRANSITIONS = StateMachine(Suspect, {
+    Suspect.Status.IDENTIFIED: [Suspect.Status.UNDER_ARREST, Suspect.Status.ARRESTED],
+    Suspect.Status.UNDER_ARREST: [Suspect.Status.ARRESTED],
+    Suspect.Status.ARRESTED: [Suspect.Status.FREE],
+})
+
+WARRANT_TRANSITIONS = StateMachine(Warrant, {
+    Warrant.Status.PENDING: [Warrant.Status.APPROVED, Warrant.Status.REJECTED],
+})
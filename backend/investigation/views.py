@@ -1,11 +1,12 @@
-from django.db import models
-from django.db.models import Count, Q
+from django.db import models, transaction
+from django.db.models import Avg, Count, F, Max, Q
 import random
 import string
 from collections import defaultdict
-from rest_framework import viewsets, permissions, status
+from rest_framework import filters, viewsets, permissions, status
 from rest_framework.exceptions import PermissionDenied
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.shortcuts import render
 from django.urls import reverse
 from rest_framework.decorators import action
@@ -14,15 +15,22 @@ from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from cases.permissions import IsOfficerOrHigher  # از قبل داری
 
-from cases.models import Case
+from cases.models import Case, CaseEvent
 from .models import Suspect, Interrogation, InterrogationFeedback, BoardConnection, Board, Verdict, Warrant, RewardReport
 from .serializers import (
     SuspectSerializer, SuspectStatusSerializer, InterrogationSerializer, 
     InterrogationFeedbackSerializer, BoardConnectionSerializer, BoardSerializer,
-    VerdictSerializer, WarrantSerializer, RewardReportSerializer
+    VerdictSerializer, WarrantSerializer, RewardReportSerializer, BoardPatchSerializer
 )
 from .permissions import IsCaptain, IsDetective, IsJudge, IsSergeant, IsPoliceChief
+from .board import apply_board_patch, board_etag, build_board_graph
+from .transitions import SUSPECT_TRANSITIONS, WARRANT_TRANSITIONS
+from .visibility import visible_reward_reports
 from cases.permissions import IsOfficerOrHigher, IsInvestigator
+from cases.events import record_case_event
+from cases.transitions import CASE_TRANSITIONS
+from config.http import conditional_response, not_modified
+from config.query_plans import QueryPlanMixin
 
 
 
@@ -168,6 +176,15 @@ class CriminalRankingView(APIView):
 
 
 
+def _record_reward_payment(report, user):
+    # Rewards for tips that never matched a suspect have no case to attach to
+    if report.suspect_id:
+        record_case_event(
+            report.suspect.case_id, CaseEvent.Kind.PAYMENT, actor=user, object_id=report.pk,
+            data={'type': 'reward', 'amount': report.reward_amount},
+        )
+
+
 def _match_suspect(report):
     if report.suspect_id:
         return report.suspect
@@ -180,7 +197,75 @@ def _match_suspect(report):
     return None
 
 
-class WarrantViewSet(viewsets.ModelViewSet):
+def _most_wanted_rows():
+    suspects = Suspect.objects.select_related('case').all()
+
+    # گروه‌بندی بر اساس national_code (اگر خالی بود، با id جدا نگهش می‌داریم)
+    groups = {}
+    for s in suspects:
+        key = (s.national_code or "").strip()
+        if not key:
+            key = f"__suspect_{s.id}"  # برای افرادی که کدملی ندارند
+        g = groups.get(key)
+        if not g:
+            full_name = f"{s.first_name} {s.last_name}".strip() or (s.name or "").strip()
+            groups[key] = g = {
+                "national_code": s.national_code,
+                "full_name": full_name,
+                "suspect_ids": [],
+                "case_ids": set(),
+                "image": s.image.url if s.image else None,
+                "max_pursuit_days_open": 0,
+                "max_crime_level": 0,  # امتیاز ۱..۴
+            }
+
+        g["suspect_ids"].append(s.id)
+        if s.case_id:
+            g["case_ids"].add(s.case_id)
+        
+        # ثبت تصویر از مظنونینی که عکس دارند
+        if s.image and not g["image"]:
+            g["image"] = s.image.url
+
+        # max(Di) از همه پرونده‌ها
+        if s.case_id:
+            di = _crime_level_score(s.case.crime_level)
+            if di > g["max_crime_level"]:
+                g["max_crime_level"] = di
+
+        # max(Lj) فقط از پرونده‌های باز
+        if s.case_id and _is_case_open(s.case):
+            lj = _pursuit_days(s)  # این تابع خودش open بودن را هم چک می‌کند
+            if lj > g["max_pursuit_days_open"]:
+                g["max_pursuit_days_open"] = lj
+
+    # تبدیل به لیست + فیلتر یک ماه
+    results = []
+    for key, g in groups.items():
+        if g["max_pursuit_days_open"] <= 30:
+            continue
+
+        score = g["max_pursuit_days_open"] * g["max_crime_level"]
+        reward_amount = score * 20000000
+
+        results.append({
+            "national_code": g["national_code"],
+            "full_name": g["full_name"],
+            "suspect_ids": g["suspect_ids"],
+            "case_ids": sorted(list(g["case_ids"])),
+            "image": g["image"],
+            "max_pursuit_days": g["max_pursuit_days_open"],
+            "max_crime_level": g["max_crime_level"],
+            "score": score,
+            "reward_amount": reward_amount,
+        })
+
+    # مرتب‌سازی نزولی بر اساس score
+    results.sort(key=lambda x: x["score"], reverse=True)
+    return results
+
+
+class WarrantViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Warrant.objects.all()
     serializer_class = WarrantSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -204,29 +289,35 @@ class WarrantViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated, IsSergeant])
     def approve(self, request, pk=None):
         warrant = self.get_object()
-        warrant.status = 'APPROVED'
-        warrant.approver = request.user
-        warrant.approver_notes = request.data.get('notes', '')
-        warrant.save()
-        
-        # When a warrant is approved, the suspect enters the 'UNDER_ARREST' (in pursuit) state
-        if warrant.suspect:
-            warrant.suspect.status = Suspect.Status.UNDER_ARREST
-            warrant.suspect.is_arrested = True # Keep legacy field sync for now
-            warrant.suspect.save()
+        with transaction.atomic():
+            WARRANT_TRANSITIONS.apply(
+                warrant, Warrant.Status.APPROVED, actor=request.user,
+                approver=request.user,
+                approver_notes=request.data.get('notes', ''),
+            )
+
+            # When a warrant is approved, an identified suspect enters the 'UNDER_ARREST' (in pursuit) state
+            if warrant.suspect_id:
+                SUSPECT_TRANSITIONS.apply_many(
+                    Suspect.objects.filter(pk=warrant.suspect_id),
+                    Suspect.Status.UNDER_ARREST,
+                    actor=request.user,
+                    is_arrested=True,  # Keep legacy field sync for now
+                )
             
         return Response({'status': 'approved'})
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated, IsSergeant])
     def reject(self, request, pk=None):
         warrant = self.get_object()
-        warrant.status = 'REJECTED'
-        warrant.approver = request.user
-        warrant.approver_notes = request.data.get('notes', '')
-        warrant.save()
+        WARRANT_TRANSITIONS.apply(
+            warrant, Warrant.Status.REJECTED, actor=request.user,
+            approver=request.user,
+            approver_notes=request.data.get('notes', ''),
+        )
         return Response({'status': 'rejected'})
 
-class BoardViewSet(viewsets.ModelViewSet):
+class BoardViewSet(QueryPlanMixin, viewsets.ModelViewSet):
 
     queryset = Board.objects.all()
     serializer_class = BoardSerializer
@@ -238,10 +329,59 @@ class BoardViewSet(viewsets.ModelViewSet):
             return self.queryset.filter(case_id=case_id)
         return self.queryset
 
-class SuspectViewSet(viewsets.ModelViewSet):
+    @extend_schema(
+        summary="گراف کامل تخته کارآگاه",
+        parameters=[OpenApiParameter('case', int, required=True)],
+        responses={200: dict},
+    )
+    @action(detail=False, methods=['get'])
+    def graph(self, request):
+        """On-board evidence/suspects and their connections in one response, served as 304 while unchanged."""
+        case_id = request.query_params.get('case')
+        if not case_id or not str(case_id).isdigit():
+            return Response({'error': 'case query parameter is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not Case.objects.filter(pk=case_id).exists():
+            return Response({'error': 'Case not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        board = Board.objects.filter(case_id=case_id).first()
+        if board is None:
+            # The board is created by its first write (apply_patch); until then there is no version to revalidate
+            response = Response(build_board_graph(Board(case_id=int(case_id))))
+            response['Cache-Control'] = 'private, no-cache'
+            return response
+        etag = board_etag(board)
+        if not_modified(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(build_board_graph(board))
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    @extend_schema(summary="ویرایش گروهی تخته کارآگاه", request=BoardPatchSerializer, responses={200: dict})
+    @action(detail=False, methods=['post'], url_path='patch')
+    def apply_patch(self, request):
+        """Apply a list of node/connection/layout operations atomically and return the new graph."""
+        serializer = BoardPatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        case = serializer.validated_data['case']
+
+        board, _ = Board.objects.get_or_create(case=case)
+        board = apply_board_patch(
+            board,
+            serializer.validated_data['operations'],
+            base_version=serializer.validated_data.get('base_version'),
+        )
+        response = Response(build_board_graph(board))
+        response['ETag'] = board_etag(board)
+        return response
+
+class SuspectViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Suspect.objects.all()
     serializer_class = SuspectSerializer
     permission_classes = [permissions.IsAuthenticated, IsOfficerOrHigher]
+    # The public actions below pick their own throttle scope
+    throttle_scope = None
 
 
 
@@ -254,73 +394,15 @@ class SuspectViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @extend_schema(summary="لیست خطرناک‌ترین مجرمان")
-    @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny])
+    @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny],
+            throttle_scope='public_read')
     def most_wanted(self, request):
-        suspects = Suspect.objects.select_related('case').all()
-
-        # گروه‌بندی بر اساس national_code (اگر خالی بود، با id جدا نگهش می‌داریم)
-        groups = {}
-        for s in suspects:
-            key = (s.national_code or "").strip()
-            if not key:
-                key = f"__suspect_{s.id}"  # برای افرادی که کدملی ندارند
-            g = groups.get(key)
-            if not g:
-                full_name = f"{s.first_name} {s.last_name}".strip() or (s.name or "").strip()
-                groups[key] = g = {
-                    "national_code": s.national_code,
-                    "full_name": full_name,
-                    "suspect_ids": [],
-                    "case_ids": set(),
-                    "image": s.image.url if s.image else None,
-                    "max_pursuit_days_open": 0,
-                    "max_crime_level": 0,  # امتیاز ۱..۴
-                }
-
-            g["suspect_ids"].append(s.id)
-            if s.case_id:
-                g["case_ids"].add(s.case_id)
-            
-            # ثبت تصویر از مظنونینی که عکس دارند
-            if s.image and not g["image"]:
-                g["image"] = s.image.url
-
-            # max(Di) از همه پرونده‌ها
-            if s.case_id:
-                di = _crime_level_score(s.case.crime_level)
-                if di > g["max_crime_level"]:
-                    g["max_crime_level"] = di
-
-            # max(Lj) فقط از پرونده‌های باز
-            if s.case_id and _is_case_open(s.case):
-                lj = _pursuit_days(s)  # این تابع خودش open بودن را هم چک می‌کند
-                if lj > g["max_pursuit_days_open"]:
-                    g["max_pursuit_days_open"] = lj
-
-        # تبدیل به لیست + فیلتر یک ماه
-        results = []
-        for key, g in groups.items():
-            if g["max_pursuit_days_open"] <= 30:
-                continue
-
-            score = g["max_pursuit_days_open"] * g["max_crime_level"]
-            reward_amount = score * 20000000
-
-            results.append({
-                "national_code": g["national_code"],
-                "full_name": g["full_name"],
-                "suspect_ids": g["suspect_ids"],
-                "case_ids": sorted(list(g["case_ids"])),
-                "image": g["image"],
-                "max_pursuit_days": g["max_pursuit_days_open"],
-                "max_crime_level": g["max_crime_level"],
-                "score": score,
-                "reward_amount": reward_amount,
-            })
-
-        # مرتب‌سازی نزولی بر اساس score
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return Response(results)
+        # Public and polled by the landing page; pursuit days grow with time, so the hour is part of the version
+        version = (
+            'most_wanted', timezone.now().strftime('%Y%m%d%H'),
+            *Suspect.objects.aggregate(Count('pk'), Max('updated_at'), Max('case__updated_at')).values(),
+        )
+        return conditional_response(request, version, _most_wanted_rows, cache_control='public, max-age=60')
 
     def get_queryset(self):
         case_id = self.request.query_params.get('case')
@@ -384,9 +466,7 @@ class SuspectViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        suspect.status = Suspect.Status.ARRESTED
-        suspect.is_arrested = True
-        suspect.save()
+        SUSPECT_TRANSITIONS.apply(suspect, Suspect.Status.ARRESTED, actor=request.user, is_arrested=True)
         return Response({'status': 'arrested', 'message': f'Suspect {suspect.name} marked as officially arrested.'})
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated, IsDetective])
@@ -396,10 +476,13 @@ class SuspectViewSet(viewsets.ModelViewSet):
         suspect.save()
         return Response({'is_on_board': suspect.is_on_board})
 
-class InterrogationViewSet(viewsets.ModelViewSet):
-    queryset = Interrogation.objects.all().order_by('-created_at')
+class InterrogationViewSet(QueryPlanMixin, viewsets.ModelViewSet):
+    queryset = Interrogation.objects.order_by('-created_at')
     serializer_class = InterrogationSerializer
     permission_classes = [permissions.IsAuthenticated, IsOfficerOrHigher]
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['score', 'created_at']
+    ordering = ['-created_at']
 
     def get_permissions(self):
         """
@@ -460,17 +543,21 @@ class InterrogationViewSet(viewsets.ModelViewSet):
             serializer = InterrogationFeedbackSerializer(data=request.data)
             
         serializer.is_valid(raise_exception=True)
-        feedback_obj = serializer.save(interrogation=interrogation, captain=request.user)
-
-        case = interrogation.suspect.case
-        if feedback_obj.is_confirmed and feedback_obj.decision == InterrogationFeedback.Decision.GUILTY:
-            # Captain confirms guilt -> send case to chief final review.
-            case.status = Case.Status.PENDING_CHIEF
-            case.save(update_fields=['status'])
-        elif feedback_obj.is_confirmed and feedback_obj.decision == InterrogationFeedback.Decision.INNOCENT:
-            # Captain marks innocent -> return to active investigation.
-            case.status = Case.Status.ACTIVE
-            case.save(update_fields=['status'])
+        with transaction.atomic():
+            feedback_obj = serializer.save(interrogation=interrogation, captain=request.user)
+
+            case = interrogation.suspect.case
+            record_case_event(
+                case.pk, CaseEvent.Kind.INTERROGATION, actor=request.user, object_id=interrogation.pk,
+                data={'suspect': interrogation.suspect_id, 'decision': feedback_obj.decision,
+                      'is_confirmed': feedback_obj.is_confirmed},
+            )
+            if feedback_obj.is_confirmed and feedback_obj.decision == InterrogationFeedback.Decision.GUILTY:
+                # Captain confirms guilt -> send case to chief final review.
+                CASE_TRANSITIONS.apply_or_stay(case, Case.Status.PENDING_CHIEF, actor=request.user)
+            elif feedback_obj.is_confirmed and feedback_obj.decision == InterrogationFeedback.Decision.INNOCENT:
+                # Captain marks innocent -> return to active investigation.
+                CASE_TRANSITIONS.apply_or_stay(case, Case.Status.ACTIVE, actor=request.user)
 
         return Response(serializer.data)
 
@@ -484,18 +571,20 @@ class InterrogationViewSet(viewsets.ModelViewSet):
         feedback.is_chief_confirmed = request.data.get('is_confirmed', True)
         feedback.chief_notes = request.data.get('notes', '')
         feedback.chief = request.user
-        feedback.save()
 
         case = interrogation.suspect.case
-        if feedback.is_chief_confirmed:
-            case.status = Case.Status.PENDING_CHIEF
-        else:
-            case.status = Case.Status.ACTIVE
-        case.save(update_fields=['status'])
+        with transaction.atomic():
+            feedback.save(update_fields=['is_chief_confirmed', 'chief_notes', 'chief', 'updated_at'])
+            record_case_event(
+                case.pk, CaseEvent.Kind.INTERROGATION, actor=request.user, object_id=interrogation.pk, notes=feedback.chief_notes,
+                data={'suspect': interrogation.suspect_id, 'is_chief_confirmed': bool(feedback.is_chief_confirmed)},
+            )
+            target = Case.Status.PENDING_CHIEF if feedback.is_chief_confirmed else Case.Status.ACTIVE
+            CASE_TRANSITIONS.apply_or_stay(case, target, actor=request.user)
 
         return Response({'status': 'confirmed by chief'})
 
-class BoardConnectionViewSet(viewsets.ModelViewSet):
+class BoardConnectionViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = BoardConnection.objects.all()
     serializer_class = BoardConnectionSerializer
     permission_classes = [permissions.IsAuthenticated, IsDetective]
@@ -518,10 +607,12 @@ class BoardConnectionViewSet(viewsets.ModelViewSet):
                 'detail': 'Internal Server Error during connection creation'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class VerdictViewSet(viewsets.ModelViewSet):
+class VerdictViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Verdict.objects.all()
     serializer_class = VerdictSerializer
     permission_classes = [permissions.IsAuthenticated, IsJudge]
+    # The public actions below pick their own throttle scope
+    throttle_scope = None
 
     def create(self, request, *args, **kwargs):
         case_id = request.data.get('case')
@@ -531,11 +622,15 @@ class VerdictViewSet(viewsets.ModelViewSet):
         return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        verdict = serializer.save(judge=self.request.user)
-        case = verdict.case
-        if case and case.status != Case.Status.SOLVED:
-            case.status = Case.Status.SOLVED
-            case.save(update_fields=['status'])
+        with transaction.atomic():
+            verdict = serializer.save(judge=self.request.user)
+            case = verdict.case
+            record_case_event(
+                case.pk, CaseEvent.Kind.VERDICT, actor=self.request.user, object_id=verdict.pk,
+                data={'suspect': verdict.suspect_id, 'result': verdict.result},
+            )
+            if case and case.status != Case.Status.SOLVED:
+                CASE_TRANSITIONS.apply(case, Case.Status.SOLVED, actor=self.request.user)
 
     def get_queryset(self):
         case_id = self.request.query_params.get('case')
@@ -586,7 +681,8 @@ class VerdictViewSet(viewsets.ModelViewSet):
         })
 
     @extend_schema(summary="درخواست پرداخت وثیقه")
-    @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny])
+    @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny],
+            throttle_scope='payments')
     def request_bail_payment(self, request, pk=None):
         """Request bail payment - redirect to payment gateway simulator"""
         verdict = self.get_object()
@@ -612,7 +708,8 @@ class VerdictViewSet(viewsets.ModelViewSet):
         return render(request, 'landing/payment_gateway.html', context)
 
     @extend_schema(summary="درخواست پرداخت جریمه")
-    @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny])
+    @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny],
+            throttle_scope='payments')
     def request_fine_payment(self, request, pk=None):
         """Request fine payment - redirect to payment gateway simulator"""
         verdict = self.get_object()
@@ -638,7 +735,8 @@ class VerdictViewSet(viewsets.ModelViewSet):
         return render(request, 'landing/payment_gateway.html', context)
 
     @extend_schema(summary="بازگشت از درگاه پرداخت وثیقه")
-    @action(detail=True, methods=['post'], permission_classes=[permissions.AllowAny])
+    @action(detail=True, methods=['post'], permission_classes=[permissions.AllowAny],
+            throttle_scope='payments')
     def bail_payment_callback(self, request, pk=None):
         """Callback from payment gateway for bail payment"""
         verdict = self.get_object()
@@ -648,17 +746,25 @@ class VerdictViewSet(viewsets.ModelViewSet):
         gateway = request.POST.get('gateway') or request.data.get('gateway', 'unknown')
         
         if status == 'success':
-            verdict.bail_paid = True
-            verdict.bail_paid_at = timezone.now()
-            verdict.save()
-            
-            # Update suspect status - release from custody
-            if verdict.suspect:
-                from investigation.models import Suspect
-                verdict.suspect.is_arrested = False
-                verdict.suspect.status = Suspect.Status.FREE
-                verdict.suspect.save()
-            
+            # One transaction, so a closed case's snapshot is refreshed after the release, not before it
+            with transaction.atomic():
+                verdict.bail_paid = True
+                verdict.bail_paid_at = timezone.now()
+                verdict.save()
+                record_case_event(
+                    verdict.case_id, CaseEvent.Kind.PAYMENT, actor=request.user, object_id=verdict.pk,
+                    data={'type': 'bail', 'amount': verdict.bail_amount, 'gateway': gateway},
+                )
+
+                # Update suspect status - release from custody
+                if verdict.suspect_id:
+                    SUSPECT_TRANSITIONS.apply_many(
+                        Suspect.objects.filter(pk=verdict.suspect_id),
+                        Suspect.Status.FREE,
+                        actor=request.user,
+                        is_arrested=False,
+                    )
+
             msg = f"وثیقه با موفقیت از طریق {gateway} پرداخت شد. متهم آزاد گردید."
             success = True
         else:
@@ -687,7 +793,8 @@ class VerdictViewSet(viewsets.ModelViewSet):
         })
 
     @extend_schema(summary="بازگشت از درگاه پرداخت جریمه")
-    @action(detail=True, methods=['post'], permission_classes=[permissions.AllowAny])
+    @action(detail=True, methods=['post'], permission_classes=[permissions.AllowAny],
+            throttle_scope='payments')
     def fine_payment_callback(self, request, pk=None):
         """Callback from payment gateway for fine payment"""
         verdict = self.get_object()
@@ -700,6 +807,10 @@ class VerdictViewSet(viewsets.ModelViewSet):
             verdict.fine_paid = True
             verdict.fine_paid_at = timezone.now()
             verdict.save()
+            record_case_event(
+                verdict.case_id, CaseEvent.Kind.PAYMENT, actor=request.user, object_id=verdict.pk,
+                data={'type': 'fine', 'amount': verdict.fine_amount, 'gateway': gateway},
+            )
             
             msg = f"جریمه با موفقیت از طریق {gateway} پرداخت شد."
             success = True
@@ -734,30 +845,32 @@ class VerdictViewSet(viewsets.ModelViewSet):
         """List verdicts with unpaid bail or fine for current user"""
         user = request.user
         
-        # Get verdicts where user is the suspect or related to the case
-        verdicts = Verdict.objects.filter(
-            suspect__case__complainants=user
-        ) | Verdict.objects.filter(
-            case__creator=user
+        # Get verdicts where user is the suspect or related to the case;
+        # bail eligibility (is_eligible_for_bail) is checked in the same query
+        verdicts = (
+            Verdict.objects.filter(
+                Q(suspect__case__complainants=user) | Q(case__creator=user),
+                case__crime_level__in=Verdict.BAIL_CRIME_LEVELS,
+            )
+            .select_related('case', 'suspect')
+            .distinct()
         )
-        
-        # Filter for eligible and unpaid
+
         eligible = []
-        for v in verdicts.distinct():
-            if v.is_eligible_for_bail():
-                data = {
-                    'id': v.id,
-                    'case_title': v.case.title,
-                    'suspect_name': f"{v.suspect.first_name} {v.suspect.last_name}",
-                    'bail_amount': v.bail_amount,
-                    'fine_amount': v.fine_amount,
-                    'bail_paid': v.bail_paid,
-                    'fine_paid': v.fine_paid,
-                    'bail_tracking_code': v.bail_tracking_code,
-                    'fine_tracking_code': v.fine_tracking_code,
-                }
-                eligible.append(data)
-        
+        for v in verdicts:
+            data = {
+                'id': v.id,
+                'case_title': v.case.title,
+                'suspect_name': f"{v.suspect.first_name} {v.suspect.last_name}",
+                'bail_amount': v.bail_amount,
+                'fine_amount': v.fine_amount,
+                'bail_paid': v.bail_paid,
+                'fine_paid': v.fine_paid,
+                'bail_tracking_code': v.bail_tracking_code,
+                'fine_tracking_code': v.fine_tracking_code,
+            }
+            eligible.append(data)
+
         return Response(eligible)
 
 
@@ -797,10 +910,75 @@ class GlobalStatsView(APIView):
         })
 
 
-class RewardReportViewSet(viewsets.ModelViewSet):
-    queryset = RewardReport.objects.all().order_by('-created_at')
+def _performance_rows(queryset, user_field, confirmed_field):
+    """Per-officer interrogation count, mean score and confirmation rate, grouped in SQL.
+
+    The mean only covers scored interrogations; unscored ones store a score of 0.
+    """
+    scored = Q(interrogator_score__isnull=False) | Q(supervisor_score__isnull=False)
+    rows = (
+        queryset.filter(**{f'{user_field}__isnull': False})
+        .values(user_field, f'{user_field}__username')
+        .annotate(
+            interrogations=Count('id'),
+            scored=Count('id', filter=scored),
+            mean_score=Avg('score', filter=scored),
+            confirmed=Count('id', filter=Q(**{confirmed_field: True})),
+        )
+        .order_by(F('mean_score').desc(nulls_last=True), user_field)
+    )
+    return [
+        {
+            "user_id": row[user_field],
+            "username": row[f'{user_field}__username'],
+            "interrogations": row['interrogations'],
+            "scored": row['scored'],
+            "mean_score": round(row['mean_score'], 2) if row['scored'] else None,
+            "confirmed": row['confirmed'],
+            "confirmation_rate": round(row['confirmed'] / row['interrogations'], 3),
+        }
+        for row in rows
+    ]
+
+
+class InterrogationPerformanceView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsCaptain]
+
+    @extend_schema(
+        summary="عملکرد بازجویی کارآگاهان و گروهبان‌ها",
+        description=(
+            "تعداد بازجویی‌ها، میانگین امتیاز نهایی و نرخ تایید به تفکیک کارآگاه (بازجو) و گروهبان (ناظر). "
+            "با پارامتر since فقط بازجویی‌های ثبت‌شده از آن تاریخ به بعد شمرده می‌شوند."
+        ),
+        parameters=[
+            OpenApiParameter(name='since', description='تاریخ شروع (YYYY-MM-DD)', required=False, type=str),
+        ],
+        responses={200: dict}
+    )
+    def get(self, request):
+        queryset = Interrogation.objects.all()
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since_date = parse_date(since)
+            except ValueError:
+                since_date = None
+            if since_date is None:
+                return Response({'error': 'since must be a date (YYYY-MM-DD)'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(created_at__date__gte=since_date)
+
+        return Response({
+            "detectives": _performance_rows(queryset, 'interrogator', 'is_interrogator_confirmed'),
+            "sergeants": _performance_rows(queryset, 'supervisor', 'is_supervisor_confirmed'),
+        })
+
+
+class RewardReportViewSet(QueryPlanMixin, viewsets.ModelViewSet):
+    queryset = RewardReport.objects.order_by('-created_at')
     serializer_class = RewardReportSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # The public actions below pick their own throttle scope
+    throttle_scope = None
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -813,15 +991,7 @@ class RewardReportViewSet(viewsets.ModelViewSet):
         if suspect_nc:
             qs = qs.filter(suspect_national_code=suspect_nc)
 
-        user = self.request.user
-        if user.is_anonymous:
-            return qs.none()
-            
-        roles = [r.code for r in user.roles.all()]
-        elevated = user.is_superuser or any(r in roles for r in ['police_officer', 'captain', 'police_chief', 'detective', 'sergeant'])
-        if elevated:
-            return qs
-        return qs.filter(reporter=user)
+        return visible_reward_reports(self.request.user, qs)
 
     @extend_schema(summary="ثبت گزارش جدید پاداش")
     def create(self, request, *args, **kwargs):
@@ -941,7 +1111,8 @@ class RewardReportViewSet(viewsets.ModelViewSet):
         }
         return render(request, 'landing/payment_gateway.html', context)
 
-    @action(detail=True, methods=['post'], permission_classes=[permissions.AllowAny])
+    @action(detail=True, methods=['post'], permission_classes=[permissions.AllowAny],
+            throttle_scope='payments')
     def payment_callback(self, request, pk=None):
         """صفحه بازگشت از درگاه (بخش ۱ چکلست)"""
         report = self.get_object()
@@ -952,6 +1123,7 @@ class RewardReportViewSet(viewsets.ModelViewSet):
             report.paid_at = timezone.now()
             # در شبیه‌ساز، چون کاربر مستقیم از بانک میاد، پرداخت‌کننده رو سیستم در نظر می‌گیریم
             report.save(update_fields=['is_paid', 'paid_at'])
+            _record_reward_payment(report, request.user)
             msg = "پرداخت با موفقیت انجام شد. مبلغ به حساب شما واریز گردید."
             success = True
         else:
@@ -981,6 +1153,7 @@ class RewardReportViewSet(viewsets.ModelViewSet):
         report.paid_at = timezone.now()
         report.paid_by = request.user
         report.save(update_fields=['is_paid', 'paid_at', 'paid_by'])
+        _record_reward_payment(report, request.user)
         return Response({'status': 'paid', 'paid_at': report.paid_at})
 
 
@@ -1033,3 +1206,67 @@ class RewardReportViewSet(viewsets.ModelViewSet):
             'is_paid': report.is_paid,
             'paid_at': report.paid_at,
         })
+
+
+class SyncView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary="همگام‌سازی تغییرات",
+        description=(
+            "ردیف‌های تغییر یافته و حذف شده (پرونده، مدرک، مظنون، اتصال تخته و حکم) پس از cursor داده شده. "
+            "بدون since همه‌ی داده‌های قابل مشاهده برگردانده می‌شود؛ تا زمانی که has_more برابر true است "
+            "با cursor جدید دوباره درخواست دهید."
+        ),
+        parameters=[
+            OpenApiParameter(name='since', description='cursor دریافتی از پاسخ قبلی', required=False, type=str),
+            OpenApiParameter(name='limit', description='حداکثر ردیف برای هر نوع (پیش‌فرض ۵۰۰)', required=False, type=int),
+        ],
+        responses={200: dict}
+    )
+    def get(self, request):
+        from .sync import InvalidCursor, collect_changes
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', 500)), 1), 1000)
+        except ValueError:
+            return Response({'error': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            payload = collect_changes(request.user, since=request.query_params.get('since'), limit=limit)
+        except InvalidCursor:
+            return Response({'error': 'Invalid sync cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(payload)
+
+
+class ExportView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary="خروجی گرفتن از داده‌ها (CSV / NDJSON)",
+        description=(
+            "خروجی جریانی (streaming) از پرونده‌ها، مدارک، مظنونین، احکام و گزارش‌های پاداش. "
+            "فقط ردیف‌های پرونده‌هایی که کاربر اجازه‌ی مشاهده‌ی آن‌ها را دارد برگردانده می‌شوند."
+        ),
+        parameters=[
+            OpenApiParameter(name='output', description='csv یا ndjson (پیش‌فرض csv)', required=False, type=str),
+        ],
+        responses={200: str}
+    )
+    def get(self, request, dataset):
+        from django.http import StreamingHttpResponse
+        from .export import EXPORT_DATASETS, EXPORT_FORMATS, iter_export
+
+        if dataset not in EXPORT_DATASETS:
+            return Response(
+                {'error': f'Unknown dataset. Choose one of: {", ".join(EXPORT_DATASETS)}.'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        fmt = request.query_params.get('output', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            return Response({'error': 'output must be csv or ndjson.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        content_type = 'text/csv; charset=utf-8' if fmt == 'csv' else 'application/x-ndjson; charset=utf-8'
+        response = StreamingHttpResponse(iter_export(dataset, fmt, user=request.user), content_type=content_type)
+        stamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+        response['Content-Disposition'] = f'attachment; filename="{dataset}-{stamp}.{fmt}"'
+        return response
@@ -0,0 +1,15 @@
+from .models import RewardReport
+
+
+# Roles that review reward reports see all of them; anyone else only their own
+REWARD_REVIEWER_ROLES = {'police_officer', 'captain', 'police_chief', 'detective', 'sergeant'}
+
+
+def visible_reward_reports(user, queryset=None):
+    """Reward reports ``user`` may see; shared by the reward API and exports."""
+    queryset = RewardReport.objects.all() if queryset is None else queryset
+    if user.is_anonymous:
+        return queryset.none()
+    if user.is_superuser or REWARD_REVIEWER_ROLES.intersection(user.roles.values_list('code', flat=True)):
+        return queryset
+    return queryset.filter(reporter=user)